@@ -0,0 +1,91 @@
+from src.backend.arm_control.kinematics import limit_arm_angles, pos_to_arm_angles_batch, pos_to_arm_commands
+
+from math import ceil
+import numpy
+from typing import Sequence, Tuple
+
+
+IK_TABLE_LOW = (-1.0, 0.2, -0.8)  # m; corner of the tracked volume nearest the arm's back left bottom
+IK_TABLE_HIGH = (1.0, 2.0, 1.0)  # m; opposite corner
+IK_TABLE_STEP = 0.02  # m; between solved points; error is most where the solution is steepest, nearest the arm
+
+
+class IkTable:
+    """Arm angles solved ahead of time over a grid of the tracked volume, so each frame interpolates between the
+    nearest solutions rather than solving. Angles are stored in degrees with the joint limits already applied, and
+    points outside the grid are solved directly.
+    """
+
+    def __init__(self, low: Sequence[float] = IK_TABLE_LOW, high: Sequence[float] = IK_TABLE_HIGH,
+                 step: float = IK_TABLE_STEP):
+        """:param low: Metres from base joint to the grid's first corner; x-axis, then y-axis, then z-axis
+        :param high: Metres from base joint to the opposite corner, rounded up to a whole step
+        :param step: Metres between solved points
+        """
+        self.low = tuple(float(value) for value in low)
+        self.step = step
+        self.shape = tuple(ceil((h - l) / step - 1e-9) + 1 for l, h in zip(self.low, high))
+        axes = [lo + step * numpy.arange(count) for lo, count in zip(self.low, self.shape)]
+        self.high = tuple(float(axis[-1]) for axis in axes)
+        # x, then y, then z, then joint
+        self.table = limit_arm_angles(pos_to_arm_angles_batch(numpy.stack(numpy.meshgrid(*axes, indexing='ij'), -1)))
+        # single lookups read plain floats, as numpy scalars are slow
+        self._values = memoryview(self.table.reshape(-1))
+        self._strides = (self.shape[1] * self.shape[2] * 3, self.shape[2] * 3, 3)
+        self._cell_strides = numpy.array(self._strides) // 3
+        self._corner_offsets = numpy.array([numpy.dot((i, j, k), self._cell_strides)
+                                            for i in (0, 1) for j in (0, 1) for k in (0, 1)])
+
+    def lookup(self, x: float, y: float, z: float) -> Tuple[int, int, int]:
+        """Interpolates the arm angles to block a point, as commands for the motor controller.
+        :return: Whole degrees for each arm joint, within its limits
+        """
+        low = self.low
+        scale = 1 / self.step
+        fx = (x - low[0]) * scale
+        fy = (y - low[1]) * scale
+        fz = (z - low[2]) * scale
+        nx, ny, nz = self.shape
+        if not (0 <= fx <= nx - 1 and 0 <= fy <= ny - 1 and 0 <= fz <= nz - 1):
+            return pos_to_arm_commands(x, y, z)
+        i = min(int(fx), nx - 2)
+        j = min(int(fy), ny - 2)
+        k = min(int(fz), nz - 2)
+        tx, ty, tz = fx - i, fy - j, fz - k
+        sx, sy, sz = self._strides
+        index = i * sx + j * sy + k * sz
+        values = self._values
+        commands = []
+        for joint in range(3):
+            corner = index + joint
+            # along z, then y, then x
+            c00 = values[corner] + tz * (values[corner + sz] - values[corner])
+            c01 = values[corner + sy] + tz * (values[corner + sy + sz] - values[corner + sy])
+            c10 = values[corner + sx] + tz * (values[corner + sx + sz] - values[corner + sx])
+            c11 = values[corner + sx + sy] + tz * (values[corner + sx + sy + sz] - values[corner + sx + sy])
+            c0 = c00 + ty * (c01 - c00)
+            c1 = c10 + ty * (c11 - c10)
+            commands.append(int(c0 + tx * (c1 - c0)))
+        return commands[0], commands[1], commands[2]
+
+    def angles(self, points: numpy.ndarray) -> numpy.ndarray:
+        """Interpolates the arm angles to block many points at once, such as candidate intercepts.
+        :param points: N x 3 metres from base joint
+        :return: N x 3 degrees for each arm joint, within its limits
+        """
+        points = numpy.asarray(points, numpy.float64)
+        scaled = (points - self.low) / self.step
+        limit = numpy.array(self.shape) - 1
+        inside = numpy.all((scaled >= 0) & (scaled <= limit), axis=1)
+        scaled = numpy.clip(scaled, 0, limit)
+        corner = numpy.minimum(scaled.astype(numpy.intp), limit - 1)
+        tx, ty, tz = (scaled - corner).T
+        ux, uy, uz = 1 - tx, 1 - ty, 1 - tz
+        weights = numpy.stack((ux * uy * uz, ux * uy * tz, ux * ty * uz, ux * ty * tz,
+                               tx * uy * uz, tx * uy * tz, tx * ty * uz, tx * ty * tz), axis=1)
+        # solutions at the eight corners around each point, in the same order as the weights
+        corners = self.table.reshape(-1, 3)[(corner @ self._cell_strides)[:, None] + self._corner_offsets]
+        angles = numpy.einsum('nc,ncj->nj', weights, corners)
+        if not numpy.all(inside):
+            angles[~inside] = limit_arm_angles(pos_to_arm_angles_batch(points[~inside]))
+        return angles
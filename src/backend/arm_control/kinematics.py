@@ -1,18 +1,48 @@
-from typing import Tuple
+from src.backend.external_management.connections import ARM_BASE_LENGTH, ARM_COLLISION_LENGTH, ARM_FORE_LENGTH
+
+from typing import Tuple, Union
 from math import cos, sin, atan, pi
+import numpy
 
 
 D_TO_R = 2*pi/360
 R_TO_D = 360/(2*pi)
 RESEND_DEG_THRESH = 15
 MAGIC_NUMBER = 1.5
+# degrees each joint is limited to
+BASE_LIMITS = (-60, 60)
+ELBOW_LIMITS = (-35, 55)
+WRIST_LIMITS = (-180, 180)
+JOINT_LIMITS = numpy.array([BASE_LIMITS, ELBOW_LIMITS, WRIST_LIMITS])
+
+Angles = Union[float, numpy.ndarray]
 
 
-def arm_angles_to_position(base: float, elbow: float, wrist: float) -> Tuple[float, float, float]:
+def arm_angles_to_position(
+        base: Angles,
+        elbow: Angles,
+        wrist: Angles,
+        along: Union[float, numpy.ndarray] = ARM_COLLISION_LENGTH
+) -> Tuple[Angles, Angles, Angles]:
     """Converts angles of arm to a position in space relative to the base. "Forward kinematics."
+    The base joint turns the arm about the vertical, 0 facing forward and positive to the right. The base segment rises
+    to the elbow, which tilts the forearm up from level. The sword is held across the end of the forearm, and the wrist
+    turns it about the forearm, 0 pointing right and pi/2 pointing up. Angles may be arrays, which are broadcast
+    together.
+    :param along: Metres along the sword from the wrist of the point to find; the collision point by default
     :return: Distances in metres to right, then to front, then to above base joint
     """
-    raise NotImplementedError
+    sin_base, cos_base = numpy.sin(base), numpy.cos(base)
+    sin_elbow, cos_elbow = numpy.sin(elbow), numpy.cos(elbow)
+    along_up = along * numpy.sin(wrist)
+    # in the plane the base faces: forward along the forearm, less the sword leaning back as the forearm tilts up
+    forward = ARM_FORE_LENGTH * cos_elbow - along_up * sin_elbow
+    right = along * numpy.cos(wrist)
+    return (
+        sin_base * forward + cos_base * right,
+        cos_base * forward - sin_base * right,
+        ARM_BASE_LENGTH + ARM_FORE_LENGTH * sin_elbow + along_up * cos_elbow
+    )
 
 
 def pos_to_arm_angles(x: float, y: float, z: float) -> Tuple[float, float, float]:
@@ -25,3 +55,37 @@ def pos_to_arm_angles(x: float, y: float, z: float) -> Tuple[float, float, float
     elbow = atan(z/(y / cos(base))) * MAGIC_NUMBER + (sin(base) * pi/12)
     wrist = -base * MAGIC_NUMBER + pi/2
     return base_offset, elbow, wrist
+
+
+def pos_to_arm_angles_batch(points: numpy.ndarray) -> numpy.ndarray:
+    """Converts many points to block to arm angles, as ``pos_to_arm_angles`` does for one.
+    :param points: N x 3 metres from base joint
+    :return: N x 3 angles in radians; base, then elbow, then wrist
+    """
+    x, y, z = points[..., 0], points[..., 1], points[..., 2]
+    base = numpy.arctan(x/y) * MAGIC_NUMBER
+    angles = numpy.empty(points.shape)
+    angles[..., 0] = base + (numpy.cos(base) * pi/12)
+    angles[..., 1] = numpy.arctan(z/(y / numpy.cos(base))) * MAGIC_NUMBER + (numpy.sin(base) * pi/12)
+    angles[..., 2] = -base * MAGIC_NUMBER + pi/2
+    return angles
+
+
+def limit_arm_angles(angles: numpy.ndarray) -> numpy.ndarray:
+    """Converts arm angles to degrees within each joint's limits.
+    :param angles: N x 3 radians
+    :return: N x 3 degrees, the closest limit where out of range
+    """
+    return numpy.clip(angles * R_TO_D, JOINT_LIMITS[:, 0], JOINT_LIMITS[:, 1])
+
+
+def pos_to_arm_commands(x: float, y: float, z: float) -> Tuple[int, int, int]:
+    """Solves the arm angles to block a point, as commands for the motor controller.
+    :return: Whole degrees for each arm joint, within its limits
+    """
+    base, elbow, wrist = pos_to_arm_angles(x, y, z)
+    return (
+        min(max(int(base * R_TO_D), BASE_LIMITS[0]), BASE_LIMITS[1]),
+        min(max(int(elbow * R_TO_D), ELBOW_LIMITS[0]), ELBOW_LIMITS[1]),
+        min(max(int(wrist * R_TO_D), WRIST_LIMITS[0]), WRIST_LIMITS[1]),
+    )
@@ -0,0 +1,52 @@
+from typing import Optional
+
+
+ARM_RESPONSE_TIME = 0.08  # s; from command written until the arm is in position, for typical moves
+INITIAL_LATENCY = 0.05  # s; capture to serial write, until measured
+LATENCY_SMOOTHING = 0.1  # weight of each new measurement
+MAX_LEAD = 0.3  # s; further ahead than this, extrapolation is worse than aiming behind
+
+
+class LatencyEstimate:
+    """Running estimate of the time from capturing images to writing the command made from them, and so how far
+    ahead of the capture the arm should be aimed.
+    """
+
+    def __init__(self, response_time: float = ARM_RESPONSE_TIME, initial: float = INITIAL_LATENCY,
+                 smoothing: float = LATENCY_SMOOTHING, max_lead: float = MAX_LEAD):
+        """:param response_time: Seconds the arm takes to get where it is sent, added to the latency for lead
+        :param initial: Seconds assumed until the first measurement
+        :param smoothing: Weight of each new measurement in the exponential moving average
+        :param max_lead: Most seconds ahead of capture to aim
+        """
+        self.response_time = response_time
+        self.smoothing = smoothing
+        self.max_lead = max_lead
+        self._initial = initial
+        self.latency = initial
+        self.samples = 0
+
+    def reset(self) -> None:
+        """Returns to the initial estimate.
+        """
+        self.latency = self._initial
+        self.samples = 0
+
+    def update(self, sample: Optional[float]) -> float:
+        """Adds a measured latency. The first measurement replaces the initial estimate.
+        :param sample: Seconds from capture to write; ignored if ``None``
+        :return: Estimated latency in seconds
+        """
+        if sample is not None:
+            if self.samples == 0:
+                self.latency = sample
+            else:
+                self.latency += self.smoothing * (sample - self.latency)
+            self.samples += 1
+        return self.latency
+
+    @property
+    def lead(self) -> float:
+        """Seconds after capture the arm should be aimed at, for it to arrive when the object does.
+        """
+        return min(self.latency + self.response_time, self.max_lead)
@@ -1,20 +1,37 @@
 from datetime import datetime
-from time import monotonic, sleep
+from math import dist
+from time import sleep
+from typing import Dict
 
 from src.backend.error.standby_transition import StandbyTransition
 from src.backend.external_management.connections import Ext
+from src.backend.sensor_fusion.camera_model import StereoCameras
+from src.backend.sensor_fusion.detection import Detector
+from src.backend.sensor_fusion.kalman import KalmanFilter
 from src.backend.sensor_fusion.tracking import (
-    find_in_image, create_ray, locate_object, store_location, get_location_history, clear_location_history
+    locate_object_from_directions, store_location, clear_location_history
 )
-from src.backend.state_management.error_checker import verify_track
+from src.backend.state_management.error_checker import TrackVerifier
 from src.backend.state_management.state_manager import Manager, State
-from src.backend.arm_control.trajectory import simple_trajectory
-from src.backend.arm_control.kinematics import pos_to_arm_angles, R_TO_D, RESEND_DEG_THRESH
+from src.backend.arm_control.trajectory import ArcFitter, calculate_collision, simple_trajectory
+from src.backend.arm_control.latency import LatencyEstimate
+from src.backend.arm_control.kinematics import pos_to_arm_commands, RESEND_DEG_THRESH
+from src.backend.arm_control.workspace import load_workspace
+from src.backend.performance.allocation_counter import AllocationCounter
 from src.backend.performance.timer import Timer
 from src.frontend.gui import Gui
 from src.frontend.visualisation import Graph
 
 
+COUNT_ALLOCATIONS = False  # slows loop; only to check steady state allocations
+TRACK_ROI = True  # search only around where the object was last seen
+LOOKUP_SEGMENTATION = False  # no faster than cvtColor + inRange where OpenCV uses SIMD; see segmentation_speed.py
+PYRAMID_SCALE = 1  # downsampling for whole image searches; worth raising above 160x120, see pyramid_speed.py
+FILTER_LOCATION = False  # aim at the Kalman filtered location rather than the raw triangulation; noise untuned
+INTERCEPT_SWING = False  # aim where the fitted swing arc enters the arm's workspace, when it does
+COMPENSATE_LATENCY = False  # aim where the object will be once the command is acted on; response time unmeasured
+
+
 def post_msg(msg: str, gui: Gui, is_error):
     """Formats and prints message to GUI and console.
     """
@@ -30,19 +47,11 @@ def format_log(msg: str, is_error: bool = False) -> str:
     return f'{datetime.now().time()} {"!!" if is_error else "--"} {msg}'
 
 
-def limit_joint_to_range(value: int, lower: int, upper: int, joint: str = 'joint', verbose: bool = False) -> int:
-    """Limits a command for a given joint to a specified range.
-    :return: The original value if it is within the range, otherwise the closest limit value
+def format_connect_times(times: Dict[str, float]) -> str:
+    """Lists how long each device took to connect.
+    :return: Comma separated device names and times
     """
-    if value < lower:
-        if verbose:
-            print(f'{joint} increased from {value} to {lower}')
-        return lower
-    elif value > upper:
-        if verbose:
-            print(f'{joint} decreased from {value} to {upper}')
-        return upper
-    return value
+    return ', '.join(f'{name} {1000 * seconds:.0f}ms' for name, seconds in times.items())
 
 
 def operation_loop(state_manager: Manager, connection_manager: Ext, gui: Gui, vis: Graph):
@@ -53,11 +62,25 @@ def operation_loop(state_manager: Manager, connection_manager: Ext, gui: Gui, vi
     last_ang = [999, 999, 999]
     loop_timer = Timer(['state_action', 'state_update'], 'loop-timer', 0)
     active_timer = Timer(['take_photos', 'find_sword', 'create_rays', 'place_rays', 'locate_object',
-                          'store_location', 'set_obj', 'verify_track', 'arm_angles', 'send_angles'],
-                         'active-timer', 0)
+                          'store_location', 'filter_location', 'fit_arc', 'set_obj', 'verify_track', 'arm_angles',
+                          'send_angles'],
+                         'active-timer', 0,
+                         ['frame_skew_ms', 'alloc_kb', 'serial_sent', 'serial_coalesced', 'write_latency_ms',
+                          'processed_px', 'latency_ms', 'lead_ms', 'compensation_mm'])
+    alloc_counter = AllocationCounter(COUNT_ALLOCATIONS)
+    detector_l = Detector(TRACK_ROI, LOOKUP_SEGMENTATION, pyramid_scale=PYRAMID_SCALE)
+    detector_r = Detector(TRACK_ROI, LOOKUP_SEGMENTATION, pyramid_scale=PYRAMID_SCALE)
+    cameras = StereoCameras()
+    kalman = KalmanFilter() if FILTER_LOCATION else None
+    arc_fitter = ArcFitter() if INTERCEPT_SWING else None
+    latency = LatencyEstimate()
+    verifier = TrackVerifier()
+    # built on first run, then read from disk
+    workspace = load_workspace() if INTERCEPT_SWING else None
 
     # start main loop
     print('Starting')
+    post_msg(f'Devices connected ({format_connect_times(connection_manager.connect_times)})', gui, False)
     connection_manager.send_serial(State.STANDBY)
     while state_manager.get_state() > State.OFF:
         loop_timer.start_loop()
@@ -75,10 +98,9 @@ def operation_loop(state_manager: Manager, connection_manager: Ext, gui: Gui, vi
                         # if fails, reconnect cameras and retry
                         if attempt < 1:
                             post_msg(f'{st.message}; retrying', gui, False)
-                            connection_manager.disconnect_cameras()
-                            connection_manager.connect_cameras()
-                            connection_manager.disconnect_arduino()
-                            connection_manager.connect_arduino()
+                            connection_manager.reconnect()
+                            post_msg(f'Devices reconnected '
+                                     f'({format_connect_times(connection_manager.connect_times)})', gui, False)
                 if not cam_cal_success:
                     state_manager.standby()
                     post_msg('Calibration failed', gui, True)
@@ -86,17 +108,27 @@ def operation_loop(state_manager: Manager, connection_manager: Ext, gui: Gui, vi
                     # ensure it can find object
                     distance = 0
                     clear_location_history()
+                    if kalman is not None:
+                        kalman.reset()
+                    if arc_fitter is not None:
+                        arc_fitter.reset()
+                    verifier.reset()
                     for i in range(5):
-                        photos = connection_manager.take_photos()
-                        center_l, angle_l = find_in_image(photos[0])
-                        center_r, angle_r = find_in_image(photos[1])
-                        ray_l = create_ray(*center_l, connection_manager.cam_res)
-                        ray_r = create_ray(*center_r, connection_manager.cam_res)
-                        vis.set_cam_rays(ray_l, ray_r)
-                        location = locate_object(ray_l, ray_r)
-                        store_location(monotonic(), location)
+                        if connection_manager.vision_engine is not None:
+                            capture = connection_manager.take_detections()
+                            detection_l, detection_r = capture.left, capture.right
+                        else:
+                            capture = connection_manager.take_photos()
+                            detection_l = detector_l.detect(capture[0])
+                            detection_r = detector_r.detect(capture[1])
+                        cameras.update(connection_manager.cam_res, connection_manager.camera_generation)
+                        ray_l = cameras.left.ray(*detection_l.center)
+                        ray_r = cameras.right.ray(*detection_r.center)
+                        vis.set_cam_directions(ray_l, ray_r)
+                        location = locate_object_from_directions(ray_l, ray_r)
+                        store_location(capture.timestamp, location)
                         vis.set_obj(location)
-                        verify_track(get_location_history())
+                        verifier.check(capture.timestamp, location)
                         distance += location[1]  # y coord; distance from arm front
                     # if object behind arm, swap cams
                     if distance < 0:
@@ -109,39 +141,74 @@ def operation_loop(state_manager: Manager, connection_manager: Ext, gui: Gui, vi
                     connection_manager.send_serial(State.READY)
                     last_ang = [999, 999, 999]
                     clear_location_history()
+                    if kalman is not None:
+                        kalman.reset()
+                    if arc_fitter is not None:
+                        arc_fitter.reset()
+                    verifier.reset()
                     post_msg('Calibration successful', gui, False)
             elif state_manager.get_state() > State.CALIBRATE:
                 active_timer.start_loop()
+                alloc_counter.start_loop()
                 # monitor tracking
-                photos = connection_manager.take_photos()
+                if connection_manager.vision_engine is not None:
+                    # photos taken and searched in worker processes
+                    capture = connection_manager.take_detections()
+                    active_timer.split()
+                    detection_l, detection_r = capture.left, capture.right
+                else:
+                    capture = connection_manager.take_photos()
+                    active_timer.split()
+                    detection_l = detector_l.detect(capture[0])
+                    detection_r = detector_r.detect(capture[1])
+                    active_timer.record('processed_px', detector_l.processed_area + detector_r.processed_area)
+                active_timer.split()
+                active_timer.record('frame_skew_ms', capture.skew * 1000)
+                cameras.update(connection_manager.cam_res, connection_manager.camera_generation)
+                ray_l = cameras.left.ray(*detection_l.center)
+                ray_r = cameras.right.ray(*detection_r.center)
                 active_timer.split()
-                center_l, angle_l = find_in_image(photos[0])
-                center_r, angle_r = find_in_image(photos[1])
+                vis.set_cam_directions(ray_l, ray_r)
                 active_timer.split()
-                ray_l = create_ray(*center_l, connection_manager.cam_res)
-                ray_r = create_ray(*center_r, connection_manager.cam_res)
+                location = locate_object_from_directions(ray_l, ray_r)
                 active_timer.split()
-                vis.set_cam_rays(ray_l, ray_r)
+                # when the object was there, not when it was found
+                timestamp = capture.timestamp
+                store_location(timestamp, location)
                 active_timer.split()
-                location = locate_object(ray_l, ray_r)
+                if FILTER_LOCATION:
+                    motion = kalman.update(timestamp, location)
                 active_timer.split()
-                store_location(monotonic(), location)
+                if INTERCEPT_SWING:
+                    arc = arc_fitter.add(timestamp, location)
                 active_timer.split()
                 vis.set_obj(location)
                 active_timer.split()
-                verify_track(get_location_history())
+                verifier.check(timestamp, location)
+                # errors from motor controller are read in background; raise here so standby happens this frame
+                connection_manager.check_serial_errors()
                 active_timer.split()
                 if state_manager.get_state() == State.READY:
-                    connection_manager.send_serial(State.READY)
+                    connection_manager.send_serial(State.READY, captured=timestamp)
                 elif state_manager.get_state() == State.ACTIVE:
                     # act upon tracking
-                    arm_angles = pos_to_arm_angles(*simple_trajectory(location))
-                    # limit to bounds
-                    arm_angles = [
-                        limit_joint_to_range(int(arm_angles[0]*R_TO_D), -60, 60),
-                        limit_joint_to_range(int(arm_angles[1]*R_TO_D), -35, 55),
-                        limit_joint_to_range(int(arm_angles[2]*R_TO_D), -180, 180),
-                    ]
+                    aim_time = timestamp + latency.lead if COMPENSATE_LATENCY else timestamp
+                    target = location
+                    # the raw location is from capture, so only predicted targets are led
+                    predicted = False
+                    if FILTER_LOCATION:
+                        target = kalman.predict(aim_time).position
+                        active_timer.record('compensation_mm', 1000 * dist(target, motion.position))
+                        predicted = True
+                    if INTERCEPT_SWING and arc.valid:
+                        collision = calculate_collision(arc, aim_time, workspace)
+                        if collision is not None:
+                            target = collision.position
+                            predicted = True
+                    if COMPENSATE_LATENCY and predicted:
+                        active_timer.record('lead_ms', (aim_time - timestamp) * 1000)
+                    # whole degrees within each joint's limits
+                    arm_angles = pos_to_arm_commands(*simple_trajectory(target))
                     active_timer.split()
                     # reduce small movements by resending
                     if (
@@ -149,13 +216,20 @@ def operation_loop(state_manager: Manager, connection_manager: Ext, gui: Gui, vi
                             abs(last_ang[1] - arm_angles[1]) > RESEND_DEG_THRESH or
                             abs(last_ang[2] - arm_angles[2]) > RESEND_DEG_THRESH
                     ):
-                        connection_manager.send_serial(State.ACTIVE, arm_angles)
+                        connection_manager.send_serial(State.ACTIVE, arm_angles, timestamp)
                         last_ang = arm_angles
                         log_file.write(f'o {arm_angles[0]} {arm_angles[1]} {arm_angles[2]}\n')
                     else:
                         # connection_manager.send_serial(State.ACTIVE, last_ang)
                         log_file.write(f'r {last_ang[0]} {last_ang[1]} {last_ang[2]}\n')
                     active_timer.split()
+                latency.update(connection_manager.take_capture_latency())
+                active_timer.record('latency_ms', latency.latency * 1000)
+                active_timer.record('alloc_kb', alloc_counter.allocated() / 1024)
+                serial_sent, serial_coalesced, write_latency = connection_manager.serial_stats()
+                active_timer.record('serial_sent', serial_sent)
+                active_timer.record('serial_coalesced', serial_coalesced)
+                active_timer.record('write_latency_ms', write_latency * 1000)
             else:
                 connection_manager.send_serial(State.STANDBY)
         except StandbyTransition as st:
@@ -181,6 +255,12 @@ def operation_loop(state_manager: Manager, connection_manager: Ext, gui: Gui, vi
     # cleanup
     loop_timer.end()
     active_timer.end()
+    alloc_counter.end()
+    for side, detector in (('Left', detector_l), ('Right', detector_r)):
+        print(f'{side} detector: {detector.hits} ROI hits, {detector.misses} ROI misses, '
+              f'{detector.full_searches} full searches')
+    print(f'Track: {verifier.checked} steps, {1000 * verifier.mean_interval:.1f}ms mean interval, '
+          f'{verifier.peak_speed:.2f}m/s peak speed, {verifier.peak_acceleration:.1f}m/s^2 peak acceleration')
     connection_manager.send_serial(State.OFF)
     connection_manager.disconnect_arduino()
     connection_manager.disconnect_cameras()
@@ -1,19 +1,219 @@
-from typing import List, Tuple
+from src.backend.arm_control.workspace import BLOCKABLE, WorkspaceGrid
+from src.backend.sensor_fusion.location_history import HISTORY_CAPACITY
+
+from collections import deque
+from functools import lru_cache
+from math import sqrt
+from typing import Iterable, NamedTuple, Optional, Sequence, Tuple
 import numpy
 
 
-def calculate_trajectory(history: List[Tuple[float, numpy.typing.NDArray[numpy.float64]]]):
+MIN_ARC_POINTS = 4  # more than the 3 coefficients, so residual means something
+MAX_ARC_RESIDUAL = 0.05  # m; RMS distance of locations from a fit still considered an arc
+SINGULAR_TOLERANCE = 1e-9  # of the normal equations' determinant relative to its diagonal
+REBASE_INTERVAL = 1.0  # s; sums are moved to a newer reference time this often, keeping powers of time small
+COLLISION_HORIZON = 0.5  # s
+COLLISION_SAMPLES = 64
+COLLISION_REFINEMENTS = 12  # bisection steps; narrows the ~8ms between samples to ~2us
+
+
+class ArcFit(NamedTuple):
+    """Parabola fit through recent locations, ``p(t) = c0 + c1 * (t - t0) + c2 * (t - t0)^2`` for each axis.
+    """
+    coefficients: numpy.ndarray  # 3 x 3; rows are c0, c1, c2, columns are x, y, z
+    reference_time: float  # t0
+    residual: float  # m; RMS distance of fitted locations from the fit
+    valid: bool  # enough locations, well spread in time, that are close to the fit
+
+    def position(self, timestamp: float) -> numpy.ndarray:
+        """Evaluates the fit.
+        :return: Metres from base joint; x-axis, then y-axis, then z-axis
+        """
+        tau = timestamp - self.reference_time
+        return self.coefficients[0] + tau * (self.coefficients[1] + tau * self.coefficients[2])
+
+
+class Collision(NamedTuple):
+    """Where and when a swing is predicted to enter the arm's workspace.
+    """
+    timestamp: float
+    position: numpy.ndarray  # m from base joint; x-axis, then y-axis, then z-axis
+
+
+class ArcFitter:
+    """Least squares parabola fit over a sliding window of locations. The normal equations are kept as running sums,
+    so each location is added, and the oldest dropped, with a constant amount of work however long the window. Sums
+    are plain floats, as numpy calls cost more than the arithmetic on this few values.
+    """
+
+    def __init__(self, window: int = HISTORY_CAPACITY, min_points: int = MIN_ARC_POINTS,
+                 max_residual: float = MAX_ARC_RESIDUAL):
+        """:param window: Most recent locations fitted
+        :param min_points: Fewest locations for a fit to be valid
+        :param max_residual: Largest RMS distance in metres for a fit to be valid
+        """
+        self.max_residual = max_residual
+        self.min_points = max(min_points, 3)
+        # (timestamp, x, y, z), oldest first
+        self._window = deque(maxlen=window)
+        self._reference = 0.0
+        self._clear_sums()
+
+    def __len__(self) -> int:
+        return len(self._window)
+
+    def reset(self) -> None:
+        """Removes all locations.
+        """
+        self._window.clear()
+        self._clear_sums()
+
+    def add(self, timestamp: float, location: Sequence[float]) -> ArcFit:
+        """Adds a location, dropping the oldest if the window is full, and fits the window.
+        :return: Fit
+        """
+        entry = (float(timestamp), float(location[0]), float(location[1]), float(location[2]))
+        if not self._window:
+            self._reference = entry[0]
+        elif entry[0] - self._reference > REBASE_INTERVAL:
+            self._rebase(entry[0])
+        if len(self._window) == self._window.maxlen:
+            self._accumulate(self._window[0], -1.0)
+        self._window.append(entry)
+        self._accumulate(entry, 1.0)
+        return self.fit()
+
+    def fit(self) -> ArcFit:
+        """Solves the normal equations of the current window.
+        :return: Fit; invalid, with zero coefficients, if it cannot be solved
+        """
+        n = len(self._window)
+        s0, s1, s2, s3, s4 = self._moments
+        # inverse of the symmetric normal matrix from its cofactors
+        c00 = s2 * s4 - s3 * s3
+        c01 = s2 * s3 - s1 * s4
+        c02 = s1 * s3 - s2 * s2
+        c11 = s0 * s4 - s2 * s2
+        c12 = s1 * s2 - s0 * s3
+        c22 = s0 * s2 - s1 * s1
+        det = s0 * c00 + s1 * c01 + s2 * c02
+        # nearly singular normal equations fit noise, e.g. from repeated timestamps
+        if n < 3 or det <= SINGULAR_TOLERANCE * s0 * s2 * s4:
+            return ArcFit(numpy.zeros((3, 3)), self._reference, 0.0, False)
+        coefficients = []
+        explained = 0.0
+        for b0, b1, b2 in self._weighted:
+            a0 = (c00 * b0 + c01 * b1 + c02 * b2) / det
+            a1 = (c01 * b0 + c11 * b1 + c12 * b2) / det
+            a2 = (c02 * b0 + c12 * b1 + c22 * b2) / det
+            coefficients.append((a0, a1, a2))
+            explained += a0 * b0 + a1 * b1 + a2 * b2
+        # sum of squared errors is x.x - c.b at the least squares solution
+        residual = sqrt(max(self._squares - explained, 0.0) / n)
+        valid = n >= self.min_points and residual <= self.max_residual
+        return ArcFit(numpy.array(coefficients).T, self._reference, residual, valid)
+
+    def _accumulate(self, entry: Tuple[float, float, float, float], sign: float) -> None:
+        """Adds an entry to, or with a sign of -1 removes it from, the running sums.
+        """
+        timestamp, x, y, z = entry
+        tau = timestamp - self._reference
+        tau2 = tau * tau
+        s0, s1, s2, s3, s4 = self._moments
+        self._moments = (s0 + sign, s1 + sign * tau, s2 + sign * tau2, s3 + sign * tau2 * tau,
+                         s4 + sign * tau2 * tau2)
+        self._weighted = tuple((b0 + sign * v, b1 + sign * tau * v, b2 + sign * tau2 * v)
+                               for (b0, b1, b2), v in zip(self._weighted, (x, y, z)))
+        self._squares += sign * (x * x + y * y + z * z)
+
+    def _rebase(self, reference: float) -> None:
+        """Moves the sums to a newer reference time, so powers of tau stay small. Shifting polynomial sums only needs
+        the sums themselves, so this takes constant time too.
+        """
+        d = reference - self._reference
+        s0, s1, s2, s3, s4 = self._moments
+        d2 = d * d
+        self._moments = (
+            s0,
+            s1 - d * s0,
+            s2 - 2 * d * s1 + d2 * s0,
+            s3 - 3 * d * s2 + 3 * d2 * s1 - d2 * d * s0,
+            s4 - 4 * d * s3 + 6 * d2 * s2 - 4 * d2 * d * s1 + d2 * d2 * s0
+        )
+        self._weighted = tuple((b0, b1 - d * b0, b2 - 2 * d * b1 + d2 * b0) for b0, b1, b2 in self._weighted)
+        self._reference = reference
+
+    def _clear_sums(self) -> None:
+        """Zeroes the running sums: tau^k for k = 0..4; basis (1, tau, tau^2) times each axis; squared locations.
+        """
+        self._moments = (0.0, 0.0, 0.0, 0.0, 0.0)
+        self._weighted = ((0.0, 0.0, 0.0), (0.0, 0.0, 0.0), (0.0, 0.0, 0.0))
+        self._squares = 0.0
+
+
+def calculate_trajectory(history: Iterable[Tuple[float, Sequence[float]]]) -> ArcFit:
     """Using past locations of object, predict parabola of sword swing.
+    :param history: Timestamps and locations, such as from ``get_location_history``
     :return: Trajectory of estimated swing arc
     """
-    raise NotImplementedError
+    history = list(history)
+    fitter = ArcFitter(max(len(history), 1))
+    fit = fitter.fit()
+    for timestamp, location in sorted(history, key=lambda entry: entry[0]):
+        fit = fitter.add(timestamp, location)
+    return fit
+
+
+def calculate_collision(fit: ArcFit, now: float, workspace: WorkspaceGrid, horizon: float = COLLISION_HORIZON,
+                        samples: int = COLLISION_SAMPLES) -> Optional[Collision]:
+    """Calculate interception point of swing arc and arm workspace. Candidate times over the horizon are checked in
+    one pass, then the first entry is narrowed down between the last candidate outside and the first inside.
+    :param fit: Predicted path of the sword
+    :param now: Earliest time to consider, in the fit's clock
+    :param workspace: Where the arm can block
+    :param horizon: Seconds ahead to look
+    :param samples: Candidate times checked; entries shorter than the gap between them may be missed
+    :return: Earliest time and point the sword can be blocked; ``None`` if there is none within the horizon
+    """
+    taus = (now - fit.reference_time) + horizon * _sample_times(samples)
+    positions = _sample_basis(taus) @ fit.coefficients
+    inside = workspace.flags(positions[:, 0], positions[:, 1], positions[:, 2]) & BLOCKABLE
+    first = int(numpy.argmax(inside))
+    if not inside[first]:
+        return None
+    if first == 0:
+        return Collision(now, positions[0])
+    # bisect the entry, as plain floats since each step is a single point
+    (a0, a1, a2), (b0, b1, b2), (d0, d1, d2) = fit.coefficients.T.tolist()
+    outside_tau = float(taus[first - 1])
+    inside_tau = float(taus[first])
+    for _ in range(COLLISION_REFINEMENTS):
+        tau = (outside_tau + inside_tau) / 2
+        x = a0 + tau * (a1 + tau * a2)
+        y = b0 + tau * (b1 + tau * b2)
+        z = d0 + tau * (d1 + tau * d2)
+        if workspace.blockable((x, y, z)):
+            inside_tau = tau
+        else:
+            outside_tau = tau
+    return Collision(fit.reference_time + inside_tau, fit.position(fit.reference_time + inside_tau))
+
+
+@lru_cache(maxsize=4)
+def _sample_times(samples: int) -> numpy.ndarray:
+    """Gets evenly spaced fractions of the horizon, shared between calls.
+    :return: Read only array from 0 to 1
+    """
+    times = numpy.linspace(0, 1, samples)
+    times.flags.writeable = False
+    return times
 
 
-def calculate_collision() -> numpy.typing.NDArray[numpy.float64]:
-    """Calculate interception point of line and arm workspace.
-    :return: intercept as 3D point
+def _sample_basis(taus: numpy.ndarray) -> numpy.ndarray:
+    """Builds the parabola basis at each time.
+    :return: N x 3 array of 1, tau, tau^2
     """
-    raise NotImplementedError
+    return numpy.stack((numpy.ones_like(taus), taus, taus * taus), axis=1)
 
 
 def simple_trajectory(location: numpy.typing.NDArray[numpy.float64]) -> numpy.typing.NDArray[numpy.float64]:
@@ -0,0 +1,149 @@
+from src.backend.arm_control.kinematics import arm_angles_to_position, BASE_LIMITS, ELBOW_LIMITS, WRIST_LIMITS, D_TO_R
+from src.backend.external_management.connections import (
+    ARM_BASE_LENGTH, ARM_COLLISION_LENGTH, ARM_FORE_LENGTH, ARM_SWORD_LENGTH
+)
+
+from math import ceil
+import numpy
+from os.path import dirname, join, realpath
+from typing import Optional, Sequence, Union
+
+
+WORKSPACE_CACHE = join(dirname(realpath(__file__)), 'workspace_grid.npz')
+VOXEL_SIZE = 0.02  # m
+SAMPLE_SPACING = 0.5  # of a voxel, between sampled sword points, so no voxel the sword passes through is skipped
+COLLISION_TOLERANCE = 0.02  # m; of the collision point's place along the sword, still counted as reachable
+WORKSPACE_VERSION = 1  # raise when the arm model changes, so cached grids are rebuilt
+REACHABLE = 1  # collision point of the sword can be placed in the voxel
+BLOCKABLE = 2  # some part of the sword can be placed in the voxel
+
+
+class WorkspaceGrid:
+    """Voxels of where the arm can reach, for answering whether a point can be blocked with one lookup instead of
+    solving for the arm's angles.
+    """
+
+    def __init__(self, grid: numpy.ndarray, origin: Sequence[float], voxel_size: float):
+        """:param grid: Flags of each voxel, indexed by x, then y, then z
+        :param origin: Metres from base joint to the corner of the first voxel
+        :param voxel_size: Metres along each side of a voxel
+        """
+        self.grid = grid
+        self.origin = numpy.asarray(origin, numpy.float64)
+        self.voxel_size = voxel_size
+        # plain floats and ints, as numpy scalars slow single lookups
+        self._corner = tuple(float(value) for value in self.origin)
+        self._shape = grid.shape
+
+    @classmethod
+    def build(cls, voxel_size: float = VOXEL_SIZE) -> 'WorkspaceGrid':
+        """Marks every voxel the sword passes through over the joints' ranges, one base angle at a time. Takes a few
+        seconds at the default voxel size.
+        :return: Grid
+        """
+        spacing = voxel_size * SAMPLE_SPACING
+        # points over the disc the sword sweeps as the wrist turns, in rings along the sword
+        along = []
+        wrist = []
+        wrist_range = (WRIST_LIMITS[1] - WRIST_LIMITS[0]) * D_TO_R
+        for distance in numpy.arange(0, ARM_SWORD_LENGTH + spacing, spacing):
+            distance = min(distance, ARM_SWORD_LENGTH)
+            count = max(1, ceil(wrist_range * distance / spacing))
+            along.append(numpy.full(count, distance))
+            wrist.append(numpy.linspace(WRIST_LIMITS[0] * D_TO_R, WRIST_LIMITS[1] * D_TO_R, count))
+        along = numpy.concatenate(along)
+        wrist = numpy.concatenate(wrist)
+        collision = numpy.abs(along - ARM_COLLISION_LENGTH) <= COLLISION_TOLERANCE
+        # furthest point from the base joint turns furthest for each step of the base or elbow
+        radius = ARM_FORE_LENGTH + ARM_SWORD_LENGTH
+        bases = _angles(BASE_LIMITS, spacing / radius)
+        elbows = _angles(ELBOW_LIMITS, spacing / radius)
+        reach = radius + voxel_size
+        origin = numpy.array([-reach, -reach, ARM_BASE_LENGTH - reach])
+        shape = numpy.full(3, ceil(2 * reach / voxel_size))
+        grid = numpy.zeros(shape, numpy.uint8)
+        for base in bases:
+            points = numpy.stack(arm_angles_to_position(base, elbows[:, None], wrist, along), axis=-1)
+            indices = ((points - origin) / voxel_size).astype(numpy.intp)
+            grid[indices[..., 0], indices[..., 1], indices[..., 2]] |= BLOCKABLE
+            hit = indices[:, collision]
+            grid[hit[..., 0], hit[..., 1], hit[..., 2]] |= REACHABLE
+        return cls(grid, origin, voxel_size)
+
+    def flags(self, x: Union[float, numpy.ndarray], y: Union[float, numpy.ndarray],
+              z: Union[float, numpy.ndarray]) -> numpy.ndarray:
+        """Looks up the voxels of many points at once.
+        :param x: Metres to right of base joint; float or array, broadcast with y and z
+        :return: Flags of each point's voxel; 0 outside the grid
+        """
+        i = numpy.floor((x - self.origin[0]) / self.voxel_size).astype(numpy.intp)
+        j = numpy.floor((y - self.origin[1]) / self.voxel_size).astype(numpy.intp)
+        k = numpy.floor((z - self.origin[2]) / self.voxel_size).astype(numpy.intp)
+        shape = self._shape
+        inside = (i >= 0) & (i < shape[0]) & (j >= 0) & (j < shape[1]) & (k >= 0) & (k < shape[2])
+        flags = self.grid[numpy.where(inside, i, 0), numpy.where(inside, j, 0), numpy.where(inside, k, 0)]
+        return numpy.where(inside, flags, 0)
+
+    def blockable(self, point: Sequence[float]) -> bool:
+        """Checks whether some part of the sword can be put at a point.
+        """
+        return self._flag(point, BLOCKABLE)
+
+    def reachable(self, point: Sequence[float]) -> bool:
+        """Checks whether the sword's collision point can be put at a point.
+        """
+        return self._flag(point, REACHABLE)
+
+    def _flag(self, point: Sequence[float], flag: int) -> bool:
+        """Checks one flag of the voxel a point is in, without arrays.
+        """
+        corner = self._corner
+        shape = self._shape
+        i = int((point[0] - corner[0]) // self.voxel_size)
+        j = int((point[1] - corner[1]) // self.voxel_size)
+        k = int((point[2] - corner[2]) // self.voxel_size)
+        if not (0 <= i < shape[0] and 0 <= j < shape[1] and 0 <= k < shape[2]):
+            return False
+        return bool(self.grid[i, j, k] & flag)
+
+
+def load_workspace(path: Optional[str] = WORKSPACE_CACHE, voxel_size: float = VOXEL_SIZE) -> WorkspaceGrid:
+    """Reads the workspace grid saved for the current arm, or builds and saves it if there is none or the arm has
+    changed since.
+    :param path: File the grid is cached in; ``None`` to always build
+    :return: Grid
+    """
+    key = _cache_key(voxel_size)
+    if path is not None:
+        try:
+            with numpy.load(path) as cached:
+                if numpy.array_equal(cached['key'], key):
+                    return WorkspaceGrid(cached['grid'], cached['origin'], voxel_size)
+        except (OSError, KeyError, ValueError):
+            pass
+    workspace = WorkspaceGrid.build(voxel_size)
+    if path is not None:
+        try:
+            numpy.savez_compressed(path, grid=workspace.grid, origin=workspace.origin, key=key)
+        except OSError:
+            # still usable, just rebuilt next time
+            pass
+    return workspace
+
+
+def _angles(limits: Sequence[float], step: float) -> numpy.ndarray:
+    """Spaces angles evenly over a joint's range, no further apart than the step.
+    :param limits: Lowest then highest angle in degrees
+    :param step: Radians
+    :return: Radians, including both limits
+    """
+    low, high = limits[0] * D_TO_R, limits[1] * D_TO_R
+    return numpy.linspace(low, high, max(2, ceil((high - low) / step) + 1))
+
+
+def _cache_key(voxel_size: float) -> numpy.ndarray:
+    """Gets everything a grid depends on, to tell whether a cached one is still right.
+    """
+    return numpy.array([WORKSPACE_VERSION, voxel_size, SAMPLE_SPACING, COLLISION_TOLERANCE, ARM_BASE_LENGTH,
+                        ARM_FORE_LENGTH, ARM_COLLISION_LENGTH, ARM_SWORD_LENGTH, *BASE_LIMITS, *ELBOW_LIMITS,
+                        *WRIST_LIMITS])
@@ -0,0 +1,157 @@
+import argparse
+from itertools import product
+import json
+from os.path import dirname, join, realpath
+from time import monotonic
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import cv2
+import numpy
+
+from src.backend.external_management.frame_source import CameraSource, CaptureSettings, FrameSource
+
+
+CAMERA_PROFILE = join(dirname(realpath(__file__)), 'camera_profile.json')
+BACKENDS = (cv2.CAP_DSHOW, cv2.CAP_MSMF, cv2.CAP_ANY)
+RESOLUTIONS = ((20, 20), (320, 240), (640, 480))
+FOURCCS = (None, 'MJPG', 'YUY2')
+BUFFER_SIZES = (None, 1)
+EXPOSURES = (None, -6.0, -4.0)
+MIN_RES = (160, 120)
+WARMUP_FRAMES = 5
+MEASURE_TIME = 2.0  # s per combination
+LATENCY_PERCENTILES = (50, 95, 99)
+FPS_TOLERANCE = 0.05  # fraction of best frame rate treated as equally fast
+
+
+class TuningResult(NamedTuple):
+    """Performance of a camera with some capture settings.
+    """
+    settings: CaptureSettings
+    res: Tuple[float, float]  # resolution the camera actually gave
+    open_time: float  # s
+    fps: float
+    latency: Tuple[float, ...]  # s; time to read a frame at each of LATENCY_PERCENTILES
+
+
+def measure(source: FrameSource, settings: CaptureSettings, duration: float = MEASURE_TIME) -> Optional[TuningResult]:
+    """Opens the source and reads from it as fast as possible for ``duration`` seconds.
+    :return: Result; ``None`` if it failed to open or read
+    """
+    start = monotonic()
+    source.open()
+    open_time = monotonic() - start
+    try:
+        if not source.is_opened():
+            return None
+        for _ in range(WARMUP_FRAMES):
+            if not source.read()[0]:
+                return None
+        read_times = []
+        start = monotonic()
+        now = start
+        while now - start < duration:
+            ret, _ = source.read()
+            if not ret:
+                return None
+            read_times.append(monotonic() - now)
+            now += read_times[-1]
+        res = (source.get(cv2.CAP_PROP_FRAME_WIDTH), source.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    finally:
+        source.release()
+    latency = tuple(float(t) for t in numpy.percentile(read_times, LATENCY_PERCENTILES))
+    return TuningResult(settings, res, open_time, len(read_times) / (now - start), latency)
+
+
+def sweep(
+        index: int,
+        capture_factory: Callable[[int, CaptureSettings], FrameSource] = CameraSource,
+        duration: float = MEASURE_TIME,
+        backends: Sequence[int] = BACKENDS,
+        resolutions: Sequence[Tuple[int, int]] = RESOLUTIONS,
+        fourccs: Sequence[Optional[str]] = FOURCCS,
+        buffer_sizes: Sequence[Optional[int]] = BUFFER_SIZES,
+        exposures: Sequence[Optional[float]] = EXPOSURES,
+        verbose: bool = False
+) -> List[TuningResult]:
+    """Measures every combination of capture settings for a camera.
+    :param capture_factory: Makes an unopened source for a camera index and settings; fake sources allow testing
+    :return: Results of combinations which could be read from
+    """
+    results = []
+    for backend, (width, height), fourcc, buffer_size, exposure in product(
+            backends, resolutions, fourccs, buffer_sizes, exposures):
+        settings = CaptureSettings(backend, width, height, fourcc, buffer_size, exposure)
+        result = measure(capture_factory(index, settings), settings, duration)
+        if result is not None:
+            results.append(result)
+        if verbose:
+            print(f'{index}: {format_result(result) if result is not None else f"{settings} failed"}')
+    return results
+
+
+def best_result(results: List[TuningResult], min_res: Tuple[int, int] = MIN_RES) -> Optional[TuningResult]:
+    """Picks the highest sustained frame rate with at least ``min_res``. Frame rates within ``FPS_TOLERANCE`` of the
+    best are equal; of those the lowest 95th percentile latency, then quickest to open, wins.
+    :return: Best result; ``None`` if none were large enough
+    """
+    results = [r for r in results if r.res[0] >= min_res[0] and r.res[1] >= min_res[1]]
+    if not results:
+        return None
+    best_fps = max(r.fps for r in results)
+    candidates = [r for r in results if r.fps >= best_fps * (1 - FPS_TOLERANCE)]
+    return min(candidates, key=lambda r: (r.latency[1], r.open_time))
+
+
+def format_result(result: TuningResult) -> str:
+    """Summarises a result on one line.
+    :return: Settings, resolution, frame rate, latencies and open time
+    """
+    latency = '/'.join(f'{1000 * t:.1f}' for t in result.latency)
+    return (f'{result.settings} -> {result.res[0]:.0f}x{result.res[1]:.0f} {result.fps:.1f}fps, '
+            f'latency p{"/".join(str(p) for p in LATENCY_PERCENTILES)} {latency}ms, '
+            f'open {1000 * result.open_time:.0f}ms')
+
+
+def load_profile(path: str = CAMERA_PROFILE) -> Dict[int, CaptureSettings]:
+    """Reads tuned capture settings. An unreadable profile is reported and ignored, so cameras still connect with
+    their default settings.
+    :return: Settings by camera index; empty if there is no valid profile
+    """
+    try:
+        with open(path) as f:
+            return {int(index): CaptureSettings(**settings) for index, settings in json.load(f).items()}
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError, TypeError, KeyError, AttributeError) as e:
+        print(f'Ignoring camera profile "{path}": {e!r}')
+        return {}
+
+
+def save_profile(profile: Dict[int, CaptureSettings], path: str = CAMERA_PROFILE) -> None:
+    """Writes tuned capture settings, keeping those of cameras not in ``profile``.
+    """
+    merged = load_profile(path)
+    merged.update(profile)
+    with open(path, 'w') as f:
+        json.dump({str(index): settings._asdict() for index, settings in sorted(merged.items())}, f, indent=4)
+
+
+if __name__ == '__main__':
+    from src.backend.external_management.connections import LEFT_CAM_INDEX, RIGHT_CAM_INDEX
+
+    parser = argparse.ArgumentParser(description='Finds the fastest capture settings for each camera.')
+    parser.add_argument('indices', type=int, nargs='*', default=[LEFT_CAM_INDEX, RIGHT_CAM_INDEX])
+    parser.add_argument('--duration', type=float, default=MEASURE_TIME, help='seconds to read each combination')
+    parser.add_argument('--output', default=CAMERA_PROFILE)
+    args = parser.parse_args()
+    tuned = {}
+    for i in args.indices:
+        best = best_result(sweep(i, duration=args.duration, verbose=True))
+        if best is None:
+            print(f'CAM {i} could not be read at {MIN_RES[0]}x{MIN_RES[1]} or above')
+            continue
+        print(f'{f"Best for CAM {i} ":=<80}\n{format_result(best)}\n')
+        tuned[i] = best.settings
+    save_profile(tuned, args.output)
+    print(f'Saved {len(tuned)} camera(s) to {args.output}')
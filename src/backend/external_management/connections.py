@@ -2,13 +2,27 @@ import cv2
 from math import pi
 from numpy import ndarray
 import serial
-import serial.tools.list_ports
-from time import sleep
-from typing import List, Tuple
+from threading import Thread
+from time import monotonic, sleep
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
 
 from src.backend.error.standby_transition import StandbyTransition
+from src.backend.external_management.camera_tuning import CAMERA_PROFILE, load_profile
+from src.backend.external_management.frame_grabber import FrameGrabber
+from src.backend.external_management.frame_source import FrameSource, CameraSource
+from src.backend.external_management.port_monitor import PortMonitor, is_port_present
+from src.backend.external_management.serial_reader import SerialReader
+from src.backend.external_management.serial_writer import SerialWriter
+from src.backend.external_management.serial_protocol import (
+    Protocol, PacketDecoder, PACKET_SIZE, READY_TIMEOUT, encode_command, encode_text_command, negotiate_protocol,
+    wait_until_ready
+)
 from src.backend.state_management.state_manager import State
 
+if TYPE_CHECKING:
+    # imported only for type hints; vision engine imports tracking, which imports this module
+    from src.backend.sensor_fusion.vision_engine import StereoDetection, VisionEngine
+
 
 LEFT_CAM_INDEX = 1
 RIGHT_CAM_INDEX = 2
@@ -17,6 +31,8 @@ LEFT_CAM_ANGLES = (-pi/8, pi/8)
 CAM_FOV = 70.0 * 2*pi / 360
 SERIAL_PORT = 'COM4'
 SERIAL_BAUD_RATE = 115200
+MAX_FRAME_SKEW = 0.025  # s
+SKEW_RETRIES = 3
 
 ARM_BASE_LENGTH = 0.268  # metres
 ARM_FORE_LENGTH = 0.1665
@@ -24,43 +40,175 @@ ARM_COLLISION_LENGTH = 0.175
 ARM_SWORD_LENGTH = ARM_COLLISION_LENGTH * 2
 
 
+class StereoPair(NamedTuple):
+    """Left and right images taken at (nearly) the same time.
+    """
+    left: ndarray
+    right: ndarray
+    left_time: float
+    right_time: float
+
+    @property
+    def skew(self) -> float:
+        """Seconds between left and right capture.
+        """
+        return abs(self.left_time - self.right_time)
+
+    @property
+    def timestamp(self) -> float:
+        """Monotonic time halfway between left and right capture.
+        """
+        return (self.left_time + self.right_time) / 2
+
+
+def connect_in_parallel(connectors: Dict[str, Callable[[], None]]) -> Dict[str, float]:
+    """Runs each connector on its own thread and waits for all of them to finish.
+    :raise Exception: First error raised by a connector, once all have finished
+    :return: Seconds each connector took, by name
+    """
+    times = {}
+    errors = {}
+
+    def run(name: str, connector: Callable[[], None]):
+        start = monotonic()
+        try:
+            connector()
+        except Exception as e:
+            errors[name] = e
+        times[name] = monotonic() - start
+
+    threads = [Thread(target=run, args=item, name=f'connect-{item[0]}', daemon=True) for item in connectors.items()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for name in connectors:
+        if name in errors:
+            raise errors[name]
+    return times
+
+
 def is_arduino_connected() -> bool:
     """Checks COM ports to ensure arduino is connected.
     :return: True if port is present
     """
-    return SERIAL_PORT in [port.name for port in list(serial.tools.list_ports.comports())]
+    return is_port_present(SERIAL_PORT)
 
 
 class Ext:
 
-    def __init__(self, ignore_motors: bool = False):
+    def __init__(self, ignore_motors: bool = False, threaded_capture: bool = False,
+                 max_frame_skew: float = MAX_FRAME_SKEW,
+                 frame_sources: Optional[Tuple[FrameSource, FrameSource]] = None, reuse_buffers: bool = False,
+                 vision_engine: Optional['VisionEngine'] = None, binary_serial: bool = False,
+                 async_serial: bool = False, serial_telemetry: bool = False, camera_profile: str = CAMERA_PROFILE):
         """Creates and stores all connections to external devices.
+        :param threaded_capture: Read each camera continuously on its own thread so photos are taken without waiting
+        :param max_frame_skew: Seconds left and right images may be apart before the pair is dropped
+        :param frame_sources: Left then right source of images; defaults to the webcams
+        :param reuse_buffers: Read each camera into the same images every time instead of allocating new ones. Photos
+            are then only valid until the next photos are taken.
+        :param vision_engine: Capture and find the object in worker processes, replacing ``frame_sources``
+        :param binary_serial: Send commands as binary packets if the motor controller supports them, and connect as soon
+            as it replies instead of waiting out its boot
+        :param async_serial: Write commands on a background thread, dropping per-frame commands replaced before written
+        :param serial_telemetry: Read motor controller errors and joint angles continuously on a background thread
+        :param camera_profile: Tuned capture settings for webcams, read each time cameras connect
         """
+        if frame_sources is None:
+            frame_sources = (CameraSource(LEFT_CAM_INDEX), CameraSource(RIGHT_CAM_INDEX))
+        self._frame_sources = frame_sources
+        # changes whenever cameras are connected or swapped, so anything describing them can be rebuilt
+        self.camera_generation = 0
+        self.camera_profile = camera_profile
         self._right_cam = None
         self._left_cam = None
         self.cam_res = [0, 0]
         self._arduino = None
-        self.connect_cameras()
+        self.threaded_capture = threaded_capture
+        self._left_grabber = None
+        self._right_grabber = None
+        self._last_seqs = [0, 0]
+        self.max_frame_skew = max_frame_skew
+        self.reuse_buffers = reuse_buffers
+        self._buffers = [None, None]
+        self.vision_engine = vision_engine
+        self.binary_serial = binary_serial
+        self.serial_protocol = Protocol.TEXT
+        self._serial_seq = 0
+        self._packet_decoder = PacketDecoder()
+        self.async_serial = async_serial
+        self._serial_writer = None
+        self._capture_latency = None
+        self.serial_telemetry = serial_telemetry
+        self._serial_reader = None
+        # checks port in background so sending does not have to
+        self.port_monitor = PortMonitor(SERIAL_PORT)
+        # seconds each device took to connect, by name
+        self.connect_times = {}
         self.ignore_motors = ignore_motors
+        self.connect_devices()
+
+    def connect_devices(self):
+        """Opens connections to cameras and motor control at the same time.
+        :raise StandbyTransition: A device could not be connected
+        """
+        connectors = {'cameras': self.connect_cameras}
         if not self.ignore_motors:
-            self.connect_arduino()
+            connectors['arduino'] = self.connect_arduino
+        connect_in_parallel(connectors)
+
+    def reconnect(self):
+        """Closes and reopens all device connections.
+        :raise StandbyTransition: A device could not be connected
+        """
+        self.disconnect_cameras()
+        self.disconnect_arduino()
+        self.connect_devices()
 
     def connect_cameras(self):
         """Opens connection to cameras.
         """
-        self._left_cam = cv2.VideoCapture(LEFT_CAM_INDEX, cv2.CAP_DSHOW)
-        # set to 160x120; trying to set directly those values causes slowdowns (why? idk)
-        self._left_cam.set(cv2.CAP_PROP_FRAME_WIDTH, 20)
-        self._left_cam.set(cv2.CAP_PROP_FRAME_HEIGHT, 20)
-        self._right_cam = cv2.VideoCapture(RIGHT_CAM_INDEX, cv2.CAP_DSHOW)
-        self._right_cam.set(cv2.CAP_PROP_FRAME_WIDTH, 20)
-        self._right_cam.set(cv2.CAP_PROP_FRAME_HEIGHT, 20)
+        self.camera_generation += 1
+        if self.vision_engine is not None:
+            self._apply_camera_profile(self.vision_engine.sources)
+            start = monotonic()
+            self.vision_engine.start()
+            self.connect_times['vision_engine'] = monotonic() - start
+            self.cam_res = self.vision_engine.cam_res
+            return
+        self._apply_camera_profile(self._frame_sources)
+        self._left_cam, self._right_cam = self._frame_sources
+        self.connect_times.update(connect_in_parallel({'left_cam': self._left_cam.open,
+                                                       'right_cam': self._right_cam.open}))
         self.cam_res = (self._left_cam.get(cv2.CAP_PROP_FRAME_WIDTH),
                         self._left_cam.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if self.threaded_capture:
+            self._left_grabber = FrameGrabber(self._left_cam, 'left-cam', self.reuse_buffers)
+            self._right_grabber = FrameGrabber(self._right_cam, 'right-cam', self.reuse_buffers)
+            self._left_grabber.start()
+            self._right_grabber.start()
+            self._last_seqs = [0, 0]
+
+    def _apply_camera_profile(self, sources: Tuple[FrameSource, FrameSource]):
+        """Uses tuned capture settings for webcams in the profile; others keep their own.
+        """
+        profile = load_profile(self.camera_profile)
+        for source in sources:
+            if isinstance(source, CameraSource) and source.index in profile:
+                source.settings = profile[source.index]
 
     def disconnect_cameras(self):
-        """Releases captures.
+        """Stops capture threads and releases captures.
         """
+        if self.vision_engine is not None:
+            self.vision_engine.stop()
+        if self._left_grabber:
+            self._left_grabber.stop()
+            self._left_grabber = None
+        if self._right_grabber:
+            self._right_grabber.stop()
+            self._right_grabber = None
         if self._left_cam:
             self._left_cam.release()
         if self._right_cam:
@@ -69,23 +217,54 @@ class Ext:
     def swap_cameras(self):
         """Switches the "left" camera and the "right" camera in code.
         """
+        self.camera_generation += 1
+        if self.vision_engine is not None:
+            self.vision_engine.swap()
         self._left_cam, self._right_cam = self._right_cam, self._left_cam
+        self._left_grabber, self._right_grabber = self._right_grabber, self._left_grabber
+        self._last_seqs = [self._last_seqs[1], self._last_seqs[0]]
+        self._buffers = [self._buffers[1], self._buffers[0]]
 
     def connect_arduino(self):
         """Opens connection to motor control.
         """
         if self.ignore_motors:
             return
-        if not is_arduino_connected():
+        start = monotonic()
+        self.port_monitor.start()
+        if not self.port_monitor.connected:
             raise StandbyTransition(f'Could not connect to arduino, {SERIAL_PORT} not found')
         self._arduino = serial.Serial(SERIAL_PORT, SERIAL_BAUD_RATE, timeout=1)
-        sleep(2)
+        if not self.binary_serial:
+            # older firmware does not reply to commands, so wait out its boot
+            sleep(READY_TIMEOUT)
+            self.serial_protocol = Protocol.TEXT
+        elif wait_until_ready(self._arduino, encode_text_command(State.STANDBY.value, (0, 0, 0))):
+            self.serial_protocol = negotiate_protocol(self._arduino)
+        else:
+            print(f'No reply from {SERIAL_PORT} within {READY_TIMEOUT}s, sending text commands')
+            self.serial_protocol = Protocol.TEXT
+        self._packet_decoder = PacketDecoder()
+        if self.async_serial:
+            self._serial_writer = SerialWriter(self._arduino)
+            self._serial_writer.start()
+        if self.serial_telemetry:
+            self._serial_reader = SerialReader(self._arduino, self.serial_protocol)
+            self._serial_reader.start()
+        self.connect_times['arduino'] = monotonic() - start
 
     def disconnect_arduino(self):
         """Closes connection to motor control.
         """
         if self.ignore_motors:
             return
+        if self._serial_writer:
+            self._serial_writer.stop()
+            self._serial_writer = None
+        if self._serial_reader:
+            self._serial_reader.stop()
+            self._serial_reader = None
+        self.port_monitor.stop()
         if self._arduino:
             self._arduino.close()
 
@@ -93,12 +272,15 @@ class Ext:
         """Ensures all devices are connected.
         :raise StandbyTransition: At least one device is not reachable/connected.
         """
-        if not self._left_cam or not self._left_cam.isOpened():
+        if self.vision_engine is not None:
+            if not self.vision_engine.is_alive():
+                raise StandbyTransition('Vision workers are not running')
+        elif not self._left_cam or not self._left_cam.is_opened():
             raise StandbyTransition(f'Left camera {LEFT_CAM_INDEX} is not open')
-        if not self._right_cam or not self._right_cam.isOpened():
+        elif not self._right_cam or not self._right_cam.is_opened():
             raise StandbyTransition(f'Right camera {RIGHT_CAM_INDEX} is not open')
         if not self.ignore_motors:
-            if not self._arduino or not is_arduino_connected():
+            if not self._arduino or not self.port_monitor.connected:
                 raise StandbyTransition(f'Arduino is not connected')
             try:
                 serial.Serial(SERIAL_PORT, SERIAL_BAUD_RATE, timeout=1).close()
@@ -107,56 +289,179 @@ class Ext:
                 # serial port is taken
                 pass
 
-    def take_photos(self) -> Tuple[ndarray, ndarray]:
-        """Gets snapshot from both cameras.
-        :return: Arm's left camera image, then arm's right camera image. Image is ``None`` if camera cannot be reached.
+    def take_photos(self) -> StereoPair:
+        """Gets snapshot from both cameras, matched by capture time. Pairs too far apart in time are dropped and
+        retaken.
+        :raise StandbyTransition: A camera failed to read or cameras are out of sync
+        :return: Arm's left camera image, then arm's right camera image, with capture times
+        """
+        for _ in range(SKEW_RETRIES):
+            if self.vision_engine is not None:
+                pair = StereoPair(*self.vision_engine.photos())
+            elif self.threaded_capture:
+                pair = self._take_latest_photos()
+            else:
+                pair = self._grab_photos()
+            if pair.skew <= self.max_frame_skew:
+                return pair
+        raise StandbyTransition(f'Cameras out of sync ({pair.skew * 1000:.1f}ms apart)')
+
+    def take_detections(self) -> 'StereoDetection':
+        """Gets where the vision workers found the object in each camera. Results too far apart in time are dropped
+        and retaken.
+        :raise StandbyTransition: A camera failed to read, the object was not found, or cameras are out of sync
+        :return: Object location in each image, with capture times
         """
-        ret, frame_l = self._left_cam.read()
-        if not ret:
+        for _ in range(SKEW_RETRIES):
+            detection = self.vision_engine.detect(self.max_frame_skew)
+            if detection.skew <= self.max_frame_skew:
+                return detection
+        raise StandbyTransition(f'Cameras out of sync ({detection.skew * 1000:.1f}ms apart)')
+
+    def _grab_photos(self) -> StereoPair:
+        """Grabs from both cameras before decoding either so both images are taken as close together as possible.
+        :raise StandbyTransition: A camera failed to read
+        :return: Pair of images
+        """
+        ret_l = self._left_cam.grab()
+        time_l = monotonic()
+        ret_r = self._right_cam.grab()
+        time_r = monotonic()
+        if ret_l:
+            ret_l, frame_l = self._left_cam.retrieve(self._buffers[0])
+        if not ret_l:
+            raise StandbyTransition(f'Left camera {LEFT_CAM_INDEX} failed to read')
+        if ret_r:
+            ret_r, frame_r = self._right_cam.retrieve(self._buffers[1])
+        if not ret_r:
+            raise StandbyTransition(f'Right camera {RIGHT_CAM_INDEX} failed to read')
+        if self.reuse_buffers:
+            self._buffers = [frame_l, frame_r]
+        return StereoPair(frame_l, frame_r, time_l, time_r)
+
+    def _take_latest_photos(self) -> StereoPair:
+        """Pairs the newest frames read by each camera's capture thread by nearest capture time.
+        :raise StandbyTransition: A camera failed to read
+        :return: Pair of images
+        """
+        if not self._left_grabber.wait(self._last_seqs[0]):
             raise StandbyTransition(f'Left camera {LEFT_CAM_INDEX} failed to read')
-        ret, frame_r = self._right_cam.read()
-        if not ret:
+        if not self._right_grabber.wait(self._last_seqs[1]):
             raise StandbyTransition(f'Right camera {RIGHT_CAM_INDEX} failed to read')
-        return frame_l, frame_r
+        while True:
+            frames_l = self._left_grabber.recent()
+            frames_r = self._right_grabber.recent()
+            # at least one side must be the newest frame so a stale pair is never chosen over a fresh one
+            candidates = [(frames_l[0], r) for r in frames_r] + [(l, frames_r[0]) for l in frames_l[1:]]
+            frame_l, frame_r = min(candidates, key=lambda c: abs(c[0][1] - c[1][1]))
+            # chosen frames may have been replaced while pairing when buffers are reused
+            if self._left_grabber.hold(frame_l[2]) and self._right_grabber.hold(frame_r[2]):
+                break
+        self._last_seqs = [frames_l[0][2], frames_r[0][2]]
+        return StereoPair(frame_l[0], frame_r[0], frame_l[1], frame_r[1])
 
-    def arm_angles(self) -> Tuple[float, float, float]:
-        """Gets angles of all arm joints, from base to end effector.
-        :return: Base angle, then "elbow" angle, then "wrist" angle. Angle is ``None`` if sensor cannot be reached.
+    def arm_angles(self) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+        """Gets latest measured angles of all arm joints, from base to end effector. Needs ``serial_telemetry``.
+        :return: Base angle, then "elbow" angle, then "wrist" angle, in degrees. Angle is ``None`` if sensor cannot be
+            reached.
         """
-        raise NotImplementedError
+        latest = self._serial_reader.latest_angles() if self._serial_reader else None
+        if latest is None:
+            return None, None, None
+        return latest[1]
 
-    def send_serial(self, state: State, angles: List[int] = (0, 0, 0)) -> None:
+    def send_serial(self, state: State, angles: List[int] = (0, 0, 0), captured: Optional[float] = None) -> None:
         """Sends state and target angles for arm to motor control.
+        :param captured: Monotonic time the images the command was made from were captured, to measure latency
         """
         if self.ignore_motors:
+            # nothing is written, so latency is up to when it would have been
+            if captured is not None:
+                self._capture_latency = monotonic() - captured
             return
-        if not is_arduino_connected():
+        if not self.port_monitor.connected:
             if state > State.STANDBY:
                 raise StandbyTransition(f'Arduino disconnected; unable to send over serial')
             else:
                 return
-        command = f'{state.value} {angles[0]} {angles[1]} {angles[2]}\n'
-        try:
-            self._arduino.flush()
-            self._arduino.write(command.encode('utf-8'))
-            return
-        except (serial.serialutil.SerialException, serial.serialutil.SerialTimeoutException):
-            pass
+        if self.serial_protocol == Protocol.BINARY:
+            command = encode_command(state.value, angles, self._serial_seq)
+            self._serial_seq += 1
+        else:
+            command = encode_text_command(state.value, angles)
+        if self._serial_writer:
+            # writing happens later, so an error here is from an earlier command
+            error = self._serial_writer.take_error()
+            # commands made from frames are repeated every frame, so only the newest of a state is worth writing;
+            # others, such as state changes and the return to rest, must all be written
+            self._serial_writer.submit(command, captured, state if captured is not None else None)
+            if error is None:
+                return
+        else:
+            try:
+                self._arduino.flush()
+                self._arduino.write(command)
+                if captured is not None:
+                    self._capture_latency = monotonic() - captured
+                return
+            except (serial.serialutil.SerialException, serial.serialutil.SerialTimeoutException):
+                pass
         if state != State.STANDBY:
-            raise StandbyTransition(f'Error sending message "{command.strip()}" over serial')
+            raise StandbyTransition(f'Error sending message "{state.value} {angles[0]} {angles[1]} {angles[2]}" '
+                                    f'over serial')
+
+    def take_capture_latency(self) -> Optional[float]:
+        """Gets and clears the latest time from capturing images to writing a command made from them.
+        :return: Seconds; ``None`` if no command with a capture time has been written since last called
+        """
+        if self._serial_writer:
+            return self._serial_writer.take_capture_latency()
+        latency, self._capture_latency = self._capture_latency, None
+        return latency
+
+    def serial_stats(self) -> Tuple[int, int, float]:
+        """Gets counters from the background serial writer.
+        :return: Commands written, commands dropped for a newer one, then seconds taken by the last write; all 0 if
+            not writing in the background
+        """
+        if not self._serial_writer:
+            return 0, 0, 0.0
+        return self._serial_writer.sent, self._serial_writer.coalesced, self._serial_writer.write_latency
 
     def recv_serial(self):
-        """Reads line from motor controller.
+        """Reads line (or packet, if using binary protocol) from motor controller.
         :raise StandbyTransition: Error is received or unable to read from motor controller.
         """
         if self.ignore_motors:
             return
+        if self._serial_reader:
+            self.check_serial_errors()
+            return
         try:
-            msg = self._arduino.readline().decode('utf-8').strip()
+            if self.serial_protocol == Protocol.BINARY:
+                packets = self._packet_decoder.feed(self._arduino.read(PACKET_SIZE))
+                if len(packets) == 0:
+                    return
+                # replies carry error code in place of state
+                error_val = packets[-1][0]
+            else:
+                msg = self._arduino.readline().decode('utf-8').strip()
+                if len(msg) == 0:
+                    return
+                error_val = int(msg, 2)
         except serial.serialutil.SerialException:
-            raise StandbyTransition(f'Error reading serial')
-        if len(msg) == 0:
+            raise StandbyTransition('Error reading serial')
+        if error_val != 0:
+            raise StandbyTransition(f'Serial indicated error (error code: {error_val})')
+
+    def check_serial_errors(self):
+        """Raises any error received by the background serial reader since last checked. Does not wait.
+        :raise StandbyTransition: Error is received or unable to read from motor controller.
+        """
+        if not self._serial_reader:
             return
-        error_val = int(msg, 2)
+        error_val, read_error = self._serial_reader.take_error()
+        if read_error is not None:
+            raise StandbyTransition('Error reading serial')
         if error_val != 0:
             raise StandbyTransition(f'Serial indicated error (error code: {error_val})')
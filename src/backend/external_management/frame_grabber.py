@@ -0,0 +1,112 @@
+from collections import deque
+from threading import Condition, Thread
+from time import monotonic
+from typing import List, Tuple
+
+from numpy import ndarray
+
+
+GRAB_TIMEOUT = 1.0  # s
+FRAME_HISTORY = 3
+
+
+class FrameGrabber:
+    """Continuously reads a capture on a background thread, keeping only the latest few frames.
+    """
+
+    def __init__(self, capture, name: str, reuse_buffers: bool = False):
+        """Creates grabber for an already opened capture. Call ``start`` to begin reading.
+        :param reuse_buffers: Read into a fixed pool of images instead of allocating one per frame. A frame given out
+            by ``recent`` is only safe to use after it is passed to ``hold``, and until the next ``hold``.
+        """
+        self.name = name
+        self._capture = capture
+        self._new_frame = Condition()
+        # (frame, timestamp, seq, pool slot)
+        self._frames = deque(maxlen=FRAME_HISTORY)
+        self.reuse_buffers = reuse_buffers
+        # enough for every stored frame, the held frame and the one being read
+        self._pool = [None] * (FRAME_HISTORY + 2)
+        self._held_slot = None
+        self._seq = 0
+        self._failed = False
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Starts the background reading thread.
+        """
+        if self._running:
+            return
+        self._running = True
+        self._failed = False
+        self._thread = Thread(target=self._run, name=f'{self.name}-grabber', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the background reading thread and waits for it to finish.
+        """
+        self._running = False
+        with self._new_frame:
+            self._new_frame.notify_all()
+        if self._thread:
+            self._thread.join(GRAB_TIMEOUT)
+            self._thread = None
+
+    def wait(self, after_seq: int = 0, timeout: float = GRAB_TIMEOUT) -> bool:
+        """Waits until a frame newer than ``after_seq`` has been read. Returns immediately if one already has.
+        :return: False if reading failed or timed out
+        """
+        with self._new_frame:
+            self._new_frame.wait_for(lambda: self._seq > after_seq or self._failed or not self._running, timeout)
+            return self._seq > after_seq and not self._failed
+
+    def recent(self) -> List[Tuple[ndarray, float, int]]:
+        """Gets the most recently read frames.
+        :return: List of (frame, monotonic capture time, sequence number), newest first
+        """
+        with self._new_frame:
+            return [(frame, timestamp, seq) for frame, timestamp, seq, _ in reversed(self._frames)]
+
+    def hold(self, seq: int) -> bool:
+        """Marks a frame as in use so its image is not read over, releasing the previously held frame.
+        :return: False if the frame is no longer stored and may already be overwritten
+        """
+        with self._new_frame:
+            for _, _, frame_seq, slot in self._frames:
+                if frame_seq == seq:
+                    self._held_slot = slot
+                    return True
+            return False
+
+    def _run(self):
+        """Reads frames until stopped, replacing the oldest stored frame each time.
+        """
+        while self._running:
+            slot = self._free_slot() if self.reuse_buffers else None
+            # timestamp between grab and retrieve so decoding time is not counted
+            ret = self._capture.grab()
+            timestamp = monotonic()
+            if ret:
+                if slot is None:
+                    ret, frame = self._capture.retrieve()
+                else:
+                    ret, frame = self._capture.retrieve(self._pool[slot])
+                    self._pool[slot] = frame
+            with self._new_frame:
+                if not ret:
+                    self._failed = True
+                    self._running = False
+                else:
+                    self._seq += 1
+                    self._frames.append((frame, timestamp, self._seq, slot))
+                self._new_frame.notify_all()
+
+    def _free_slot(self) -> int:
+        """Finds a pool image which is neither stored nor held.
+        :return: Index in pool
+        """
+        with self._new_frame:
+            used = {slot for _, _, _, slot in self._frames}
+            used.add(self._held_slot)
+        return next(slot for slot in range(len(self._pool)) if slot not in used)
@@ -0,0 +1,271 @@
+import cv2
+import numpy
+from time import monotonic, sleep
+from typing import Callable, NamedTuple, Optional, Tuple
+
+
+class CaptureSettings(NamedTuple):
+    """Webcam capture settings. ``None`` leaves the camera's default.
+    """
+    backend: int = cv2.CAP_DSHOW
+    # 20x20 gives 160x120; trying to set directly those values causes slowdowns (why? idk)
+    width: int = 20
+    height: int = 20
+    fourcc: Optional[str] = None
+    buffer_size: Optional[int] = None
+    exposure: Optional[float] = None
+
+
+class FrameSource:
+    """Somewhere ``Ext`` can take photos from. Follows the parts of ``cv2.VideoCapture`` used for capture, so
+    implementations can be read the same way as a camera.
+    """
+
+    def open(self) -> None:
+        """Opens (or reopens from the start) the source.
+        """
+        raise NotImplementedError
+
+    def is_opened(self) -> bool:
+        """Checks whether frames can be read.
+        :return: True if open
+        """
+        raise NotImplementedError
+
+    def grab(self) -> bool:
+        """Takes the next frame without decoding it.
+        :return: Success
+        """
+        raise NotImplementedError
+
+    def retrieve(self, image: Optional[numpy.ndarray] = None) -> Tuple[bool, Optional[numpy.ndarray]]:
+        """Decodes the last grabbed frame, into ``image`` if given and the same shape.
+        :return: Success, then the frame
+        """
+        raise NotImplementedError
+
+    def read(self, image: Optional[numpy.ndarray] = None) -> Tuple[bool, Optional[numpy.ndarray]]:
+        """Grabs and retrieves the next frame.
+        :return: Success, then the frame
+        """
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def get(self, prop_id: int) -> float:
+        """Gets a ``cv2.CAP_PROP_*`` property.
+        :return: Property value, 0 if unsupported
+        """
+        raise NotImplementedError
+
+    def set(self, prop_id: int, value: float) -> bool:
+        """Sets a ``cv2.CAP_PROP_*`` property.
+        :return: Success
+        """
+        return False
+
+    def release(self) -> None:
+        """Closes the source.
+        """
+        raise NotImplementedError
+
+
+class CameraSource(FrameSource):
+    """Live webcam.
+    """
+
+    def __init__(self, index: int, settings: CaptureSettings = CaptureSettings()):
+        self.index = index
+        self.settings = settings
+        self._cap = None
+
+    def open(self) -> None:
+        self._cap = cv2.VideoCapture(self.index, self.settings.backend)
+        # format must be set before resolution for some backends to accept it
+        if self.settings.fourcc is not None:
+            self._cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter.fourcc(*self.settings.fourcc))
+        self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.settings.width)
+        self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.settings.height)
+        if self.settings.buffer_size is not None:
+            self._cap.set(cv2.CAP_PROP_BUFFERSIZE, self.settings.buffer_size)
+        if self.settings.exposure is not None:
+            self._cap.set(cv2.CAP_PROP_EXPOSURE, self.settings.exposure)
+
+    def is_opened(self) -> bool:
+        return self._cap is not None and self._cap.isOpened()
+
+    def grab(self) -> bool:
+        return self._cap.grab()
+
+    def retrieve(self, image: Optional[numpy.ndarray] = None) -> Tuple[bool, Optional[numpy.ndarray]]:
+        return self._cap.retrieve(image)
+
+    def read(self, image: Optional[numpy.ndarray] = None) -> Tuple[bool, Optional[numpy.ndarray]]:
+        return self._cap.read(image)
+
+    def get(self, prop_id: int) -> float:
+        return self._cap.get(prop_id)
+
+    def set(self, prop_id: int, value: float) -> bool:
+        return self._cap.set(prop_id, value)
+
+    def release(self) -> None:
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+
+class ReplaySource(FrameSource):
+    """Prerecorded or generated frames. Played as fast as possible, or paced to their frame rate if ``realtime``.
+    """
+
+    def __init__(self, fps: float, realtime: bool = False, loop: bool = False):
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self.index = 0
+        self._opened = False
+        self._start = 0.0
+        self._frame = None
+
+    def open(self) -> None:
+        self.index = 0
+        self._frame = None
+        self._opened = True
+        self._start = monotonic()
+
+    def is_opened(self) -> bool:
+        return self._opened
+
+    def grab(self) -> bool:
+        if not self._opened:
+            return False
+        if self.realtime:
+            wait = self._start + self.index / self.fps - monotonic()
+            if wait > 0:
+                sleep(wait)
+        self._frame = self._next_frame()
+        if self._frame is None and self.loop and self.index > 0:
+            self._restart()
+            self._frame = self._next_frame()
+        if self._frame is None:
+            return False
+        self.index += 1
+        return True
+
+    def retrieve(self, image: Optional[numpy.ndarray] = None) -> Tuple[bool, Optional[numpy.ndarray]]:
+        if self._frame is None:
+            return False, None
+        if image is not None and image.shape == self._frame.shape:
+            numpy.copyto(image, self._frame)
+            return True, image
+        return True, self._frame.copy()
+
+    def get(self, prop_id: int) -> float:
+        if prop_id == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            return self.index
+        return 0
+
+    def release(self) -> None:
+        self._opened = False
+        self._frame = None
+
+    def _next_frame(self) -> Optional[numpy.ndarray]:
+        """Produces the frame at ``self.index``.
+        :return: Frame; ``None`` if there are no more frames
+        """
+        raise NotImplementedError
+
+    def _restart(self) -> None:
+        """Goes back to the first frame when looping. Frame times continue from where they were.
+        """
+        self._start += self.index / self.fps
+        self.index = 0
+
+
+class VideoFileSource(ReplaySource):
+    """Prerecorded video file, or image sequence given as a ``printf`` style pattern (e.g. ``left_%04d.png``).
+    """
+
+    def __init__(self, path: str, fps: Optional[float] = None, realtime: bool = False, loop: bool = False):
+        """:param fps: Playback rate if ``realtime``; defaults to the rate stored in the video
+        """
+        super().__init__(fps if fps is not None else 30.0, realtime, loop)
+        self.path = path
+        self._fps_override = fps is not None
+        self._cap = None
+        self._res = (0.0, 0.0)
+
+    def open(self) -> None:
+        super().open()
+        self._cap = cv2.VideoCapture(self.path)
+        if not self._cap.isOpened():
+            self._opened = False
+            return
+        if not self._fps_override and self._cap.get(cv2.CAP_PROP_FPS) > 0:
+            self.fps = self._cap.get(cv2.CAP_PROP_FPS)
+        self._res = (self._cap.get(cv2.CAP_PROP_FRAME_WIDTH), self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    def get(self, prop_id: int) -> float:
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return self._res[0]
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self._res[1]
+        return super().get(prop_id)
+
+    def release(self) -> None:
+        super().release()
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+    def _next_frame(self) -> Optional[numpy.ndarray]:
+        ret, frame = self._cap.read()
+        return frame if ret else None
+
+    def _restart(self) -> None:
+        super()._restart()
+        self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+
+class GeneratorSource(ReplaySource):
+    """Frames produced in memory, e.g. from a list of images or a synthetic scene.
+    """
+
+    def __init__(self, frames: Callable[[int], Optional[numpy.ndarray]], res: Tuple[int, int], fps: float = 30.0,
+                 realtime: bool = False, loop: bool = False):
+        """:param frames: Gives the frame for an index, or ``None`` after the last frame
+        :param res: Width then height of frames
+        """
+        super().__init__(fps, realtime, loop)
+        self.frames = frames
+        self.res = res
+
+    def get(self, prop_id: int) -> float:
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.res[0]
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.res[1]
+        return super().get(prop_id)
+
+    def _next_frame(self) -> Optional[numpy.ndarray]:
+        return self.frames(self.index)
+
+
+def render_target(
+        res: Tuple[int, int],
+        center: Tuple[float, float],
+        size: Tuple[float, float] = (8, 40),
+        angle: float = 0.0
+) -> numpy.ndarray:
+    """Draws a red bar on a grey background, as the sword would appear to a camera.
+    :param size: Width then length of the bar in pixels
+    :param angle: Degrees of rotation
+    :return: BGR image
+    """
+    image = numpy.full((res[1], res[0], 3), 90, numpy.uint8)
+    box = cv2.boxPoints((center, size, angle))
+    cv2.fillPoly(image, [numpy.round(box).astype(numpy.int32)], (0, 0, 255))
+    return image
@@ -0,0 +1,58 @@
+from threading import Event, Thread
+
+import serial.tools.list_ports
+
+
+PORT_POLL_INTERVAL = 0.25  # s
+
+
+def is_port_present(port: str) -> bool:
+    """Checks COM ports for the given port. Enumerating ports takes several milliseconds.
+    :return: True if port is present
+    """
+    return port in [p.name for p in list(serial.tools.list_ports.comports())]
+
+
+class PortMonitor:
+    """Checks whether a serial port is present at a fixed rate on a background thread, so callers can read whether it
+    is connected without enumerating ports themselves. Unplugging is noticed within ``interval`` seconds.
+    """
+
+    def __init__(self, port: str, interval: float = PORT_POLL_INTERVAL):
+        self.port = port
+        self.interval = interval
+        self.connected = False
+        self._stop = Event()
+        self._thread = None
+
+    def start(self):
+        """Checks the port now, then keeps checking on a background thread.
+        """
+        self.refresh()
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name='port-monitor', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops checking the port. The port counts as disconnected until checked again.
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join(self.interval * 2)
+            self._thread = None
+        self.connected = False
+
+    def refresh(self) -> bool:
+        """Checks the port immediately.
+        :return: True if port is present
+        """
+        self.connected = is_port_present(self.port)
+        return self.connected
+
+    def _run(self):
+        """Refreshes at a fixed rate until stopped.
+        """
+        while not self._stop.wait(self.interval):
+            self.refresh()
@@ -0,0 +1,120 @@
+from binascii import crc_hqx
+from enum import IntEnum
+import struct
+from time import monotonic
+from typing import List, Sequence, Tuple
+
+
+PACKET_SYNC = 0xA5
+# sync, state, base, elbow, wrist, sequence number; followed by CRC-16/CCITT of all of these
+PACKET_BODY = struct.Struct('<BBhhhB')
+PACKET_CRC = struct.Struct('<H')
+PACKET_SIZE = PACKET_BODY.size + PACKET_CRC.size
+CRC_INIT = 0xFFFF
+PROTOCOL_QUERY = b'P?\n'
+PROTOCOL_BINARY_REPLY = b'PB'
+READY_TIMEOUT = 2.0  # s; controller takes up to ~2s to boot after reset
+READY_POLL_INTERVAL = 0.25  # s; between probes, so few are queued while the controller boots
+
+
+class Protocol(IntEnum):
+    TEXT = 0
+    BINARY = 1
+
+
+def encode_text_command(state: int, angles: Sequence[int]) -> bytes:
+    """Formats command as a line of text, as understood by all motor controller versions.
+    :return: Encoded line
+    """
+    return f'{state} {angles[0]} {angles[1]} {angles[2]}\n'.encode('utf-8')
+
+
+def encode_command(state: int, angles: Sequence[int], seq: int) -> bytes:
+    """Packs command into a fixed size binary packet.
+    :return: ``PACKET_SIZE`` bytes
+    """
+    body = PACKET_BODY.pack(PACKET_SYNC, state, angles[0], angles[1], angles[2], seq & 0xFF)
+    return body + PACKET_CRC.pack(crc_hqx(body, CRC_INIT))
+
+
+def decode_packet(packet: bytes) -> Tuple[int, Tuple[int, int, int], int]:
+    """Unpacks a binary packet.
+    :raise ValueError: Packet is the wrong size, is not aligned to the sync byte, or fails its CRC
+    :return: State (or error code in replies), the three angles, then sequence number
+    """
+    if len(packet) != PACKET_SIZE:
+        raise ValueError(f'Packet is {len(packet)} bytes, expected {PACKET_SIZE}')
+    sync, state, base, elbow, wrist, seq = PACKET_BODY.unpack_from(packet)
+    if sync != PACKET_SYNC:
+        raise ValueError(f'Packet starts with {sync:#04x}, expected sync byte {PACKET_SYNC:#04x}')
+    (crc,) = PACKET_CRC.unpack_from(packet, PACKET_BODY.size)
+    if crc != crc_hqx(packet[:PACKET_BODY.size], CRC_INIT):
+        raise ValueError('Packet failed CRC check')
+    return state, (base, elbow, wrist), seq
+
+
+class PacketDecoder:
+    """Splits a stream of bytes into packets, skipping bytes until it finds a sync byte followed by a valid packet.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.dropped_bytes = 0
+
+    def feed(self, data: bytes) -> List[Tuple[int, Tuple[int, int, int], int]]:
+        """Adds received bytes.
+        :return: All packets completed by these bytes, in the order received
+        """
+        self._buffer += data
+        packets = []
+        start = 0
+        while len(self._buffer) - start >= PACKET_SIZE:
+            if self._buffer[start] != PACKET_SYNC:
+                start += 1
+                self.dropped_bytes += 1
+                continue
+            try:
+                packets.append(decode_packet(bytes(self._buffer[start:start + PACKET_SIZE])))
+                start += PACKET_SIZE
+            except ValueError:
+                # sync byte was part of something else; resync from the next byte
+                start += 1
+                self.dropped_bytes += 1
+        del self._buffer[:start]
+        return packets
+
+
+def negotiate_protocol(conn) -> Protocol:
+    """Asks the motor controller whether it understands binary packets. Controllers which do not reply to the query
+    as expected (older firmware) keep using text.
+    :param conn: Open ``serial.Serial``; its timeout limits how long to wait for the reply
+    :return: Protocol to use for commands
+    """
+    conn.reset_input_buffer()
+    conn.write(PROTOCOL_QUERY)
+    reply = conn.read_until(b'\n').strip()
+    conn.reset_input_buffer()
+    return Protocol.BINARY if reply == PROTOCOL_BINARY_REPLY else Protocol.TEXT
+
+
+def wait_until_ready(conn, probe: bytes, timeout: float = READY_TIMEOUT) -> bool:
+    """Sends ``probe`` repeatedly until the motor controller replies, instead of sleeping for its worst case boot time.
+    Opening the port resets the controller, which ignores input until it has booted.
+    :param conn: Open ``serial.Serial``
+    :param probe: Harmless command the controller replies to
+    :return: True if the controller replied within ``timeout`` seconds
+    """
+    port_timeout = conn.timeout
+    conn.timeout = READY_POLL_INTERVAL
+    deadline = monotonic() + timeout
+    try:
+        while monotonic() < deadline:
+            conn.write(probe)
+            if conn.read(1):
+                # let the rest of the reply arrive, then discard it
+                conn.read_until(b'\n')
+                conn.reset_input_buffer()
+                return True
+        return False
+    finally:
+        conn.timeout = port_timeout
@@ -0,0 +1,116 @@
+from collections import deque
+from threading import Lock, Thread
+from time import monotonic
+from typing import List, Optional, Tuple
+
+import serial
+
+from src.backend.external_management.serial_protocol import Protocol, PacketDecoder
+
+
+TELEMETRY_HISTORY = 64
+STOP_TIMEOUT = 2.0  # s; reads wait up to the port timeout
+
+
+class SerialReader:
+    """Reads messages from the motor controller on a background thread.
+    Text controllers send lines of either an error code in binary digits (e.g. ``101``) or measured joint angles in
+    degrees (``<base> <elbow> <wrist>``). Binary controllers send packets carrying both, with the error code in place
+    of the state.
+    """
+
+    def __init__(self, conn: serial.Serial, protocol: Protocol):
+        self._conn = conn
+        self._protocol = protocol
+        self._lock = Lock()
+        # (timestamp, (base, elbow, wrist)), newest last
+        self._angles = deque(maxlen=TELEMETRY_HISTORY)
+        self._error_code = 0
+        self.error = None
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Starts the background reading thread.
+        """
+        if self._running:
+            return
+        self._running = True
+        self._thread = Thread(target=self._run, name='serial-reader', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the background reading thread.
+        """
+        self._running = False
+        if self._thread:
+            self._thread.join(STOP_TIMEOUT)
+            self._thread = None
+
+    def latest_angles(self) -> Optional[Tuple[float, Tuple[float, float, float]]]:
+        """Gets the most recently measured joint angles.
+        :return: Monotonic time received, then base, elbow and wrist angles in degrees; ``None`` if none received
+        """
+        with self._lock:
+            return self._angles[-1] if self._angles else None
+
+    def angle_history(self) -> List[Tuple[float, Tuple[float, float, float]]]:
+        """Gets recently measured joint angles.
+        :return: List of time received and angles, newest first
+        """
+        with self._lock:
+            return list(reversed(self._angles))
+
+    def take_error(self) -> Tuple[int, Optional[Exception]]:
+        """Gets and clears the first error code received, and any error raised while reading, since last called.
+        :return: Error code (0 if none), then exception (``None`` if none)
+        """
+        with self._lock:
+            error_code, self._error_code = self._error_code, 0
+            error, self.error = self.error, None
+            return error_code, error
+
+    def _run(self):
+        """Reads and parses messages until stopped.
+        """
+        decoder = PacketDecoder()
+        line = bytearray()
+        while self._running:
+            try:
+                data = self._conn.read(max(1, self._conn.in_waiting))
+            except serial.serialutil.SerialException as e:
+                with self._lock:
+                    self.error = e
+                self._running = False
+                return
+            timestamp = monotonic()
+            if self._protocol == Protocol.BINARY:
+                for error_code, angles, _ in decoder.feed(data):
+                    self._store(timestamp, error_code, angles)
+                continue
+            line += data
+            while b'\n' in line:
+                end = line.index(b'\n')
+                self._parse_line(timestamp, line[:end].decode('utf-8', 'replace').strip())
+                del line[:end + 1]
+
+    def _parse_line(self, timestamp: float, msg: str):
+        """Stores a text message from the controller. Unrecognised lines are ignored.
+        """
+        values = msg.split(' ')
+        try:
+            if len(values) == 1 and len(msg) > 0:
+                self._store(timestamp, int(msg, 2), None)
+            elif len(values) == 3:
+                self._store(timestamp, 0, (float(values[0]), float(values[1]), float(values[2])))
+        except ValueError:
+            pass
+
+    def _store(self, timestamp: float, error_code: int, angles: Optional[Tuple[float, float, float]]):
+        """Records a message, keeping the first error code until it is taken.
+        """
+        with self._lock:
+            if angles is not None:
+                self._angles.append((timestamp, angles))
+            if error_code != 0 and self._error_code == 0:
+                self._error_code = error_code
@@ -0,0 +1,100 @@
+from collections import deque
+from threading import Condition, Thread
+from time import monotonic
+from typing import Hashable, Optional
+
+import serial
+
+
+STOP_TIMEOUT = 1.0  # s
+
+
+class SerialWriter:
+    """Writes commands to the motor controller on a background thread so the caller never waits on the port.
+    Commands are written in order. A command given a kind replaces the last unwritten command if it is of the same
+    kind, so setpoints made from each frame do not queue up behind a slow port, while state changes are never dropped.
+    """
+
+    def __init__(self, conn: serial.Serial):
+        self._conn = conn
+        self._mailbox = Condition()
+        self._pending = deque()  # command, submit time, capture time, kind
+        self._capture_latency = None
+        self._running = False
+        self._thread = None
+        self.error = None
+        self.sent = 0
+        self.coalesced = 0
+        self.write_latency = 0.0  # s, from submission until written out of the port
+
+    def start(self):
+        """Starts the background writing thread.
+        """
+        if self._running:
+            return
+        self._running = True
+        self._thread = Thread(target=self._run, name='serial-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Writes any commands still waiting, then stops the background writing thread.
+        """
+        with self._mailbox:
+            self._running = False
+            self._mailbox.notify_all()
+        if self._thread:
+            self._thread.join(STOP_TIMEOUT)
+            self._thread = None
+
+    def submit(self, command: bytes, captured: Optional[float] = None, kind: Optional[Hashable] = None):
+        """Adds a command to write after those not yet written.
+        :param captured: Monotonic time the images the command was made from were captured, if any
+        :param kind: Replaces the last unwritten command instead if it has the same kind; ``None`` to never replace
+        """
+        with self._mailbox:
+            if kind is not None and self._pending and self._pending[-1][3] == kind:
+                self._pending.pop()
+                self.coalesced += 1
+            self._pending.append((command, monotonic(), captured, kind))
+            self._mailbox.notify_all()
+
+    def take_capture_latency(self) -> Optional[float]:
+        """Gets and clears the time from capture to written out of the port of the last written command that had a
+        capture time.
+        :return: Seconds; ``None`` if no such command written since last called
+        """
+        with self._mailbox:
+            latency, self._capture_latency = self._capture_latency, None
+            return latency
+
+    def take_error(self) -> Optional[Exception]:
+        """Gets and clears the last error raised while writing.
+        :return: Exception; ``None`` if there was none
+        """
+        with self._mailbox:
+            error, self.error = self.error, None
+            return error
+
+    def _run(self):
+        """Writes commands as they arrive until stopped and nothing is left to write.
+        """
+        while True:
+            with self._mailbox:
+                self._mailbox.wait_for(lambda: self._pending or not self._running)
+                if not self._pending:
+                    return
+                command, submitted, captured, _ = self._pending.popleft()
+            try:
+                self._conn.write(command)
+                # wait for command to leave the port; setpoints submitted meanwhile replace each other
+                self._conn.flush()
+            except (serial.serialutil.SerialException, serial.serialutil.SerialTimeoutException) as e:
+                with self._mailbox:
+                    self.error = e
+                continue
+            written = monotonic()
+            with self._mailbox:
+                self.sent += 1
+                self.write_latency = written - submitted
+                if captured is not None:
+                    self._capture_latency = written - captured
@@ -0,0 +1,34 @@
+import tracemalloc
+
+
+class AllocationCounter:
+    """Measures how much memory is allocated during each loop. Covers Python objects and numpy arrays, including
+    images returned by OpenCV. Tracing slows everything down, so only enable it when checking allocations.
+    """
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.start_bytes = 0
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def start_loop(self):
+        """Start counting allocations for a new loop.
+        """
+        if not self.enabled:
+            return
+        tracemalloc.reset_peak()
+        self.start_bytes = tracemalloc.get_traced_memory()[0]
+
+    def allocated(self) -> int:
+        """Gets the most memory allocated at once since the loop started, including memory since freed.
+        :return: Bytes allocated; 0 if not enabled
+        """
+        if not self.enabled:
+            return 0
+        return tracemalloc.get_traced_memory()[1] - self.start_bytes
+
+    def end(self):
+        """Stop tracing allocations.
+        """
+        if self.enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
@@ -1,53 +1,86 @@
+from math import isnan
 from os import listdir
-from typing import List
+from typing import List, Optional
 
+METRIC_SEPARATOR = ' | '
 
-def print_analysis(section_title: str, times: List[float]):
+
+def print_analysis(section_title: str, times: List[float], unit: str = 'ms'):
     """Prints statistics about a timed section.
     """
     print(f'{section_title + ' ':=<40}')
-    print(f'Minimum: {min(times):.3f}ms')
-    print(f'Average: {sum(times) / len(times):.3f}ms')
-    print(f'Maximum: {max(times):.3f}ms')
+    if not times:
+        print('Not recorded')
+        return
+    print(f'Minimum: {min(times):.3f}{unit}')
+    print(f'Average: {sum(times) / len(times):.3f}{unit}')
+    print(f'Maximum: {max(times):.3f}{unit}')
 
 
-def print_loop_time(section_titles: List[str], times: List[float]):
-    """Prints times for each section in a given loop.
+def print_loop_time(section_titles: List[str], times: List[float],
+                    metric_titles: Optional[List[str]] = None, values: Optional[List[float]] = None):
+    """Prints times for each section in a given loop, followed by any metrics.
     """
-    tn = len(times)
     to_print = []
-    for t in range(1, tn):
-        to_print.append(f'{section_titles[t-1]}:{(times[t]-times[t-1])*1000:06.2f}ms')
-    print(f'{' '.join(to_print)} | {(times[tn-1]-times[0])*1000:06.2f}ms')
-
+    for t in range(1, len(times)):
+        # sections a loop did not reach are left as -1
+        if times[t] >= 0 and times[t-1] >= 0:
+            to_print.append(f'{section_titles[t-1]}:{(times[t]-times[t-1])*1000:06.2f}ms')
+    line = f'{' '.join(to_print)} | {(max(times)-times[0])*1000:06.2f}ms'
+    if metric_titles:
+        line += ' | ' + ' '.join(f'{title}:{value:.2f}' for title, value in zip(metric_titles, values))
+    print(line)
 
-if __name__ == '__main__':
-    # find logs ===========================================
-    choice = -1
-    logs = list(filter(lambda x: x.endswith('log'), listdir()))
-    while choice <= 0 or choice > len(logs):
-        for i, log in enumerate(logs):
-            print(f'{i+1}: {log}')
-        choice = int(input('Select which log to analyse: '))
-    log = logs[choice-1]
 
-    # read selected logs ==================================
-    print(f'Analysing log file "{log}"...')
+def analyse_log_file(log: str, print_loops: bool = True):
+    """Reads a timer log and prints statistics for each section and metric.
+    """
     with open(log, 'r') as file:
         # setup
-        sections = file.readline().strip().split(' ')
+        header = file.readline().strip().split(METRIC_SEPARATOR)
+        sections = header[0].split(' ')
+        metrics = header[1].split(' ') if len(header) > 1 else []
         section_times = [[] for _ in range(len(sections))]
+        metric_values = [[] for _ in range(len(metrics))]
         all_times = []
         # read
         line = file.readline().strip()
         while len(line) > 0:
-            times = line.split(' ')
-            print_loop_time(sections, [float(t) for t in times])
+            columns = line.split(METRIC_SEPARATOR)
+            times = [float(t) for t in columns[0].split(' ')]
+            values = [float(v) for v in columns[1].split(' ')] if metrics else []
+            if print_loops:
+                print_loop_time(sections, times, metrics, values)
+            # loops which ended early, or skip sections in some states, leave unfinished sections as -1
             for i in range(len(sections)):
-                section_times[i].append(1000 * (float(times[i+1]) - float(times[i])))
-            all_times.append(1000 * (float(times[len(sections)]) - float(times[0])))
+                if times[i] >= 0 and times[i+1] >= 0:
+                    section_times[i].append(1000 * (times[i+1] - times[i]))
+            # up to the end of the last section reached
+            all_times.append(1000 * (max(times) - times[0]))
+            for i in range(len(metrics)):
+                # metrics not recorded in a loop are logged as nan
+                if not isnan(values[i]):
+                    metric_values[i].append(values[i])
             line = file.readline().strip(' ')
     # analyse logs ========================================
     for i, section in enumerate(sections):
         print_analysis(section.upper(), section_times[i])
     print_analysis('ALL', all_times)
+    for i, metric in enumerate(metrics):
+        if metric_values[i]:
+            print_analysis(metric.upper(), metric_values[i], '')
+
+
+if __name__ == '__main__':
+    # find logs ===========================================
+    choice = -1
+    logs = list(filter(lambda x: x.endswith('log'), listdir()))
+    while choice <= 0 or choice > len(logs):
+        for i, log in enumerate(logs):
+            print(f'{i+1}: {log}')
+        choice = int(input('Select which log to analyse: '))
+    log = logs[choice-1]
+
+    # read selected logs ==================================
+    print(f'Analysing log file "{log}"...')
+    analyse_log_file(log)
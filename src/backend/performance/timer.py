@@ -1,26 +1,35 @@
+from math import nan
 from time import monotonic
 from typing import List, Optional
 from os.path import dirname, realpath, join
 
-from src.backend.performance.analyse_log import print_loop_time
+from src.backend.performance.analyse_log import print_loop_time, METRIC_SEPARATOR
 
 PERFORMANCE_LOG_NAME = 'performance'
 
 
 class Timer:
-    """For timing segments of runtime loop to analyze where time can be saved.
+    """For timing segments of runtime loop to analyze where time can be saved. Other per-loop values can be logged
+    alongside the times as metrics.
     """
-    def __init__(self, sections: List[str], log_name: Optional[str] = None, verbose_freq: Optional[int] = None):
+    def __init__(self, sections: List[str], log_name: Optional[str] = None, verbose_freq: Optional[int] = None,
+                 metrics: Optional[List[str]] = None):
         self.sections = sections
         self.tn = len(sections) + 1
+        self.metrics = metrics if metrics is not None else []
+        self.metric_indices = {metric: i for i, metric in enumerate(self.metrics)}
         self.verbose_freq = verbose_freq
         self.print_counter = 0
         self.times = None
+        self.values = None
         self.segment = 0
         self.log = log_name is not None
         if self.log:
             self.log_file = open(join(dirname(realpath(__file__)), log_name + '.log'), 'w')
-            self.log_file.write(' '.join(self.sections) + '\n')
+            header = ' '.join(self.sections)
+            if self.metrics:
+                header += METRIC_SEPARATOR + ' '.join(self.metrics)
+            self.log_file.write(header + '\n')
 
     def start_loop(self):
         """Write loop to file and start new timer for next loop.
@@ -29,14 +38,18 @@ class Timer:
             # print old times
             if self.print_counter + 1 == self.verbose_freq:
                 self.print_counter = 0
-                print_loop_time(self.sections, self.times)
+                print_loop_time(self.sections, self.times, self.metrics, self.values)
             else:
                 self.print_counter += 1
             # write old times to file
             if self.log:
-                self.log_file.write(' '.join(str(t) for t in self.times) + '\n')
+                line = ' '.join(str(t) for t in self.times)
+                if self.metrics:
+                    line += METRIC_SEPARATOR + ' '.join(str(v) for v in self.values)
+                self.log_file.write(line + '\n')
         # setup new times
         self.times = [-1.0] * self.tn
+        self.values = [nan] * len(self.metrics)
         self.segment = 1
         self.times[0] = monotonic()
 
@@ -46,6 +59,11 @@ class Timer:
         self.times[self.segment] = monotonic()
         self.segment += 1
 
+    def record(self, metric: str, value: float):
+        """Store value of a metric for the current loop.
+        """
+        self.values[self.metric_indices[metric]] = value
+
     def end(self):
         """Stop timing and finish writing log file.
         """
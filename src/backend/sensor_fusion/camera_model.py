@@ -0,0 +1,68 @@
+from src.backend.external_management.connections import CAM_FOV, LEFT_CAM_ANGLES
+
+from math import cos, sin
+import numpy
+from typing import Optional, Sequence, Tuple
+
+
+class CameraModel:
+    """Direction from a camera through points in its images, in the arm frame. Gives the same rays as ``create_ray``
+    followed by ``angles_to_vector`` with the camera's mounting angles added, with the per resolution parts worked out
+    once. Pixel coordinates may be sub-pixel.
+    """
+
+    def __init__(self, res: Sequence[float], yaw: float, pitch: float, fov: float = CAM_FOV):
+        """:param res: Width then height of images in pixels
+        :param yaw: Radians the camera is turned about the vertical axis, added to the ray's x angle
+        :param pitch: Radians the camera is tilted up, added to the ray's y angle
+        :param fov: Horizontal field of view in radians; vertical is scaled from it by the aspect ratio
+        """
+        self.res = (int(res[0]), int(res[1]))
+        vertical_fov = (res[1] / res[0]) * fov
+        # angles are linear in pixel coordinates
+        self._scale_x = fov / res[0]
+        self._offset_x = yaw - fov / 2
+        self._scale_y = -vertical_fov / res[1]
+        self._offset_y = pitch + vertical_fov / 2
+
+    def ray(self, pixel_x: float, pixel_y: float) -> Tuple[float, float, float]:
+        """Finds the direction through a point in the image.
+        :return: Unit vector in the arm frame
+        """
+        angle_x = pixel_x * self._scale_x + self._offset_x
+        angle_y = pixel_y * self._scale_y + self._offset_y
+        cos_y = cos(angle_y)
+        return sin(angle_x) * cos_y, cos(angle_x) * cos_y, sin(angle_y)
+
+    def rays(self, pixels: numpy.ndarray) -> numpy.ndarray:
+        """Finds the directions through many points at once.
+        :param pixels: N x 2 array of x, y pixel coordinates
+        :return: N x 3 array of unit vectors in the arm frame
+        """
+        angle_x = pixels[:, 0] * self._scale_x + self._offset_x
+        angle_y = pixels[:, 1] * self._scale_y + self._offset_y
+        cos_y = numpy.cos(angle_y)
+        return numpy.stack((numpy.sin(angle_x) * cos_y, numpy.cos(angle_x) * cos_y, numpy.sin(angle_y)), axis=-1)
+
+
+class StereoCameras:
+    """Models of the left and right cameras, rebuilt only when the images they describe change.
+    """
+
+    def __init__(self):
+        self.left: Optional[CameraModel] = None
+        self.right: Optional[CameraModel] = None
+        self._key = None
+
+    def update(self, cam_res: Sequence[float], generation: int) -> bool:
+        """Rebuilds both models if the resolution or camera generation differs from when they were built.
+        :param generation: Changes whenever cameras are reconnected or swapped
+        :return: True if rebuilt
+        """
+        key = (int(cam_res[0]), int(cam_res[1]), generation)
+        if key == self._key:
+            return False
+        self.left = CameraModel(cam_res, LEFT_CAM_ANGLES[0], LEFT_CAM_ANGLES[1])
+        self.right = CameraModel(cam_res, -LEFT_CAM_ANGLES[0], LEFT_CAM_ANGLES[1])
+        self._key = key
+        return True
@@ -0,0 +1,240 @@
+from src.backend.error.standby_transition import StandbyTransition
+from src.backend.sensor_fusion.segmentation import TARGET_RANGES, colour_table, lookup_mask, packed_image
+from src.backend.sensor_fusion.tracking import MORPH_KERNEL, largest_contour_pose
+
+import cv2
+import numpy
+from typing import Optional, Sequence, Tuple
+
+
+ROI_MARGIN = 0.5  # fraction of the object's size added on each side of its bounding box
+ROI_VELOCITY_GAIN = 2.0  # frames of the object's movement added on each side, as well as moving the box ahead
+PYRAMID_MARGIN = 2  # downsampled pixels added on each side of the object when refining at full resolution
+
+
+class Detection:
+    """Object found in an image. Its centre is the sub-pixel centroid of its outline; its orientation is only worked
+    out when first asked for.
+    """
+
+    def __init__(self, contour: numpy.ndarray):
+        """:param contour: Outline of the object, as found by ``cv2.findContours``
+        """
+        self.contour = contour
+        moments = cv2.moments(contour)
+        if moments['m00'] > 0:
+            self.center = (moments['m10'] / moments['m00'], moments['m01'] / moments['m00'])
+        else:
+            # outline of a line or point has no area
+            mean = contour.reshape(-1, 2).mean(axis=0)
+            self.center = (float(mean[0]), float(mean[1]))
+        self._angle = None
+
+    @property
+    def angle(self) -> float:
+        """Rotation of the smallest rectangle around the object, as given by ``find_in_image``.
+        :return: Degrees
+        """
+        if self._angle is None:
+            self._angle = cv2.minAreaRect(self.contour)[2]
+        return self._angle
+
+
+class Detector:
+    """Finds the object in images from one camera, as ``find_in_image`` does. Working images are kept between
+    calls and written into, so a steady stream of same sized frames does not allocate new ones.
+    With ``track_roi``, only a region of interest around where the object was last found is searched, grown and
+    moved ahead by how fast it is moving. The whole image is searched when there is no region, or when the object is
+    not found entirely inside it.
+    With ``lookup``, images are thresholded with a colour lookup table in one pass instead of converting to HSV and
+    checking each range.
+    With ``pyramid_scale`` above 1, whole images are first searched downsampled by that factor, then only the matching
+    part of the full resolution image is searched to find the object precisely. The whole full resolution image is
+    still searched if the object is too small to be found downsampled.
+    """
+
+    def __init__(self, track_roi: bool = False, lookup: bool = False,
+                 ranges: Sequence[Tuple[numpy.ndarray, numpy.ndarray]] = TARGET_RANGES, pyramid_scale: int = 1):
+        """:param ranges: Lower then upper HSV bounds of the target colour
+        :param pyramid_scale: Factor whole images are downsampled by before searching; 1 to search at full resolution
+        """
+        self.track_roi = track_roi
+        self.pyramid_scale = pyramid_scale
+        self._lookup = lookup
+        self._ranges = ranges
+        self._table = colour_table(ranges) if lookup else None
+        self.roi = None  # x, y, width, height searched next; None for the whole image
+        self.hits = 0  # found inside the region of interest
+        self.misses = 0  # not found inside the region of interest, so the whole image was searched
+        self.full_searches = 0
+        self.coarse_misses = 0  # not found downsampled, so the whole full resolution image was searched
+        self.processed_area = 0  # pixels searched for the last image, downsampled or not
+        self._last_center = None
+        self._velocity = (0, 0)  # pixels per frame
+        self._shape = None
+        self._hsv = None
+        self._mask = None
+        self._mask_2 = None
+        self._closed = None
+        self._packed = None
+        self._scale = 1  # pyramid scale working images were made for
+        self._coarse = None  # searches downsampled images
+        self._small = None
+
+    @property
+    def ranges(self) -> Sequence[Tuple[numpy.ndarray, numpy.ndarray]]:
+        """HSV bounds of the target colour.
+        """
+        return self._ranges
+
+    @ranges.setter
+    def ranges(self, ranges: Sequence[Tuple[numpy.ndarray, numpy.ndarray]]):
+        self._ranges = ranges
+        if self._lookup:
+            self._table = colour_table(ranges)
+        if self._coarse is not None:
+            self._coarse.ranges = ranges
+
+    def find(self, image: numpy.ndarray) -> Tuple[Tuple[int, int], float]:
+        """Finds the pixel coordinates of the centre of the object in the image.
+        :raise StandbyTransition: Unable to locate an object in the image similar enough to the target colour
+        :return: Pixel location, (x, y) from top left, angle from upwards
+        """
+        return largest_contour_pose((self.detect(image).contour,))
+
+    def detect(self, image: numpy.ndarray) -> Detection:
+        """Finds the object in the image, with its centre to sub-pixel precision.
+        :raise StandbyTransition: Unable to locate an object in the image similar enough to the target colour
+        :return: Object found
+        """
+        if image.shape != self._shape or self.pyramid_scale != self._scale:
+            self._allocate(image.shape)
+            self.reset()
+        self.processed_area = 0
+        contour = None
+        if self.roi is not None:
+            contour = self._search(image, self.roi)
+            if contour is None or self._clipped(cv2.boundingRect(contour), self.roi):
+                contour = None
+                self.misses += 1
+            else:
+                self.hits += 1
+        if contour is None:
+            self.full_searches += 1
+            contour = self._search_whole(image)
+        if contour is None:
+            self.reset()
+            raise StandbyTransition('Unable to determine possible location of sword')
+        detection = Detection(contour)
+        if self.track_roi:
+            self._track(contour, detection.center)
+        return detection
+
+    def reset(self):
+        """Forgets where the object was, so the next image is searched entirely.
+        """
+        self.roi = None
+        self._last_center = None
+        self._velocity = (0, 0)
+
+    def _search_whole(self, image: numpy.ndarray) -> Optional[numpy.ndarray]:
+        """Finds the largest target coloured contour anywhere in the image, coarse to fine if using a pyramid.
+        :return: Contour; ``None`` if none were found
+        """
+        region = self._coarse_region(image) if self._coarse is not None else None
+        if region is not None:
+            contour = self._search(image, region)
+            if contour is not None and not self._clipped(cv2.boundingRect(contour), region):
+                return contour
+        if self._coarse is not None:
+            self.coarse_misses += 1
+        return self._search(image, (0, 0, image.shape[1], image.shape[0]))
+
+    def _coarse_region(self, image: numpy.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """Finds the object in a downsampled copy of the image.
+        :return: Full resolution x, y, width, height around the object; ``None`` if not found
+        """
+        height, width = self._small.shape[:2]
+        # area averaging is several times slower beyond halving, and the full resolution search corrects any aliasing
+        cv2.resize(image, (width, height), dst=self._small, interpolation=cv2.INTER_LINEAR)
+        self.processed_area += width * height
+        contour = self._coarse._search(self._small, (0, 0, width, height))
+        if contour is None:
+            return None
+        x, y, w, h = cv2.boundingRect(contour)
+        # downsampled pixels cover pyramid_scale full resolution pixels, plus any remainder at the far edges
+        left = max(0, (x - PYRAMID_MARGIN) * self.pyramid_scale)
+        top = max(0, (y - PYRAMID_MARGIN) * self.pyramid_scale)
+        right = self._shape[1] if x + w + PYRAMID_MARGIN >= width else (x + w + PYRAMID_MARGIN) * self.pyramid_scale
+        bottom = self._shape[0] if y + h + PYRAMID_MARGIN >= height else (y + h + PYRAMID_MARGIN) * self.pyramid_scale
+        return left, top, right - left, bottom - top
+
+    def _search(self, image: numpy.ndarray, region: Tuple[int, int, int, int]) -> Optional[numpy.ndarray]:
+        """Finds the largest target coloured contour in part of the image, working in the same part of each working
+        image.
+        :return: Contour in whole image coordinates; ``None`` if none were found
+        """
+        x, y, w, h = region
+        self.processed_area += w * h
+        mask = self._mask[y:y + h, x:x + w]
+        closed = self._closed[y:y + h, x:x + w]
+        if self._lookup:
+            lookup_mask(image[y:y + h, x:x + w], self._packed[y:y + h, x:x + w], self._table, mask)
+        else:
+            hsv = self._hsv[y:y + h, x:x + w]
+            mask_2 = self._mask_2[y:y + h, x:x + w]
+            cv2.cvtColor(image[y:y + h, x:x + w], cv2.COLOR_BGR2HSV, dst=hsv)
+            for i, (lower, upper) in enumerate(self._ranges):
+                cv2.inRange(hsv, lower, upper, dst=mask if i == 0 else mask_2)
+                if i > 0:
+                    # ranges do not overlap, so or-ing is the same as adding
+                    cv2.bitwise_or(mask, mask_2, dst=mask)
+        cv2.morphologyEx(mask, cv2.MORPH_CLOSE, MORPH_KERNEL, dst=closed)
+        contours, _ = cv2.findContours(closed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=(x, y))
+        return max(contours, key=cv2.contourArea) if contours else None
+
+    def _clipped(self, box: Tuple[int, int, int, int], region: Tuple[int, int, int, int]) -> bool:
+        """Checks whether a bounding box found in part of the image touches an edge of the part which is not also an
+        edge of the image, so the object may continue outside of it.
+        :return: True if the object may be cut off
+        """
+        x, y, w, h = box
+        rx, ry, rw, rh = region
+        return ((x <= rx and rx > 0) or (y <= ry and ry > 0) or
+                (x + w >= rx + rw and rx + rw < self._shape[1]) or (y + h >= ry + rh and ry + rh < self._shape[0]))
+
+    def _track(self, contour: numpy.ndarray, center: Tuple[float, float]):
+        """Sets the region of interest for the next image around the object, moved ahead and grown by its velocity.
+        """
+        if self._last_center is not None:
+            self._velocity = (center[0] - self._last_center[0], center[1] - self._last_center[1])
+        self._last_center = center
+        x, y, w, h = cv2.boundingRect(contour)
+        vx, vy = self._velocity
+        margin = ROI_MARGIN * max(w, h)
+        margin_x = margin + ROI_VELOCITY_GAIN * abs(vx)
+        margin_y = margin + ROI_VELOCITY_GAIN * abs(vy)
+        left = max(0, int(min(x, x + vx) - margin_x))
+        top = max(0, int(min(y, y + vy) - margin_y))
+        right = min(self._shape[1], int(max(x + w, x + w + vx) + margin_x) + 1)
+        bottom = min(self._shape[0], int(max(y + h, y + h + vy) + margin_y) + 1)
+        self.roi = (left, top, right - left, bottom - top)
+
+    def _allocate(self, shape: Tuple[int, ...]):
+        """Creates working images for frames of the given shape.
+        """
+        self._shape = shape
+        self._hsv = numpy.empty(shape, numpy.uint8)
+        self._mask = numpy.empty(shape[:2], numpy.uint8)
+        self._mask_2 = numpy.empty(shape[:2], numpy.uint8)
+        self._closed = numpy.empty(shape[:2], numpy.uint8)
+        if self._lookup:
+            self._packed = packed_image(shape)
+        self._scale = self.pyramid_scale
+        self._coarse = None
+        self._small = None
+        if self.pyramid_scale > 1:
+            small_shape = (shape[0] // self.pyramid_scale, shape[1] // self.pyramid_scale, *shape[2:])
+            self._coarse = Detector(lookup=self._lookup, ranges=self._ranges)
+            self._coarse._allocate(small_shape)
+            self._small = numpy.empty(small_shape, numpy.uint8)
@@ -0,0 +1,118 @@
+import numpy
+from typing import NamedTuple, Optional, Sequence
+
+
+PROCESS_NOISE = 100.0  # (m/s^3)^2 s; spectral density of the random jerk driving the model
+MEASUREMENT_NOISE = 0.02  # m; standard deviation of each triangulated coordinate
+INITIAL_VELOCITY_STD = 3.0  # m/s
+INITIAL_ACCELERATION_STD = 30.0  # m/s^2
+MAX_GAP = 0.5  # s; longer without a measurement and the track starts again
+
+
+class FilterState(NamedTuple):
+    """Estimate of the object's motion at a point in time. Vectors are x, y, z in the arm frame.
+    """
+    timestamp: float
+    position: numpy.ndarray  # m
+    velocity: numpy.ndarray  # m/s
+    acceleration: numpy.ndarray  # m/s^2
+    covariance: numpy.ndarray  # 3 x 3 of position, velocity, acceleration; the same for every axis
+
+
+class KalmanFilter:
+    """Constant acceleration Kalman filter of the object's location.
+    Every axis has the same model and noise, so they share one 3 x 3 covariance and are filtered together as the
+    columns of a 3 x 3 state, rather than as one 9 x 9 system.
+    """
+
+    def __init__(self, process_noise: float = PROCESS_NOISE, measurement_noise: float = MEASUREMENT_NOISE,
+                 max_gap: float = MAX_GAP):
+        """:param process_noise: Spectral density of random jerk in (m/s^3)^2 s; higher follows changes faster
+        :param measurement_noise: Standard deviation of measured coordinates in metres
+        :param max_gap: Seconds without a measurement after which the track restarts
+        """
+        self.process_noise = process_noise
+        self.measurement_variance = measurement_noise ** 2
+        self.max_gap = max_gap
+        self.timestamp: Optional[float] = None
+        # rows are position, velocity, acceleration; columns are x, y, z
+        self._state = numpy.zeros((3, 3))
+        self._covariance = numpy.zeros((3, 3))
+        self._transition = numpy.eye(3)
+        self._noise = numpy.zeros((3, 3))
+
+    def reset(self) -> None:
+        """Forgets the track; the next measurement starts a new one.
+        """
+        self.timestamp = None
+
+    def update(self, timestamp: float, location: Sequence[float]) -> FilterState:
+        """Adds a measured location, predicting the state to its time then correcting it.
+        :param timestamp: Seconds, from the same clock as previous measurements
+        :param location: Metres from base joint; x-axis, then y-axis, then z-axis
+        :return: Filtered state at the measurement's time
+        """
+        dt = None if self.timestamp is None else timestamp - self.timestamp
+        if dt is None or dt < 0 or dt > self.max_gap:
+            self._start(timestamp, location)
+            return self.state()
+        self._predict(dt, self._state, self._covariance)
+        # only position is measured, so the gain is the position column of the covariance over its variance
+        covariance = self._covariance
+        gain = covariance[:, 0] / (covariance[0, 0] + self.measurement_variance)
+        self._state += numpy.outer(gain, numpy.subtract(location, self._state[0]))
+        covariance -= numpy.outer(gain, covariance[0])
+        self.timestamp = timestamp
+        return self.state()
+
+    def state(self) -> FilterState:
+        """Gets a copy of the filtered state at the last measurement.
+        :raise ValueError: No measurements since reset
+        :return: State
+        """
+        if self.timestamp is None:
+            raise ValueError('No measurements to estimate state from')
+        state = self._state.copy()
+        return FilterState(self.timestamp, state[0], state[1], state[2], self._covariance.copy())
+
+    def predict(self, timestamp: float) -> FilterState:
+        """Extrapolates the state to any time without changing the filter.
+        :raise ValueError: No measurements since reset
+        :return: State predicted for the timestamp
+        """
+        if self.timestamp is None:
+            raise ValueError('No measurements to predict from')
+        state = self._state.copy()
+        covariance = self._covariance.copy()
+        self._predict(timestamp - self.timestamp, state, covariance)
+        return FilterState(timestamp, state[0], state[1], state[2], covariance)
+
+    def _start(self, timestamp: float, location: Sequence[float]) -> None:
+        """Starts a track at rest at the measured location, with uncertain motion.
+        """
+        self._state[:] = 0
+        self._state[0] = location
+        self._covariance[:] = 0
+        self._covariance[0, 0] = self.measurement_variance
+        self._covariance[1, 1] = INITIAL_VELOCITY_STD ** 2
+        self._covariance[2, 2] = INITIAL_ACCELERATION_STD ** 2
+        self.timestamp = timestamp
+
+    def _predict(self, dt: float, state: numpy.ndarray, covariance: numpy.ndarray) -> None:
+        """Moves a state and its covariance forward in place.
+        """
+        transition = self._transition
+        transition[0, 1] = transition[1, 2] = dt
+        transition[0, 2] = dt * dt / 2
+        # white jerk integrated over the step
+        dt2 = dt * dt
+        dt3 = dt2 * dt
+        noise = self._noise
+        noise[0, 0] = dt3 * dt2 / 20
+        noise[0, 1] = noise[1, 0] = dt2 * dt2 / 8
+        noise[0, 2] = noise[2, 0] = dt3 / 6
+        noise[1, 1] = dt3 / 3
+        noise[1, 2] = noise[2, 1] = dt2 / 2
+        noise[2, 2] = dt
+        state[:] = transition @ state
+        covariance[:] = transition @ covariance @ transition.T + self.process_noise * noise
@@ -0,0 +1,85 @@
+from threading import Lock
+import numpy
+from typing import Iterator, Optional, Sequence, Tuple
+
+
+HISTORY_CAPACITY = 15
+
+
+class LocationHistory:
+    """Most recent object locations and when they were found, in preallocated arrays.
+    Every entry is written twice, ``capacity`` apart, so the stored entries are always one contiguous run and can be
+    viewed in order without copying. Views are only valid until the next append; other threads should take a
+    ``snapshot``.
+    """
+
+    def __init__(self, capacity: int = HISTORY_CAPACITY):
+        """:param capacity: Number of entries kept; oldest are dropped first
+        :raise ValueError: Capacity is less than 1
+        """
+        if capacity < 1:
+            raise ValueError(f'Capacity must be at least 1 ({capacity})')
+        self.capacity = capacity
+        self._timestamps = numpy.zeros(2 * capacity, numpy.float64)
+        self._locations = numpy.zeros((2 * capacity, 3), numpy.float64)
+        self._lock = Lock()
+        # entries are in [_start, _start + _length), oldest first
+        self._start = 0
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[Tuple[float, Tuple[float, float, float]]]:
+        """Iterates over copies of entries newest first, as ``(timestamp, (x, y, z))``.
+        """
+        return zip(self.timestamps.tolist(), map(tuple, self.locations.tolist()))
+
+    def append(self, timestamp: float, location: Sequence[float]) -> None:
+        """Adds an entry, dropping the oldest if full. Location is copied.
+        """
+        with self._lock:
+            if self._length == self.capacity:
+                end = self._start
+                self._start = (self._start + 1) % self.capacity
+            else:
+                end = self._start + self._length
+                self._length += 1
+            end %= self.capacity
+            self._timestamps[end] = self._timestamps[end + self.capacity] = timestamp
+            self._locations[end] = self._locations[end + self.capacity] = location
+
+    def clear(self) -> None:
+        """Removes all entries.
+        """
+        with self._lock:
+            self._start = 0
+            self._length = 0
+
+    @property
+    def timestamps(self) -> numpy.ndarray:
+        """View of timestamps, newest first.
+        """
+        return self._timestamps[self._start:self._start + self._length][::-1]
+
+    @property
+    def locations(self) -> numpy.ndarray:
+        """View of N x 3 locations in metres from base joint, newest first.
+        """
+        return self._locations[self._start:self._start + self._length][::-1]
+
+    def latest(self) -> Optional[Tuple[float, numpy.ndarray]]:
+        """Gets the newest entry.
+        :return: Timestamp, then view of location; ``None`` if empty
+        """
+        if self._length == 0:
+            return None
+        end = self._start + self._length - 1
+        return float(self._timestamps[end]), self._locations[end]
+
+    def snapshot(self) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Copies the entries, so they can be read while others are appended from another thread.
+        :return: Timestamps, then N x 3 locations, newest first
+        """
+        with self._lock:
+            return self.timestamps.copy(), self.locations.copy()
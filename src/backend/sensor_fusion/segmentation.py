@@ -0,0 +1,61 @@
+from src.backend.sensor_fusion.tracking import (
+    LOWER_RED_1,
+    UPPER_RED_1,
+    LOWER_RED_2,
+    UPPER_RED_2
+)
+
+import cv2
+from functools import lru_cache
+import numpy
+from typing import Sequence, Tuple
+
+
+TARGET_RANGES = ((LOWER_RED_1, UPPER_RED_1), (LOWER_RED_2, UPPER_RED_2))
+# packed pixels are read as little endian so byte order matches the table on any machine
+PACKED_TYPE = numpy.dtype('<u4')
+BGR_TO_PACKED = [0, 0, 1, 1, 2, 2]  # mixChannels pairs; the 4th channel is left as zero
+
+
+def colour_table(ranges: Sequence[Tuple[numpy.ndarray, numpy.ndarray]] = TARGET_RANGES) -> numpy.ndarray:
+    """Gets the mask value of every 24 bit BGR colour for the given HSV ranges. Tables take ~0.2s and 16MB to build,
+    so the most recently used ones are kept and only rebuilt when the ranges change.
+    :param ranges: Lower then upper HSV bounds, as given to ``cv2.inRange``
+    :return: 255 where a colour is in any range, otherwise 0; indexed by ``B + G << 8 + R << 16``
+    """
+    return _build_table(tuple((tuple(int(v) for v in lower), tuple(int(v) for v in upper)) for lower, upper in ranges))
+
+
+@lru_cache(maxsize=2)
+def _build_table(ranges: Tuple[Tuple[Tuple[int, ...], Tuple[int, ...]], ...]) -> numpy.ndarray:
+    """Thresholds every colour at once as a 4096x4096 image.
+    :return: Read only table
+    """
+    colours = numpy.arange(1 << 24, dtype=PACKED_TYPE).view(numpy.uint8).reshape(4096, 4096, 4)[..., :3]
+    hsv = cv2.cvtColor(numpy.ascontiguousarray(colours), cv2.COLOR_BGR2HSV)
+    table = numpy.zeros((4096, 4096), numpy.uint8)
+    for lower, upper in ranges:
+        cv2.bitwise_or(table, cv2.inRange(hsv, numpy.array(lower), numpy.array(upper)), dst=table)
+    table = table.reshape(-1)
+    table.flags.writeable = False
+    return table
+
+
+def packed_image(shape: Tuple[int, ...]) -> numpy.ndarray:
+    """Creates a working image for ``lookup_mask``, to be reused for every frame of the same shape.
+    :return: Zeroed 4 channel image
+    """
+    return numpy.zeros((shape[0], shape[1], 4), numpy.uint8)
+
+
+def lookup_mask(image: numpy.ndarray, packed: numpy.ndarray, table: numpy.ndarray, dst: numpy.ndarray) -> numpy.ndarray:
+    """Thresholds a BGR image with one table lookup per pixel, giving the same mask as ``cv2.inRange`` on its HSV
+    conversion. Images may be views of parts of larger images.
+    :param packed: Working image from ``packed_image``, or the same part of one, whose 4th channel is still zero
+    :param table: Table from ``colour_table``
+    :param dst: Single channel image the mask is written into
+    :return: ``dst``
+    """
+    # copying into a zeroed 4th byte makes each pixel a 24 bit index
+    cv2.mixChannels([image], [packed], BGR_TO_PACKED)
+    return numpy.take(table, packed.view(PACKED_TYPE)[..., 0], out=dst, mode='clip')
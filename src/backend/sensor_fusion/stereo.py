@@ -0,0 +1,97 @@
+from src.backend.external_management.connections import LEFT_CAM_OFFSET
+
+from math import inf, sqrt
+import numpy
+from typing import Sequence, Tuple
+
+
+PARALLEL_TOLERANCE = 1e-12  # rays closer to parallel than this never meet
+
+
+class StereoRig:
+    """Positions of both cameras, for finding where the rays each camera sees the object along meet. Rays are given
+    as directions from each camera in the arm frame; they need not be unit vectors.
+    """
+
+    def __init__(self, left_origin: Sequence[float] = LEFT_CAM_OFFSET,
+                 right_origin: Sequence[float] = (-LEFT_CAM_OFFSET[0], LEFT_CAM_OFFSET[1], LEFT_CAM_OFFSET[2])):
+        """:param left_origin: Metres from base joint to the left camera
+        :param right_origin: Metres from base joint to the right camera
+        """
+        self.left_origin = (float(left_origin[0]), float(left_origin[1]), float(left_origin[2]))
+        self.right_origin = (float(right_origin[0]), float(right_origin[1]), float(right_origin[2]))
+        # left to right camera
+        self.baseline = tuple(r - l for l, r in zip(self.left_origin, self.right_origin))
+        self._left_array = numpy.array(self.left_origin)
+        self._right_array = numpy.array(self.right_origin)
+
+    def triangulate(
+            self,
+            left_direction: Sequence[float],
+            right_direction: Sequence[float]
+    ) -> Tuple[Tuple[float, float, float], float]:
+        """Finds the point halfway between the closest points of the two rays, using only floats so no arrays are
+        made.
+        :return: Metres from base joint; x-axis, then y-axis, then z-axis. Then metres between the rays at their
+            closest; infinite if parallel
+        """
+        d1x, d1y, d1z = left_direction
+        d2x, d2y, d2z = right_direction
+        bx, by, bz = self.baseline
+        # minimise squared distance between r1(t1) = p1 + t1*d1 and r2(t2) = p2 + t2*d2 (see Cramer's rule)
+        # (d1 * d1) * t1 - (d1 * d2) * t2 = (p2 - p1) * d1
+        # (d1 * d2) * t1 - (d2 * d2) * t2 = (p2 - p1) * d2
+        a = d1x * d1x + d1y * d1y + d1z * d1z
+        b = d1x * d2x + d1y * d2y + d1z * d2z
+        c = bx * d1x + by * d1y + bz * d1z
+        d = d2x * d2x + d2y * d2y + d2z * d2z
+        e = bx * d2x + by * d2y + bz * d2z
+        den = a * d - b * b
+        if den <= PARALLEL_TOLERANCE * a * d:
+            return self._midpoint(), inf
+        t1 = (c * d - b * e) / den
+        t2 = (b * c - a * e) / den
+        p1x, p1y, p1z = self.left_origin
+        p2x, p2y, p2z = self.right_origin
+        q1x, q1y, q1z = p1x + t1 * d1x, p1y + t1 * d1y, p1z + t1 * d1z
+        q2x, q2y, q2z = p2x + t2 * d2x, p2y + t2 * d2y, p2z + t2 * d2z
+        gap = sqrt((q1x - q2x) ** 2 + (q1y - q2y) ** 2 + (q1z - q2z) ** 2)
+        return ((q1x + q2x) / 2, (q1y + q2y) / 2, (q1z + q2z) / 2), gap
+
+    def triangulate_batch(
+            self,
+            left_directions: numpy.ndarray,
+            right_directions: numpy.ndarray
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """Finds the points halfway between the closest points of many pairs of rays at once.
+        :param left_directions: N x 3 array of directions from the left camera
+        :param right_directions: N x 3 array of directions from the right camera
+        :return: N x 3 array of metres from base joint, then N metres between each pair of rays at their closest;
+            infinite where parallel
+        """
+        d1 = numpy.asarray(left_directions, numpy.float64)
+        d2 = numpy.asarray(right_directions, numpy.float64)
+        baseline = numpy.array(self.baseline)
+        a = numpy.einsum('ij,ij->i', d1, d1)
+        b = numpy.einsum('ij,ij->i', d1, d2)
+        c = d1 @ baseline
+        d = numpy.einsum('ij,ij->i', d2, d2)
+        e = d2 @ baseline
+        den = a * d - b * b
+        parallel = den <= PARALLEL_TOLERANCE * a * d
+        den[parallel] = 1.0
+        t1 = (c * d - b * e) / den
+        t2 = (b * c - a * e) / den
+        q1 = self._left_array + t1[:, None] * d1
+        q2 = self._right_array + t2[:, None] * d2
+        gaps = numpy.linalg.norm(q1 - q2, axis=1)
+        locations = (q1 + q2) / 2
+        locations[parallel] = self._midpoint()
+        gaps[parallel] = inf
+        return locations, gaps
+
+    def _midpoint(self) -> Tuple[float, float, float]:
+        """Gets the point halfway between the cameras.
+        :return: Metres from base joint
+        """
+        return tuple((l + r) / 2 for l, r in zip(self.left_origin, self.right_origin))
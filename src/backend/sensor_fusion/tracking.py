@@ -1,24 +1,27 @@
 from src.backend.external_management.connections import (
-    LEFT_CAM_OFFSET,
     LEFT_CAM_ANGLES,
     CAM_FOV
 )
 from src.backend.error.standby_transition import StandbyTransition
+from src.backend.sensor_fusion.location_history import HISTORY_CAPACITY, LocationHistory
+from src.backend.sensor_fusion.stereo import StereoRig
 
 import cv2
-from math import cos, sin, dist
+from math import cos, sin
 import numpy
-from time import monotonic
-from typing import List, Optional, Tuple
+from typing import Optional, Tuple
 
 
 LOWER_RED_1 = numpy.array([0, 120, 70])
 UPPER_RED_1 = numpy.array([10, 255, 255])
 LOWER_RED_2 = numpy.array([170, 120, 70])
 UPPER_RED_2 = numpy.array([180, 255, 255])
+MORPH_KERNEL = numpy.ones((5, 5), numpy.uint8)
+MAX_RAY_GAP = 0.3  # metres between camera rays before the object is thought to be misdetected
+STEREO_RIG = StereoRig()
 
 
-_history = []
+_history = LocationHistory(HISTORY_CAPACITY)
 
 
 def find_in_image(image: numpy.ndarray) -> Optional[Tuple[Tuple[int, int], float]]:
@@ -33,10 +36,17 @@ def find_in_image(image: numpy.ndarray) -> Optional[Tuple[Tuple[int, int], float
     mask2 = cv2.inRange(hsv, LOWER_RED_2, UPPER_RED_2)
     mask = mask1 + mask2
     # Apply morphological operations to remove noise
-    kernel = numpy.ones((5, 5), numpy.uint8)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, MORPH_KERNEL)
     # Find contours
     contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return largest_contour_pose(contours)
+
+
+def largest_contour_pose(contours: Tuple[numpy.ndarray, ...]) -> Tuple[Tuple[int, int], float]:
+    """Finds the centre and orientation of the largest contour found in a mask.
+    :raise StandbyTransition: No contours were found
+    :return: Pixel location, (x, y) from top left, angle from upwards
+    """
     if contours:
         # Find the largest contour (assuming it's the stick)
         largest_contour = max(contours, key=cv2.contourArea)
@@ -50,9 +60,9 @@ def find_in_image(image: numpy.ndarray) -> Optional[Tuple[Tuple[int, int], float
         raise StandbyTransition('Unable to determine possible location of sword')
 
 
-def create_ray(pixel_x: int, pixel_y: int, res: Tuple) -> Tuple[float, float]:
+def create_ray(pixel_x: float, pixel_y: float, res: Tuple) -> Tuple[float, float]:
     """Calculates angles for line in real space which passes from the center of
-    the camera through the object in the image.
+    the camera through the object in the image. Pixel coordinates may be sub-pixel.
     :return: Angles in radians from camera along x-axis (right), then y-axis (up)
     """
     angle_x = (pixel_x / res[0]) * CAM_FOV - (CAM_FOV / 2)
@@ -76,56 +86,40 @@ def locate_object(
         right_ray_angles: Tuple[float, float]
 ) -> numpy.typing.NDArray[numpy.float64]:
     """Finds where two rays intersect or are the closest to intercepting.
-    :raise StandbyTransition: Rays do not intersect and shortest distance between them is greater than 0.1 metre
+    :raise StandbyTransition: Rays do not intersect and shortest distance between them is greater than MAX_RAY_GAP
+    :return: Metres from base joint; x-axis, then y-axis, then z-axis
+    """
+    return locate_object_from_directions(
+        angles_to_vector(left_ray_angles[0] + LEFT_CAM_ANGLES[0], left_ray_angles[1] + LEFT_CAM_ANGLES[1]),
+        angles_to_vector(right_ray_angles[0] - LEFT_CAM_ANGLES[0], right_ray_angles[1] + LEFT_CAM_ANGLES[1])
+    )
+
+
+def locate_object_from_directions(
+        left_direction: Tuple[float, float, float],
+        right_direction: Tuple[float, float, float]
+) -> numpy.typing.NDArray[numpy.float64]:
+    """Finds where two rays, given as directions from each camera in the arm frame, intersect or are the closest to
+    intercepting.
+    :raise StandbyTransition: Rays do not intersect and shortest distance between them is greater than MAX_RAY_GAP
     :return: Metres from base joint; x-axis, then y-axis, then z-axis
     """
-    # parametric vectors r(t) = p + t*d, CAM_OFFSET = p, left = r1, right = r2 (see Cramer's rule)
-    d1 = numpy.array(angles_to_vector(
-            left_ray_angles[0] + LEFT_CAM_ANGLES[0],
-            left_ray_angles[1] + LEFT_CAM_ANGLES[1]
-    ))
-    d2 = numpy.array(angles_to_vector(
-            right_ray_angles[0] - LEFT_CAM_ANGLES[0],
-            right_ray_angles[1] + LEFT_CAM_ANGLES[1]
-    ))
-    p1 = numpy.array([LEFT_CAM_OFFSET[0], LEFT_CAM_OFFSET[1], LEFT_CAM_OFFSET[2]])
-    p2 = numpy.array([-LEFT_CAM_OFFSET[0], LEFT_CAM_OFFSET[1], LEFT_CAM_OFFSET[2]])
-    # minimize squared distance between r1 and r2
-    # (d1 * d1) * t1 + (d1 * d2) * t2 = (p2 - p1) * d1
-    # (d1 * d2) * t1 + (d2 * d2) * t2 = (p2 - p1) * d2
-    #                v
-    # A = d1 * d1  B = d1 * d2  C = (p2 - p1) * d1  D = d2 * d2  E = (p2 - p1) * d2
-    a = d1[0] * d1[0] + d1[1] * d1[1] + d1[2] * d1[2]
-    b = d1[0] * d2[0] + d1[1] * d2[1] + d1[2] * d2[2]
-    # p1 and p2 symmetrical across yz plane, xz and xy identical -> 0
-    c = (-2 * p1[0]) * d1[0] + 0 + 0
-    d = d2[0] * d2[0] + d2[1] * d2[1] + d2[2] * d2[2]
-    e = (-2 * p1[0]) * d2[0] + 0 + 0
-    den = a * d - b**2
-    t1 = (c * d - b * e) / den
-    t2 = -(a * e - b * c) / den
-    q1 = numpy.array(p1) + t1 * numpy.array(d1)
-    q2 = numpy.array(p2) + t2 * numpy.array(d2)
-    distance = dist(q1, q2)
-    if distance > 0.3:
-        raise StandbyTransition(f'Cameras localize object to farther than 0.3m apart ({distance}m)')
-    location = (q1 + q2) / 2
-    store_location(monotonic(), location)
-    return location
+    location, distance = STEREO_RIG.triangulate(left_direction, right_direction)
+    if distance > MAX_RAY_GAP:
+        raise StandbyTransition(f'Cameras localize object to farther than {MAX_RAY_GAP}m apart ({distance}m)')
+    # arrays, as callers adjust locations in place
+    return numpy.array(location)
 
 
 def store_location(timestamp: float, location: numpy.typing.NDArray[numpy.float64]) -> None:
-    """Adds the location at its timestamp to the stored history. Stores most recent 15 entries.
+    """Adds the location at its timestamp to the stored history. Stores most recent HISTORY_CAPACITY entries.
     """
-    if len(_history) == 15:
-        _history.pop()
-    _history.insert(0, (timestamp, location))
-    return
+    _history.append(timestamp, location)
 
 
-def get_location_history() -> List[Tuple[float, Tuple[float, float, float]]]:
-    """Returns the last 15 locations and when it was detected.
-    :return: list of timestamp and (x,y,z) metre coordinate sets
+def get_location_history() -> LocationHistory:
+    """Returns the last HISTORY_CAPACITY locations and when they were detected, newest first.
+    :return: History, iterable as timestamp and (x,y,z) metre coordinate sets
     """
     return _history
 
@@ -133,5 +127,4 @@ def get_location_history() -> List[Tuple[float, Tuple[float, float, float]]]:
 def clear_location_history() -> None:
     """Removes all past locations stored.
     """
-    global _history
-    _history = []
+    _history.clear()
@@ -0,0 +1,217 @@
+from src.backend.error.standby_transition import StandbyTransition
+from src.backend.external_management.frame_source import FrameSource
+from src.backend.sensor_fusion.detection import Detection, Detector
+
+from multiprocessing import Event, Pipe, Process, resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+import numpy
+from os import name as os_name
+from sys import version_info
+from time import monotonic
+from typing import NamedTuple, Optional, Tuple
+
+
+RING_SLOTS = 4
+WORKER_TIMEOUT = 5.0  # s; opening a camera is slow
+DETECT_TIMEOUT = 1.0  # s
+STALE_TIME = 0.1  # s
+PAIR_ATTEMPTS = 2
+READ_FAILED = -1
+SIDES = ('left', 'right')
+
+
+class StereoDetection(NamedTuple):
+    """Where each camera found the object, and when the images were taken.
+    """
+    left: Detection
+    right: Detection
+    left_time: float
+    right_time: float
+
+    @property
+    def skew(self) -> float:
+        """Seconds between left and right capture.
+        """
+        return abs(self.left_time - self.right_time)
+
+    @property
+    def timestamp(self) -> float:
+        """Monotonic time halfway between left and right capture.
+        """
+        return (self.left_time + self.right_time) / 2
+
+
+def _vision_worker(source: FrameSource, conn, stop, track_roi: bool, lookup: bool, pyramid_scale: int) -> None:
+    """Captures from one source and finds the object in each frame until stopped. Frames are written to a shared
+    memory ring; only the result is sent back, as (sequence number, ring slot, capture time, detection).
+    :param track_roi: Passed to the worker's ``Detector``, as are ``lookup`` and ``pyramid_scale``
+    """
+    source.open()
+    ret, frame = source.read()
+    if not ret:
+        conn.send(None)
+        source.release()
+        return
+    # controller creates the ring once it knows the frame size
+    conn.send(frame.shape)
+    shm = _attach_shared_memory(conn.recv())
+    ring = numpy.ndarray((RING_SLOTS, *frame.shape), numpy.uint8, buffer=shm.buf)
+    detector = Detector(track_roi, lookup, pyramid_scale=pyramid_scale)
+    seq = 0
+    try:
+        while not stop.is_set():
+            slot = seq % RING_SLOTS
+            ret = source.grab()
+            timestamp = monotonic()
+            if ret:
+                ret, _ = source.retrieve(ring[slot])
+            if not ret:
+                conn.send((seq, READ_FAILED, timestamp, None))
+                break
+            try:
+                detection = detector.detect(ring[slot])
+            except StandbyTransition:
+                detection = None
+            conn.send((seq, slot, timestamp, detection))
+            seq += 1
+    finally:
+        del ring
+        shm.close()
+        source.release()
+
+
+def _attach_shared_memory(name: str) -> SharedMemory:
+    """Opens shared memory created by another process, leaving its cleanup to that process.
+    :return: Shared memory
+    """
+    if version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    shm = SharedMemory(name=name)
+    # only POSIX registers shared memory with a resource tracker, which would otherwise unlink it when this exits
+    if os_name == 'posix':
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+class VisionEngine:
+    """Runs capture and object detection for each camera in its own process, so both cameras are processed in
+    parallel and outside of the GIL shared with the GUI.
+    Sources are sent to the worker processes, so must be picklable before being opened.
+    """
+
+    def __init__(self, sources: Tuple[FrameSource, FrameSource], track_roi: bool = False, lookup: bool = False,
+                 pyramid_scale: int = 1):
+        """:param track_roi: Detector settings for the workers, as for ``Detector``; also ``lookup`` and
+        ``pyramid_scale``
+        """
+        self.sources = sources
+        self.detector_settings = (track_roi, lookup, pyramid_scale)
+        self._stop = None
+        self._workers = [None, None]
+        self._conns = [None, None]
+        self._shms = [None, None]
+        self._rings = [None, None]
+        self.cam_res = (0.0, 0.0)
+
+    def start(self) -> None:
+        """Starts both worker processes and waits for their cameras to open.
+        :raise StandbyTransition: A worker could not read from its camera
+        """
+        self._stop = Event()
+        for side in range(2):
+            conn, worker_conn = Pipe()
+            worker = Process(target=_vision_worker,
+                             args=(self.sources[side], worker_conn, self._stop, *self.detector_settings),
+                             name=f'{SIDES[side]}-vision', daemon=True)
+            worker.start()
+            self._workers[side] = worker
+            self._conns[side] = conn
+        for side in range(2):
+            shape = self._conns[side].recv() if self._conns[side].poll(WORKER_TIMEOUT) else None
+            if shape is None:
+                self.stop()
+                raise StandbyTransition(f'Vision worker for {SIDES[side]} camera failed to read')
+            shm = SharedMemory(create=True, size=RING_SLOTS * int(numpy.prod(shape)))
+            self._shms[side] = shm
+            self._rings[side] = numpy.ndarray((RING_SLOTS, *shape), numpy.uint8, buffer=shm.buf)
+            self._conns[side].send(shm.name)
+            self.cam_res = (float(shape[1]), float(shape[0]))
+
+    def stop(self) -> None:
+        """Stops worker processes and frees shared memory.
+        """
+        if self._stop is not None:
+            self._stop.set()
+        for side in range(2):
+            if self._workers[side] is not None:
+                self._workers[side].join(WORKER_TIMEOUT)
+                if self._workers[side].is_alive():
+                    self._workers[side].terminate()
+                self._workers[side] = None
+            if self._conns[side] is not None:
+                self._conns[side].close()
+                self._conns[side] = None
+            self._rings[side] = None
+            if self._shms[side] is not None:
+                self._shms[side].close()
+                self._shms[side].unlink()
+                self._shms[side] = None
+
+    def is_alive(self) -> bool:
+        """Checks both workers are running.
+        :return: True if both are running
+        """
+        return all(worker is not None and worker.is_alive() for worker in self._workers)
+
+    def swap(self) -> None:
+        """Switches the "left" worker and the "right" worker.
+        """
+        self._workers.reverse()
+        self._conns.reverse()
+        self._shms.reverse()
+        self._rings.reverse()
+
+    def detect(self, max_skew: Optional[float] = None) -> StereoDetection:
+        """Gets the newest result from each worker.
+        :param max_skew: Seconds results may be apart before the older one is replaced by its worker's next result
+        :raise StandbyTransition: A camera failed to read, a worker stopped responding, or the object was not found
+        :return: Object location in each image and capture times
+        """
+        results = [self._receive(0), self._receive(1)]
+        for _ in range(PAIR_ATTEMPTS if max_skew is not None else 0):
+            if abs(results[0][2] - results[1][2]) <= max_skew:
+                break
+            # a worker held up by the scheduler can lag by a frame; reading both again would only keep the lag
+            older = 0 if results[0][2] < results[1][2] else 1
+            results[older] = self._receive(older)
+        result_l, result_r = results
+        if result_l[3] is None or result_r[3] is None:
+            raise StandbyTransition('Unable to determine possible location of sword')
+        return StereoDetection(result_l[3], result_r[3], result_l[2], result_r[2])
+
+    def photos(self) -> Tuple[numpy.ndarray, numpy.ndarray, float, float]:
+        """Gets the newest frame from each worker. Frames are in shared memory, and are overwritten once the worker
+        has captured ``RING_SLOTS`` more.
+        :raise StandbyTransition: A camera failed to read or a worker stopped responding
+        :return: Left image, right image, then their capture times
+        """
+        result_l = self._receive(0)
+        result_r = self._receive(1)
+        return self._rings[0][result_l[1]], self._rings[1][result_r[1]], result_l[2], result_r[2]
+
+    def _receive(self, side: int) -> Tuple[int, int, float, Optional[Detection]]:
+        """Reads all waiting results from a worker, waiting for a new one if none are waiting or they are stale.
+        :raise StandbyTransition: Camera failed to read or worker stopped responding
+        :return: Newest result
+        """
+        conn = self._conns[side]
+        result = None
+        while conn.poll():
+            result = conn.recv()
+        if result is None or result[2] < monotonic() - STALE_TIME:
+            if not conn.poll(DETECT_TIMEOUT):
+                raise StandbyTransition(f'Vision worker for {SIDES[side]} camera stopped responding')
+            result = conn.recv()
+        if result[1] == READ_FAILED:
+            raise StandbyTransition(f'Vision worker for {SIDES[side]} camera failed to read')
+        return result
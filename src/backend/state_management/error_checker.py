@@ -1,11 +1,14 @@
-from math import dist
-from typing import List, Tuple
+from math import dist, sqrt
+from typing import List, Optional, Sequence, Tuple
 
 from src.backend.error.standby_transition import StandbyTransition
 
 
 MAX_TIME = 0.2  # s
 MAX_DIST = 0.8  # m
+MAX_SPEED = 12.0  # m/s; faster than a sword tip is swung
+MAX_ACCELERATION = 300.0  # m/s^2; about a sword tip reversing within a tenth of a second
+POSITION_TOLERANCE = 0.05  # m; allowed on top of the limits for triangulation noise
 
 
 def verify_track(history: List[Tuple[float, Tuple[float, float, float]]]) -> None:
@@ -36,3 +39,86 @@ def _verify_location(locations: List[Tuple[float, float, float]]) -> None:
         distance = dist(locations[i], locations[i+1])
         if distance > MAX_DIST:
             raise StandbyTransition(f'Locations at past time steps {i} and {i+1} are too far apart ({distance}m)')
+
+
+class TrackVerifier:
+    """Checks each new location against the one before, rather than rechecking the whole history every frame.
+    Movement is limited by speed and acceleration, so the limits hold at any frame rate, and by the same flat
+    distance as ``verify_track`` for long gaps. Raises the same messages as ``verify_track``, with the new location as
+    past time step 0.
+    """
+
+    def __init__(self, max_time: float = MAX_TIME, max_speed: float = MAX_SPEED,
+                 max_acceleration: float = MAX_ACCELERATION, tolerance: float = POSITION_TOLERANCE,
+                 max_distance: float = MAX_DIST):
+        """:param max_time: Most seconds between locations
+        :param max_speed: Fastest plausible movement in m/s
+        :param max_acceleration: Fastest plausible change in velocity in m/s^2
+        :param tolerance: Metres of noise allowed on top of the speed and acceleration limits
+        :param max_distance: Most metres between locations, however long apart
+        """
+        self.max_time = max_time
+        self.max_distance = max_distance
+        self.max_speed = max_speed
+        self.max_acceleration = max_acceleration
+        self.tolerance = tolerance
+        self.reset()
+
+    def reset(self) -> None:
+        """Forgets the track, and its statistics; the next location starts a new one.
+        """
+        self._timestamp: Optional[float] = None
+        self._location: Optional[Tuple[float, float, float]] = None
+        self._velocity: Optional[Tuple[float, float, float]] = None
+        self._interval = 0.0
+        self.checked = 0
+        self.total_interval = 0.0
+        self.peak_speed = 0.0
+        self.peak_acceleration = 0.0
+
+    @property
+    def mean_interval(self) -> float:
+        """Average seconds between checked locations.
+        """
+        return self.total_interval / self.checked if self.checked else 0.0
+
+    def check(self, timestamp: float, location: Sequence[float]) -> None:
+        """Verifies a new location against the previous one. The location is kept either way, as it would be in the
+        history.
+        :raise StandbyTransition: Locations are too far apart in time, or moved too fast or changed speed too fast
+            to be the object
+        """
+        x, y, z = float(location[0]), float(location[1]), float(location[2])
+        last_timestamp, last_location, last_velocity, last_interval = (
+            self._timestamp, self._location, self._velocity, self._interval
+        )
+        self._timestamp = timestamp
+        self._location = (x, y, z)
+        self._velocity = None
+        if last_timestamp is None:
+            return
+        interval = abs(timestamp - last_timestamp)
+        self._interval = interval
+        self.checked += 1
+        self.total_interval += interval
+        if interval > self.max_time:
+            raise StandbyTransition(f'Past time steps 0 and 1 are too far apart ({interval}s)')
+        lx, ly, lz = last_location
+        distance = dist((x, y, z), last_location)
+        if distance > min(self.max_speed * interval + self.tolerance, self.max_distance):
+            raise StandbyTransition(f'Locations at past time steps 0 and 1 are too far apart ({distance}m)')
+        if interval == 0:
+            return
+        velocity = ((x - lx) / interval, (y - ly) / interval, (z - lz) / interval)
+        self._velocity = velocity
+        self.peak_speed = max(self.peak_speed, distance / interval)
+        if last_velocity is None:
+            return
+        span = (interval + last_interval) / 2
+        change = sqrt((velocity[0] - last_velocity[0]) ** 2 + (velocity[1] - last_velocity[1]) ** 2 +
+                      (velocity[2] - last_velocity[2]) ** 2)
+        acceleration = change / span
+        self.peak_acceleration = max(self.peak_acceleration, acceleration)
+        # noise in each location changes each velocity by up to twice the tolerance over its own interval
+        if change > self.max_acceleration * span + 2 * self.tolerance * (1 / interval + 1 / last_interval):
+            raise StandbyTransition(f'Locations at past time steps 0 to 2 change speed too fast ({acceleration}m/s^2)')
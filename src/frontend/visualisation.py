@@ -51,8 +51,14 @@ class Graph:
             right_ray_angles[0] - LEFT_CAM_ANGLES[0],
             right_ray_angles[1] + LEFT_CAM_ANGLES[1]
         )
-        self.ray_lines[0].set_data(pos=np.array([self.cams[0], self.cams[0] + np.array(left_offset)]))
-        self.ray_lines[1].set_data(pos=np.array([self.cams[1], self.cams[1] + np.array(right_offset)]))
+        self.set_cam_directions(left_offset, right_offset)
+
+    def set_cam_directions(self, left_direction: Tuple[float, float, float],
+                           right_direction: Tuple[float, float, float]):
+        """Set where cameras see object. Rays take unit vectors from each camera as input.
+        """
+        self.ray_lines[0].set_data(pos=np.array([self.cams[0], self.cams[0] + np.array(left_direction)]))
+        self.ray_lines[1].set_data(pos=np.array([self.cams[1], self.cams[1] + np.array(right_direction)]))
 
     def show(self):
         """Create and show visualisation.
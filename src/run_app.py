@@ -1,13 +1,18 @@
 from threading import Thread
 import tkinter as tk
 
-from src.backend.arm_control.op_loop import operation_loop
-from src.backend.external_management.connections import Ext, is_arduino_connected
+from src.backend.arm_control.op_loop import operation_loop, LOOKUP_SEGMENTATION, PYRAMID_SCALE, TRACK_ROI
+from src.backend.external_management.connections import Ext, is_arduino_connected, LEFT_CAM_INDEX, RIGHT_CAM_INDEX
+from src.backend.external_management.frame_source import CameraSource
+from src.backend.sensor_fusion.vision_engine import VisionEngine
 from src.backend.state_management.state_manager import Manager
 from src.frontend.visualisation import Graph
 from src.frontend.gui import Gui
 
 
+VISION_WORKERS = False  # capture and find sword for each camera in its own process
+
+
 if __name__ == '__main__':
     # pre-check
     if not is_arduino_connected():
@@ -15,7 +20,13 @@ if __name__ == '__main__':
         exit(1)
     # create instances
     state_manager = Manager()
-    connection_manager = Ext()
+    if VISION_WORKERS:
+        vision_engine = VisionEngine((CameraSource(LEFT_CAM_INDEX), CameraSource(RIGHT_CAM_INDEX)),
+                                     TRACK_ROI, LOOKUP_SEGMENTATION, PYRAMID_SCALE)
+        connection_manager = Ext(vision_engine=vision_engine, async_serial=True, serial_telemetry=True)
+    else:
+        connection_manager = Ext(threaded_capture=True, reuse_buffers=True, async_serial=True,
+                                 serial_telemetry=True)
     root = tk.Tk()
     vis = Graph(root)
     gui = Gui(root, state_manager, vis)
@@ -0,0 +1,44 @@
+import numpy
+from time import perf_counter
+
+from src.backend.arm_control.trajectory import COLLISION_HORIZON, COLLISION_SAMPLES, ArcFit, calculate_collision
+from src.backend.arm_control.workspace import WORKSPACE_CACHE, load_workspace
+
+# Times the interception solver on random swings towards the arm, against checking each candidate time in turn.
+# Per frame budget is well under a millisecond.
+NUM_SWINGS = 5000
+BUDGET = 1e-3  # s
+
+
+def loop_collision(fit, now, workspace):
+    for tau in (now - fit.reference_time) + COLLISION_HORIZON * numpy.linspace(0, 1, COLLISION_SAMPLES):
+        position = fit.position(fit.reference_time + tau)
+        if workspace.blockable(position):
+            return tau, position
+    return None
+
+
+if __name__ == '__main__':
+    workspace = load_workspace(WORKSPACE_CACHE)
+    rng = numpy.random.default_rng(0)
+    fits = []
+    for _ in range(NUM_SWINGS):
+        start = rng.uniform((-0.8, 0.6, -0.3), (0.8, 1.5, 0.8))
+        velocity = (rng.uniform((-0.3, 0.2, -0.3), (0.3, 0.6, 0.3)) - start) / rng.uniform(0.1, 0.6)
+        fits.append(ArcFit(numpy.array([start, velocity, rng.uniform(-5, 5, 3)]), 0.0, 0.0, True))
+
+    times = []
+    hits = 0
+    for fit in fits:
+        t0 = perf_counter()
+        hits += calculate_collision(fit, 0.0, workspace) is not None
+        times.append(perf_counter() - t0)
+    t0 = perf_counter()
+    loop_hits = sum(loop_collision(fit, 0.0, workspace) is not None for fit in fits)
+    loop_time = perf_counter() - t0
+
+    times = numpy.array(times)
+    print(f'Solver: {1e6 * numpy.mean(times):.1f}us mean, {1e6 * numpy.percentile(times, 99):.1f}us 99th percentile, '
+          f'{1e6 * numpy.max(times):.1f}us max ({hits}/{NUM_SWINGS} intercepted)')
+    print(f'Candidate loop: {1e6 * loop_time / NUM_SWINGS:.1f}us mean ({loop_hits}/{NUM_SWINGS} intercepted)')
+    print(f'Within {1e3 * BUDGET:.0f}ms budget: {numpy.count_nonzero(times < BUDGET)}/{NUM_SWINGS}')
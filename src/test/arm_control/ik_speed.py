@@ -0,0 +1,46 @@
+import numpy
+from time import perf_counter
+
+from src.backend.arm_control.ik_table import IkTable, IK_TABLE_HIGH, IK_TABLE_LOW
+from src.backend.arm_control.kinematics import limit_arm_angles, pos_to_arm_angles_batch, pos_to_arm_commands
+
+# Times interpolating arm angles from the solved table against solving them, one per frame and in batches of
+# candidate intercepts, and how far apart they are.
+NUM_POINTS = 20000
+BATCH_SIZES = (64, 4096)
+BATCH_REPEATS = 200
+
+
+def time_batches(function, points):
+    t0 = perf_counter()
+    for _ in range(BATCH_REPEATS):
+        function(points)
+    return (perf_counter() - t0) / BATCH_REPEATS
+
+
+if __name__ == '__main__':
+    t0 = perf_counter()
+    table = IkTable()
+    print(f'Build: {1e3 * (perf_counter() - t0):.0f}ms ({table.shape} points, {table.table.nbytes / 1e6:.0f}MB)')
+    points = numpy.random.default_rng(0).uniform(IK_TABLE_LOW, IK_TABLE_HIGH, (NUM_POINTS, 3))
+    singles = [tuple(float(value) for value in point) for point in points]
+
+    t0 = perf_counter()
+    looked_up = [table.lookup(*point) for point in singles]
+    lookup_time = perf_counter() - t0
+    t0 = perf_counter()
+    solved = [pos_to_arm_commands(*point) for point in singles]
+    solve_time = perf_counter() - t0
+    print(f'Per frame: table {1e6 * lookup_time / NUM_POINTS:.2f}us, solved {1e6 * solve_time / NUM_POINTS:.2f}us')
+
+    for size in BATCH_SIZES:
+        batch = points[:size]
+        table_time = time_batches(table.angles, batch)
+        solve_time = time_batches(lambda p: limit_arm_angles(pos_to_arm_angles_batch(p)), batch)
+        print(f'Batch of {size}: table {1e6 * table_time:.0f}us, solved {1e6 * solve_time:.0f}us')
+
+    error = numpy.abs(table.angles(points) - limit_arm_angles(pos_to_arm_angles_batch(points))).max(axis=1)
+    command_error = numpy.abs(numpy.array(looked_up) - numpy.array(solved)).max(axis=1)
+    print(f'Angle error: {numpy.mean(error):.3f} degrees mean, {numpy.percentile(error, 99):.3f} 99th percentile, '
+          f'{numpy.max(error):.2f} max')
+    print(f'Commands differing: {numpy.count_nonzero(command_error)}/{NUM_POINTS}, by at most {command_error.max()}')
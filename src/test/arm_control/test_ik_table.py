@@ -0,0 +1,63 @@
+from src.backend.arm_control.ik_table import IkTable, IK_TABLE_HIGH, IK_TABLE_LOW
+from src.backend.arm_control.kinematics import (
+    limit_arm_angles, pos_to_arm_angles_batch, pos_to_arm_commands, BASE_LIMITS, ELBOW_LIMITS, WRIST_LIMITS
+)
+
+import numpy
+import unittest
+
+
+class TestIkTable(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.table = IkTable()
+        cls.points = numpy.random.default_rng(0).uniform(IK_TABLE_LOW, IK_TABLE_HIGH, (20000, 3))
+        cls.exact = limit_arm_angles(pos_to_arm_angles_batch(cls.points))
+
+    def test_error_bounded(self):
+        """Interpolation error should be a small fraction of the resend threshold, and least away from the arm where
+        the solution changes slowly.
+        """
+        error = numpy.abs(self.table.angles(self.points) - self.exact).max(axis=1)
+        self.assertLess(error.max(), 6)
+        self.assertLess(numpy.percentile(error, 99), 0.5)
+        self.assertLess(error[self.points[:, 1] > 0.5].max(), 1)
+
+    def test_exact_at_grid_points(self):
+        """Points on the grid should get their solved angles, with nothing interpolated.
+        """
+        points = numpy.array(IK_TABLE_LOW) + self.table.step * numpy.array([[0, 0, 0], [3, 7, 11], [100, 90, 90]])
+        numpy.testing.assert_allclose(self.table.angles(points), limit_arm_angles(pos_to_arm_angles_batch(points)),
+                                      atol=1e-9)
+
+    def test_within_limits(self):
+        """Interpolated angles should stay within each joint's limits, as every solution around them does.
+        """
+        angles = self.table.angles(self.points)
+        for joint, limits in enumerate((BASE_LIMITS, ELBOW_LIMITS, WRIST_LIMITS)):
+            # weights may sum to one only within rounding
+            self.assertTrue(numpy.all((angles[:, joint] >= limits[0] - 1e-9) & (angles[:, joint] <= limits[1] + 1e-9)))
+
+    def test_lookup_matches_batch(self):
+        """Single lookups should give whole degree commands matching the batch angles and close to the solved ones.
+        """
+        batch = self.table.angles(self.points[:500])
+        for point, angles in zip(self.points[:500], batch):
+            commands = self.table.lookup(*(float(value) for value in point))
+            self.assertTrue(all(isinstance(command, int) for command in commands))
+            numpy.testing.assert_allclose(commands, angles, atol=1)
+            # truncating can add a degree to the interpolation error
+            self.assertLessEqual(max(abs(a - b) for a, b in zip(commands, pos_to_arm_commands(*point))), 7)
+
+    def test_outside_solved(self):
+        """Points outside the table should get the solved angles exactly.
+        """
+        points = numpy.array([[0.3, 0.1, 0.2], [-2.0, 1.0, 0.0], [0.0, 3.0, 0.5], [0.1, 1.0, -1.5]])
+        numpy.testing.assert_allclose(self.table.angles(points), limit_arm_angles(pos_to_arm_angles_batch(points)))
+        for point in points:
+            self.assertEqual(self.table.lookup(*point), pos_to_arm_commands(*point))
+
+
+if __name__ == '__main__':
+    unittest.main()
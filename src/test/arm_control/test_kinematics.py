@@ -0,0 +1,75 @@
+from src.backend.arm_control.kinematics import (
+    arm_angles_to_position, limit_arm_angles, pos_to_arm_angles, pos_to_arm_angles_batch, pos_to_arm_commands,
+    BASE_LIMITS, ELBOW_LIMITS, R_TO_D, WRIST_LIMITS
+)
+from src.backend.external_management.connections import ARM_BASE_LENGTH, ARM_COLLISION_LENGTH, ARM_FORE_LENGTH
+
+from math import pi
+import numpy
+import unittest
+
+
+class TestForwardKinematics(unittest.TestCase):
+
+    def test_known_poses(self):
+        """Sword across the end of the forearm, pointing right at rest.
+        """
+        cases = (
+            ((0, 0, 0), (ARM_COLLISION_LENGTH, ARM_FORE_LENGTH, ARM_BASE_LENGTH)),
+            ((0, 0, pi / 2), (0, ARM_FORE_LENGTH, ARM_BASE_LENGTH + ARM_COLLISION_LENGTH)),
+            ((pi / 2, 0, 0), (ARM_FORE_LENGTH, -ARM_COLLISION_LENGTH, ARM_BASE_LENGTH)),
+            ((0, pi / 2, pi / 2), (0, -ARM_COLLISION_LENGTH, ARM_BASE_LENGTH + ARM_FORE_LENGTH)),
+        )
+        for angles, expected in cases:
+            numpy.testing.assert_allclose(arm_angles_to_position(*angles), expected, atol=1e-12)
+
+    def test_arrays_match_scalars(self):
+        """Positions of many poses at once should match those of each pose on its own.
+        """
+        rng = numpy.random.default_rng(0)
+        base, elbow, wrist = rng.uniform(-pi, pi, (3, 50))
+        along = rng.uniform(0, 0.35, 50)
+        batch = numpy.stack(arm_angles_to_position(base, elbow, wrist, along), axis=-1)
+        for i in range(50):
+            numpy.testing.assert_allclose(batch[i], arm_angles_to_position(base[i], elbow[i], wrist[i], along[i]))
+
+    def test_broadcasts(self):
+        """A grid of poses from one axis of each joint.
+        """
+        base = numpy.linspace(-1, 1, 4)
+        elbow = numpy.linspace(-0.5, 0.8, 3)
+        wrist = numpy.linspace(-pi, pi, 5)
+        # height does not depend on the base, so only shapes together with the others
+        x, y, z = numpy.broadcast_arrays(*arm_angles_to_position(base[:, None, None], elbow[:, None], wrist))
+        self.assertEqual(x.shape, (4, 3, 5))
+        numpy.testing.assert_allclose((x[2, 1, 3], y[2, 1, 3], z[2, 1, 3]),
+                                      arm_angles_to_position(base[2], elbow[1], wrist[3]))
+
+
+class TestInverseKinematics(unittest.TestCase):
+
+    def setUp(self):
+        self.points = numpy.random.default_rng(0).uniform((-1, 0.05, -0.8), (1, 2, 1), (200, 3))
+
+    def test_batch_matches_scalar(self):
+        """Angles for many points at once should match solving each point on its own.
+        """
+        batch = pos_to_arm_angles_batch(self.points)
+        for point, angles in zip(self.points, batch):
+            numpy.testing.assert_allclose(angles, pos_to_arm_angles(*point), atol=1e-12)
+
+    def test_commands_within_limits(self):
+        """Commands should be the solved angles truncated to whole degrees, then moved within the limits.
+        """
+        limited = limit_arm_angles(pos_to_arm_angles_batch(self.points))
+        for point, expected in zip(self.points, limited):
+            commands = pos_to_arm_commands(*point)
+            self.assertEqual(commands, tuple(int(angle) for angle in expected))
+            for command, angle, limits in zip(commands, pos_to_arm_angles(*point),
+                                              (BASE_LIMITS, ELBOW_LIMITS, WRIST_LIMITS)):
+                self.assertIsInstance(command, int)
+                self.assertEqual(command, min(max(int(angle * R_TO_D), limits[0]), limits[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+from src.backend.arm_control.latency import LatencyEstimate
+from src.backend.external_management.serial_writer import SerialWriter
+
+from time import monotonic, sleep
+import unittest
+
+
+class SlowPort:
+    """Port that takes a while to write each command.
+    """
+    def __init__(self, write_time: float):
+        self.write_time = write_time
+        self.written = []
+
+    def write(self, command: bytes):
+        sleep(self.write_time)
+        self.written.append(command)
+
+    def flush(self):
+        pass
+
+
+class TestLatencyEstimate(unittest.TestCase):
+
+    def test_running_estimate(self):
+        """First measurement should replace the initial guess, later ones move the estimate towards them, and
+        missing ones leave it alone.
+        """
+        latency = LatencyEstimate(response_time=0.05, initial=0.1, smoothing=0.5, max_lead=1.0)
+        self.assertAlmostEqual(latency.lead, 0.15)
+        self.assertEqual(latency.update(None), 0.1)
+        self.assertEqual(latency.update(0.02), 0.02)
+        self.assertAlmostEqual(latency.update(0.04), 0.03)
+        self.assertAlmostEqual(latency.update(None), 0.03)
+        self.assertEqual(latency.samples, 2)
+        self.assertAlmostEqual(latency.lead, 0.08)
+        latency.reset()
+        self.assertEqual(latency.latency, 0.1)
+
+    def test_max_lead(self):
+        """Lead should never be further ahead than the maximum.
+        """
+        latency = LatencyEstimate(response_time=0.1, max_lead=0.3)
+        latency.update(0.5)
+        self.assertEqual(latency.lead, 0.3)
+
+    def test_writer_capture_latency(self):
+        """Background writer should measure from capture until the command is written, for commands with a capture
+        time.
+        """
+        writer = SerialWriter(SlowPort(0.02))
+        writer.start()
+        captured = monotonic() - 0.03
+        writer.submit(b'a', captured)
+        writer.stop()
+        latency = writer.take_capture_latency()
+        self.assertGreaterEqual(latency, 0.05)
+        self.assertLess(latency, 0.5)
+        self.assertIsNone(writer.take_capture_latency())
+        writer = SerialWriter(SlowPort(0))
+        writer.start()
+        writer.submit(b'b')
+        writer.stop()
+        self.assertIsNone(writer.take_capture_latency())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+from src.backend.arm_control.trajectory import ArcFit, ArcFitter, calculate_collision, calculate_trajectory
+from src.backend.arm_control.workspace import WorkspaceGrid
+
+import numpy
+import unittest
+
+
+COEFFICIENTS = numpy.array([[0.3, 0.8, 0.2], [-1.5, 0.2, 1.0], [1.0, 0.0, -4.9]])
+
+
+def arc(t: float) -> numpy.ndarray:
+    return COEFFICIENTS[0] + COEFFICIENTS[1] * t + COEFFICIENTS[2] * t * t
+
+
+def swing(t: float) -> numpy.ndarray:
+    """Back and forth within reach, about once a second.
+    """
+    return numpy.array([0.4 * numpy.sin(2 * numpy.pi * t), 0.8, 0.3 * numpy.cos(2 * numpy.pi * t)])
+
+
+class TestArcFitter(unittest.TestCase):
+
+    def test_matches_batch_fit(self):
+        """Sliding fit should match refitting the window from scratch with least squares, through rebasing.
+        """
+        rng = numpy.random.default_rng(0)
+        fitter = ArcFitter(window=10)
+        times = numpy.cumsum(rng.uniform(0.01, 0.03, 150))
+        locations = [swing(t) + rng.normal(0, 0.01, 3) for t in times]
+        for i, (t, location) in enumerate(zip(times, locations)):
+            fit = fitter.add(t, location)
+            window = slice(max(0, i - 9), i + 1)
+            if i < 2:
+                self.assertFalse(fit.valid)
+                continue
+            tau = times[window] - fit.reference_time
+            basis = numpy.stack((numpy.ones_like(tau), tau, tau * tau), axis=1)
+            expected, _, _, _ = numpy.linalg.lstsq(basis, numpy.array(locations[window]), rcond=None)
+            numpy.testing.assert_allclose(fit.coefficients, expected, atol=1e-6)
+            errors = numpy.array(locations[window]) - basis @ expected
+            self.assertAlmostEqual(fit.residual, numpy.sqrt(numpy.sum(errors ** 2) / len(tau)), delta=1e-6)
+            self.assertEqual(fit.valid, i >= 3 and fit.residual <= 0.05)
+
+    def test_invalid(self):
+        """Locations off any arc, or all at once, should not give a valid fit.
+        """
+        fitter = ArcFitter(max_residual=0.05)
+        for i in range(10):
+            fit = fitter.add(0.02 * i, (0, 0, 0.5 * (i % 2)))
+        self.assertGreater(fit.residual, 0.05)
+        self.assertFalse(fit.valid)
+        fitter.reset()
+        self.assertEqual(len(fitter), 0)
+        for _ in range(5):
+            fit = fitter.add(1.0, (0, 0, 0))
+        self.assertFalse(fit.valid)
+
+    def test_calculate_trajectory(self):
+        """History newest first should be fitted as an arc through it.
+        """
+        history = [(t, arc(t)) for t in numpy.arange(15)[::-1] * 0.02]
+        fit = calculate_trajectory(history)
+        self.assertTrue(fit.valid)
+        self.assertLess(fit.residual, 1e-6)
+        numpy.testing.assert_allclose(fit.position(0.5), arc(0.5))
+        self.assertFalse(calculate_trajectory([]).valid)
+
+
+class TestCollision(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # coarse voxels are quick to build
+        cls.workspace = WorkspaceGrid.build(0.05)
+
+    def test_straight_approach(self):
+        """Sword coming straight at the arm should be met as it first reaches somewhere the arm can block.
+        """
+        fit = ArcFit(numpy.array([[0, 1.2, 0.3], [0, -2, 0], [0, 0, 0]], float), 10.0, 0, True)
+        collision = calculate_collision(fit, 10.0, self.workspace)
+        numpy.testing.assert_allclose(collision.position, fit.position(collision.timestamp))
+        self.assertTrue(self.workspace.blockable(collision.position))
+        self.assertFalse(self.workspace.blockable(fit.position(collision.timestamp - 1e-4)))
+        # first blockable time when scanned finely
+        times = numpy.arange(10.0, 10.5, 1e-4)
+        first = next(t for t in times if self.workspace.blockable(fit.position(t)))
+        self.assertAlmostEqual(collision.timestamp, first, delta=1e-4)
+
+    def test_already_inside(self):
+        """Sword already in the workspace should be met now.
+        """
+        fit = ArcFit(numpy.array([[0, 0.3, 0.4], [0.5, 0, 0], [0, 0, -2.5]], float), 0.0, 0, True)
+        collision = calculate_collision(fit, 0.2, self.workspace)
+        self.assertEqual(collision.timestamp, 0.2)
+        numpy.testing.assert_allclose(collision.position, fit.position(0.2))
+
+    def test_misses(self):
+        """Swings passing behind, beside or below the arm, or arriving after the horizon, should not be met.
+        """
+        paths = [
+            [[0, -0.6, 0.3], [1, 0, 0], [0, 0, 0]],  # behind
+            [[1.0, 0.2, -0.5], [0, 0, 2], [0, 0, 0]],  # beside, past the base joint's turn
+            [[-0.3, 0.3, -0.4], [1.2, 0, 0], [0, 0, 0]],  # below, within reach of the base joint but not the sword
+            [[0, 3, 0.3], [0, -1, 0], [0, 0, 0]],  # too far to arrive in time
+        ]
+        for coefficients in paths:
+            fit = ArcFit(numpy.array(coefficients, float), 0.0, 0, True)
+            self.assertIsNone(calculate_collision(fit, 0.0, self.workspace))
+        fit = ArcFit(numpy.array(paths[-1], float), 0.0, 0, True)
+        self.assertIsNotNone(calculate_collision(fit, 0.0, self.workspace, 3.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
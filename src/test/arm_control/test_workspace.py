@@ -0,0 +1,68 @@
+from src.backend.arm_control.kinematics import arm_angles_to_position, BASE_LIMITS, ELBOW_LIMITS, WRIST_LIMITS, D_TO_R
+from src.backend.arm_control.workspace import BLOCKABLE, load_workspace, WorkspaceGrid
+from src.backend.external_management.connections import ARM_SWORD_LENGTH
+
+from os.path import exists, join
+from tempfile import TemporaryDirectory
+import numpy
+import unittest
+
+
+COARSE_VOXEL = 0.05  # m; quick to build
+
+
+class TestWorkspaceGrid(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.workspace = WorkspaceGrid.build(COARSE_VOXEL)
+
+    def random_poses(self, count: int) -> numpy.ndarray:
+        """Picks joint angles within their limits, in radians; base, then elbow, then wrist.
+        """
+        rng = numpy.random.default_rng(0)
+        return numpy.stack([rng.uniform(*limits, count) * D_TO_R
+                            for limits in (BASE_LIMITS, ELBOW_LIMITS, WRIST_LIMITS)])
+
+    def test_poses_reachable(self):
+        """Every pose within the joint limits should put the collision point in a reachable voxel.
+        """
+        points = numpy.stack(arm_angles_to_position(*self.random_poses(500)), axis=-1)
+        for point in points:
+            self.assertTrue(self.workspace.reachable(point))
+            self.assertTrue(self.workspace.blockable(point))
+
+    def test_sword_blockable(self):
+        """Anywhere along the sword should be blockable, not only the collision point.
+        """
+        base, elbow, wrist = self.random_poses(500)
+        along = numpy.random.default_rng(1).uniform(0, ARM_SWORD_LENGTH, 500)
+        x, y, z = arm_angles_to_position(base, elbow, wrist, along)
+        self.assertTrue(numpy.all(self.workspace.flags(x, y, z) & BLOCKABLE))
+
+    def test_out_of_reach(self):
+        """Points the sword cannot get to, including ones outside the grid, should be neither blockable nor reachable.
+        """
+        for point in ((0, 1, 0.3), (0, -0.6, 0.268), (5, 5, 5), (-1e9, 0, 0)):
+            self.assertFalse(self.workspace.blockable(point))
+            self.assertFalse(self.workspace.reachable(point))
+        numpy.testing.assert_array_equal(self.workspace.flags(numpy.array([0, 5]), 1, 0.3), [0, 0])
+
+    def test_cache(self):
+        """A saved grid should be read back unchanged, and rebuilt when the voxel size no longer matches.
+        """
+        with TemporaryDirectory() as directory:
+            path = join(directory, 'workspace.npz')
+            built = load_workspace(path, COARSE_VOXEL)
+            self.assertTrue(exists(path))
+            cached = load_workspace(path, COARSE_VOXEL)
+            numpy.testing.assert_array_equal(built.grid, cached.grid)
+            numpy.testing.assert_array_equal(built.origin, cached.origin)
+            # different voxels do not match the cache, so are built again
+            finer = load_workspace(path, COARSE_VOXEL / 2)
+            self.assertEqual(finer.voxel_size, COARSE_VOXEL / 2)
+            self.assertGreater(finer.grid.shape[0], built.grid.shape[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import numpy
+from time import perf_counter
+
+from src.backend.arm_control.trajectory import ArcFitter
+
+# Compares per frame time of the sliding arc fit against refitting the whole window with least squares, as the window
+# grows. Sliding time should stay flat.
+WINDOWS = [8, 15, 30, 60, 120, 240]
+NUM_FRAMES = 3000
+FPS = 60
+
+
+def refit(times, locations):
+    tau = times - times[-1]
+    basis = numpy.stack((numpy.ones_like(tau), tau, tau * tau), axis=1)
+    coefficients, _, _, _ = numpy.linalg.lstsq(basis, locations, rcond=None)
+    return coefficients
+
+
+if __name__ == '__main__':
+    rng = numpy.random.default_rng(0)
+    times = numpy.arange(NUM_FRAMES) / FPS
+    # swings back and forth about once a second
+    locations = numpy.stack((0.4 * numpy.sin(2 * numpy.pi * times), 0.8 + 0.1 * numpy.cos(numpy.pi * times),
+                             0.3 * numpy.cos(2 * numpy.pi * times)), axis=1) + rng.normal(0, 0.01, (NUM_FRAMES, 3))
+    for window in WINDOWS:
+        fitter = ArcFitter(window)
+        valid = 0
+        t0 = perf_counter()
+        for t, location in zip(times, locations):
+            valid += fitter.add(t, location).valid
+        sliding_time = perf_counter() - t0
+        t0 = perf_counter()
+        for i in range(NUM_FRAMES):
+            refit(times[max(0, i - window + 1):i + 1], locations[max(0, i - window + 1):i + 1])
+        refit_time = perf_counter() - t0
+        print(f'{f"Window {window} ":=<40}')
+        print(f'Sliding: {1e6 * sliding_time / NUM_FRAMES:.1f}us per frame ({valid}/{NUM_FRAMES} valid)')
+        print(f'Refit: {1e6 * refit_time / NUM_FRAMES:.1f}us per frame')
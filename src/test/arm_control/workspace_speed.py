@@ -0,0 +1,40 @@
+import numpy
+from time import perf_counter
+
+from src.backend.arm_control.kinematics import pos_to_arm_angles, BASE_LIMITS, ELBOW_LIMITS, R_TO_D
+from src.backend.arm_control.workspace import WORKSPACE_CACHE, load_workspace
+
+# Times checking whether intercept points can be blocked with the workspace grid, against solving each point's angles
+# and checking them against the joint limits.
+NUM_POINTS = 20000
+
+
+def solve_reachable(point):
+    try:
+        base, elbow, _ = pos_to_arm_angles(*point)
+    except (ValueError, ZeroDivisionError):
+        return False
+    return BASE_LIMITS[0] <= base * R_TO_D <= BASE_LIMITS[1] and ELBOW_LIMITS[0] <= elbow * R_TO_D <= ELBOW_LIMITS[1]
+
+
+if __name__ == '__main__':
+    t0 = perf_counter()
+    workspace = load_workspace(WORKSPACE_CACHE)
+    print(f'Load: {1e3 * (perf_counter() - t0):.0f}ms ({workspace.grid.shape} voxels of {workspace.voxel_size}m)')
+    points = [tuple(point) for point in numpy.random.default_rng(0).uniform((-0.6, -0.2, 0), (0.6, 0.8, 0.8),
+                                                                             (NUM_POINTS, 3))]
+
+    t0 = perf_counter()
+    hits = sum(workspace.blockable(point) for point in points)
+    lookup_time = perf_counter() - t0
+    t0 = perf_counter()
+    solve_hits = sum(solve_reachable(point) for point in points)
+    solve_time = perf_counter() - t0
+    coordinates = numpy.array(points).T
+    t0 = perf_counter()
+    batch_hits = numpy.count_nonzero(workspace.flags(*coordinates))
+    batch_time = perf_counter() - t0
+
+    print(f'Lookup: {1e6 * lookup_time / NUM_POINTS:.2f}us per point ({hits}/{NUM_POINTS} blockable)')
+    print(f'Batch lookup: {1e6 * batch_time / NUM_POINTS:.3f}us per point ({batch_hits}/{NUM_POINTS} blockable)')
+    print(f'Solved angles: {1e6 * solve_time / NUM_POINTS:.2f}us per point ({solve_hits}/{NUM_POINTS} in limits)')
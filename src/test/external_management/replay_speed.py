@@ -0,0 +1,101 @@
+from math import asin, atan2, cos, sin, pi, sqrt
+from os.path import dirname, realpath, join
+from threading import Thread
+from time import monotonic, sleep
+
+from src.backend.arm_control import op_loop
+from src.backend.arm_control.op_loop import operation_loop
+from src.backend.external_management.connections import Ext, LEFT_CAM_OFFSET, LEFT_CAM_ANGLES, CAM_FOV
+from src.backend.external_management.frame_source import GeneratorSource, render_target
+from src.backend.performance.analyse_log import analyse_log_file
+from src.backend.sensor_fusion.vision_engine import VisionEngine
+from src.backend.state_management.state_manager import Manager, State
+
+# Runs the full operation loop on a synthetic sword swing, without cameras or arduino.
+RES = (160, 120)
+FPS = 30.0
+REALTIME = False  # True to pace frames at FPS like a webcam, False to run as fast as possible
+THREADED = False  # threaded capture reads each source freely, so needs REALTIME to keep left and right in step
+REUSE_BUFFERS = True
+COUNT_ALLOCATIONS = True
+VISION_WORKERS = False  # sources are sent to worker processes, which needs the fork start method (not Windows)
+RUN_TIME = 10  # s
+SWING_PERIOD = 2.0  # s
+
+
+class HeadlessRoot:
+    def winfo_exists(self):
+        return False
+
+    def quit(self):
+        pass
+
+
+class HeadlessGui:
+    root = HeadlessRoot()
+
+    def add_log(self, log: str):
+        pass
+
+    def set_state(self, state: State):
+        pass
+
+
+class HeadlessGraph:
+    def set_cam_directions(self, left_direction, right_direction):
+        pass
+
+    def set_obj(self, location):
+        pass
+
+
+def swing_position(t: float):
+    """Sword position moving in an arc in front of the arm.
+    """
+    phase = 2 * pi * t / SWING_PERIOD
+    return 0.3 * sin(phase), 1.0, 0.2 * cos(phase)
+
+
+def project(point, cam_x: float, yaw: float):
+    """Pixel where a camera at ``cam_x`` sees the point; inverse of ``create_ray`` + ``angles_to_vector``.
+    """
+    dx, dy, dz = point[0] - cam_x, point[1] - LEFT_CAM_OFFSET[1], point[2] - LEFT_CAM_OFFSET[2]
+    norm = sqrt(dx*dx + dy*dy + dz*dz)
+    angle_x = atan2(dx, dy) - yaw
+    angle_y = asin(dz / norm) - LEFT_CAM_ANGLES[1]
+    vertical_fov = (RES[1] / RES[0]) * CAM_FOV
+    return (angle_x + CAM_FOV / 2) / CAM_FOV * RES[0], (vertical_fov / 2 - angle_y) / vertical_fov * RES[1]
+
+
+def make_source(cam_x: float, yaw: float):
+    # render one swing up front so replay does not include drawing time
+    frames = [render_target(RES, project(swing_position(i / FPS), cam_x, yaw)) for i in range(int(SWING_PERIOD * FPS))]
+    if REALTIME:
+        return GeneratorSource(lambda i: frames[i] if i < len(frames) else None, RES, FPS, realtime=True, loop=True)
+    # read faster than FPS, so show where the swing is now rather than the next frame, keeping its speed physical
+    return GeneratorSource(lambda i: frames[int(monotonic() * FPS) % len(frames)], RES, FPS, loop=True)
+
+
+if __name__ == '__main__':
+    sources = (make_source(LEFT_CAM_OFFSET[0], LEFT_CAM_ANGLES[0]), make_source(-LEFT_CAM_OFFSET[0], -LEFT_CAM_ANGLES[0]))
+    op_loop.COUNT_ALLOCATIONS = COUNT_ALLOCATIONS
+    state_manager = Manager()
+    connection_manager = Ext(ignore_motors=True, threaded_capture=THREADED, frame_sources=sources,
+                             reuse_buffers=REUSE_BUFFERS,
+                             vision_engine=VisionEngine(sources, op_loop.TRACK_ROI, op_loop.LOOKUP_SEGMENTATION,
+                                                        op_loop.PYRAMID_SCALE) if VISION_WORKERS else None)
+    operation_thread = Thread(target=operation_loop,
+                              args=(state_manager, connection_manager, HeadlessGui(), HeadlessGraph()))
+    operation_thread.start()
+    state_manager.calibrate()
+    while state_manager.get_state() == State.CALIBRATE:
+        sleep(0.1)
+    if not state_manager.active():
+        print(f'Calibration failed: {state_manager.get_errors()}')
+    else:
+        sleep(RUN_TIME)
+    state_manager.stop()
+    operation_thread.join()
+    print(f'Errors: {state_manager.get_errors()}')
+    analyse_log_file(join(dirname(realpath(__file__)), '..', '..', 'backend', 'performance', 'active-timer.log'),
+                     print_loops=False)
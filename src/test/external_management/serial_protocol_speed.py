@@ -0,0 +1,47 @@
+import serial
+from time import perf_counter
+
+from src.backend.external_management.serial_protocol import (
+    PacketDecoder, encode_command, encode_text_command
+)
+
+# Compares text and binary command encoding through a pyserial loopback port.
+NUM_COMMANDS = 20000
+BAUD_RATE = 115200
+COMMANDS = [(4, (i % 121 - 60, i % 91 - 35, i % 361 - 180)) for i in range(NUM_COMMANDS)]
+
+
+def run_text(conn):
+    encoded = 0
+    t0 = perf_counter()
+    for state, angles in COMMANDS:
+        data = encode_text_command(state, angles)
+        encoded += len(data)
+        conn.write(data)
+        line = conn.readline().decode('utf-8').split(' ')
+        _ = int(line[0]), int(line[1]), int(line[2]), int(line[3])
+    return perf_counter() - t0, encoded
+
+
+def run_binary(conn):
+    decoder = PacketDecoder()
+    encoded = 0
+    t0 = perf_counter()
+    for seq, (state, angles) in enumerate(COMMANDS):
+        data = encode_command(state, angles, seq)
+        encoded += len(data)
+        conn.write(data)
+        _ = decoder.feed(conn.read(len(data)))
+    return perf_counter() - t0, encoded
+
+
+if __name__ == '__main__':
+    loop = serial.serial_for_url('loop://', timeout=1)
+    for name, run in (('TEXT', run_text), ('BINARY', run_binary)):
+        elapsed, total_bytes = run(loop)
+        print(f"{name + ' ':=<40}")
+        print(f'Encode + decode: {1e6 * elapsed / NUM_COMMANDS:.2f}us per command')
+        print(f'Average size: {total_bytes / NUM_COMMANDS:.2f} bytes')
+        # 10 bits per byte on the wire (start + 8 data + stop)
+        print(f'Wire time at {BAUD_RATE} baud: {1000 * 10 * total_bytes / NUM_COMMANDS / BAUD_RATE:.3f}ms per command')
+    loop.close()
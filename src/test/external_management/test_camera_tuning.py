@@ -0,0 +1,75 @@
+from src.backend.external_management.camera_tuning import (
+    TuningResult, best_result, load_profile, measure, save_profile, sweep
+)
+from src.backend.external_management.frame_source import CaptureSettings, GeneratorSource, render_target
+
+import cv2
+import os
+import tempfile
+import unittest
+
+
+FRAMES = [render_target((160, 120), (40 + i, 60)) for i in range(10)]
+
+
+def fake_camera(index: int, settings: CaptureSettings) -> GeneratorSource:
+    """Serves recorded frames, faster with a single frame buffer and MJPG, like a webcam at low resolution.
+    """
+    fps = 30 * (2 if settings.buffer_size == 1 else 1) * (2 if settings.fourcc == 'MJPG' else 1)
+    return GeneratorSource(lambda i: FRAMES[i % len(FRAMES)], (160, 120), fps, realtime=True, loop=True)
+
+
+class TestCameraTuning(unittest.TestCase):
+
+    def test_measure(self):
+        """Frame rate of a paced source should be measured close to its pace.
+        """
+        result = measure(fake_camera(0, CaptureSettings()), CaptureSettings(), 0.3)
+        self.assertEqual(result.res, (160, 120))
+        self.assertAlmostEqual(result.fps, 30, delta=3)
+        self.assertEqual(len(result.latency), 3)
+        self.assertLessEqual(result.latency[0], result.latency[2])
+
+    def test_sweep_picks_fastest(self):
+        """Sweep over fake cameras should pick the fastest combination.
+        """
+        results = sweep(0, fake_camera, 0.2, backends=(cv2.CAP_ANY,), resolutions=((160, 120),),
+                        fourccs=(None, 'MJPG'), buffer_sizes=(None, 1), exposures=(None,))
+        self.assertEqual(len(results), 4)
+        best = best_result(results)
+        self.assertEqual(best.settings.fourcc, 'MJPG')
+        self.assertEqual(best.settings.buffer_size, 1)
+
+    def test_min_res(self):
+        """Results smaller than the minimum resolution should never be picked.
+        """
+        small = TuningResult(CaptureSettings(), (80, 60), 0.1, 90.0, (0.01, 0.01, 0.01))
+        large = TuningResult(CaptureSettings(width=320, height=240), (320, 240), 0.1, 30.0, (0.03, 0.03, 0.03))
+        self.assertEqual(best_result([small, large]), large)
+        self.assertIsNone(best_result([small]))
+
+    def test_profile_round_trip(self):
+        """Saved settings should load back the same, keeping cameras saved earlier.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'profile.json')
+            self.assertEqual(load_profile(path), {})
+            left = CaptureSettings(cv2.CAP_MSMF, 320, 240, 'MJPG', 1, -6.0)
+            right = CaptureSettings()
+            save_profile({1: left}, path)
+            save_profile({2: right}, path)
+            self.assertEqual(load_profile(path), {1: left, 2: right})
+
+    def test_invalid_profile(self):
+        """Truncated or hand-edited profiles should be ignored rather than stop cameras connecting.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'profile.json')
+            for text in ('{"1": {"width": 32', '{"1": {"colour": 3}}', '{"one": {}}', '[1, 2]', '{"1": 5}'):
+                with open(path, 'w') as f:
+                    f.write(text)
+                self.assertEqual(load_profile(path), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
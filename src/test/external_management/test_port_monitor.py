@@ -0,0 +1,55 @@
+from src.backend.external_management import port_monitor
+from src.backend.external_management.port_monitor import PortMonitor
+
+from time import sleep
+import unittest
+from unittest.mock import patch
+
+
+class TestPortMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.present = {'COM_TEST'}
+        patcher = patch.object(port_monitor, 'is_port_present', lambda port: port in self.present)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.monitor = PortMonitor('COM_TEST', interval=0.01)
+        self.addCleanup(self.monitor.stop)
+
+    def test_start_checks_now(self):
+        """Starting should check the port before returning, so callers can read it straight away.
+        """
+        self.monitor.start()
+        self.assertTrue(self.monitor.connected)
+
+    def test_unplug_noticed(self):
+        """Unplugging and plugging the port back in should be noticed by the background thread.
+        """
+        self.monitor.start()
+        self.present.clear()
+        sleep(0.1)
+        self.assertFalse(self.monitor.connected)
+        self.present.add('COM_TEST')
+        sleep(0.1)
+        self.assertTrue(self.monitor.connected)
+
+    def test_stop_clears_connected(self):
+        """After stopping, the port should count as disconnected and no longer be checked.
+        """
+        self.monitor.start()
+        self.monitor.stop()
+        self.assertFalse(self.monitor.connected)
+        sleep(0.05)
+        self.assertFalse(self.monitor.connected)
+
+    def test_restart(self):
+        """The monitor should check the port again after being stopped and started.
+        """
+        self.monitor.start()
+        self.monitor.stop()
+        self.monitor.start()
+        self.assertTrue(self.monitor.connected)
+
+
+if __name__ == '__main__':
+    unittest.main()
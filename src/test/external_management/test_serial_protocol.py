@@ -0,0 +1,83 @@
+from src.backend.external_management.serial_protocol import (
+    Protocol, PacketDecoder, PACKET_SIZE, PROTOCOL_BINARY_REPLY, decode_packet, encode_command, negotiate_protocol,
+    wait_until_ready
+)
+
+import serial
+import unittest
+
+
+class TestSerialProtocol(unittest.TestCase):
+
+    def test_round_trip(self):
+        """Decoding an encoded command should give back the same command.
+        """
+        packet = encode_command(4, (-60, 55, -180), 300)
+        self.assertEqual(len(packet), PACKET_SIZE)
+        self.assertEqual(decode_packet(packet), (4, (-60, 55, -180), 300 & 0xFF))
+
+    def test_corrupt_packet(self):
+        """A packet with any byte changed should fail its CRC.
+        """
+        packet = bytearray(encode_command(3, (10, 20, 30), 1))
+        packet[3] ^= 0x01
+        with self.assertRaises(ValueError):
+            decode_packet(bytes(packet))
+
+    def test_decoder_resync(self):
+        """Decoder should skip noise and split packets arriving in pieces.
+        """
+        stream = b'\x00\xa5noise' + encode_command(1, (0, 0, 0), 1) + encode_command(4, (1, -2, 3), 2)
+        decoder = PacketDecoder()
+        packets = decoder.feed(stream[:10]) + decoder.feed(stream[10:20]) + decoder.feed(stream[20:])
+        self.assertEqual(packets, [(1, (0, 0, 0), 1), (4, (1, -2, 3), 2)])
+        self.assertEqual(decoder.dropped_bytes, 7)
+
+    def test_negotiate_fallback(self):
+        """Controller which does not answer the query should be sent text.
+        """
+        conn = serial.serial_for_url('loop://', timeout=0.1)
+        self.assertEqual(negotiate_protocol(conn), Protocol.TEXT)
+        conn.close()
+
+    def test_negotiate_binary(self):
+        """Controller which answers the query should be sent binary packets.
+        """
+        class BinaryController:
+            def reset_input_buffer(self):
+                pass
+
+            def write(self, data):
+                pass
+
+            def read_until(self, expected):
+                return PROTOCOL_BINARY_REPLY + expected
+
+        self.assertEqual(negotiate_protocol(BinaryController()), Protocol.BINARY)
+
+    def test_ready_on_reply(self):
+        """Controller which replies to the probe should be ready, with the reply discarded.
+        """
+        conn = serial.serial_for_url('loop://', timeout=1)
+        self.assertTrue(wait_until_ready(conn, b'1 0 0 0\n', timeout=0.5))
+        self.assertEqual(conn.in_waiting, 0)
+        self.assertEqual(conn.timeout, 1)
+        conn.close()
+
+    def test_ready_timeout(self):
+        """Controller which never replies should time out.
+        """
+        class SilentController:
+            timeout = 1
+
+            def write(self, data):
+                pass
+
+            def read(self, size):
+                return b''
+
+        self.assertFalse(wait_until_ready(SilentController(), b'1 0 0 0\n', timeout=0.05))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+from src.backend.external_management.serial_protocol import Protocol, encode_command
+from src.backend.external_management.serial_reader import SerialReader
+
+from queue import Empty, Queue
+from time import monotonic, sleep
+import serial
+import unittest
+
+
+class FedPort:
+    """Port that returns chunks of bytes in the order they were fed, as if they arrived one after another.
+    """
+
+    def __init__(self):
+        self.chunks = Queue()
+
+    @property
+    def in_waiting(self) -> int:
+        return 0
+
+    def read(self, size: int = 1) -> bytes:
+        try:
+            chunk = self.chunks.get(timeout=0.01)
+        except Empty:
+            return b''
+        if isinstance(chunk, Exception):
+            raise chunk
+        return chunk
+
+    def drained(self) -> bool:
+        return self.chunks.empty()
+
+
+class TestSerialReader(unittest.TestCase):
+
+    def read(self, protocol: Protocol, *chunks) -> SerialReader:
+        """Feeds chunks to a reader and waits until they have been read.
+        """
+        port = FedPort()
+        for chunk in chunks:
+            port.chunks.put(chunk)
+        reader = SerialReader(port, protocol)
+        reader.start()
+        deadline = monotonic() + 1.0
+        while not port.drained() and monotonic() < deadline:
+            sleep(0.01)
+        # let the last chunk be parsed
+        sleep(0.05)
+        reader.stop()
+        return reader
+
+    def test_text_angles_and_errors(self):
+        """Text lines should be stored as angles or error codes, including lines split across reads.
+        """
+        reader = self.read(Protocol.TEXT, b'10 20 30\n1', b'1 -22.5 ', b'33\n', b'101\n', b'11\n')
+        self.assertEqual([angles for _, angles in reader.angle_history()], [(11.0, -22.5, 33.0), (10.0, 20.0, 30.0)])
+        self.assertEqual(reader.take_error(), (0b101, None))
+        # only the first error code is kept until taken
+        self.assertEqual(reader.take_error(), (0, None))
+
+    def test_text_ignores_garbage(self):
+        """Lines that are neither angles nor error codes should be ignored.
+        """
+        reader = self.read(Protocol.TEXT, b'\xff\xfe\n', b'hello\n', b'1 2\n', b'a b c\n', b'1 2 3\n')
+        self.assertEqual(reader.latest_angles()[1], (1.0, 2.0, 3.0))
+        self.assertEqual(len(reader.angle_history()), 1)
+        self.assertEqual(reader.take_error(), (0, None))
+
+    def test_binary_split_and_corrupt(self):
+        """Binary packets split across reads should be joined, and corrupt packets skipped.
+        """
+        first = encode_command(0, (10, -20, 30), 1)
+        corrupt = bytearray(encode_command(0, (99, 99, 99), 2))
+        corrupt[3] ^= 0x01
+        error = encode_command(0b11, (11, -21, 31), 3)
+        reader = self.read(Protocol.BINARY, first[:4], first[4:] + bytes(corrupt) + error[:1], error[1:])
+        self.assertEqual([angles for _, angles in reader.angle_history()], [(11, -21, 31), (10, -20, 30)])
+        self.assertEqual(reader.take_error(), (0b11, None))
+
+    def test_read_error(self):
+        """An error from the port should stop the reader and be reported once.
+        """
+        failure = serial.serialutil.SerialException('unplugged')
+        reader = self.read(Protocol.TEXT, b'1 2 3\n', failure)
+        self.assertEqual(reader.take_error(), (0, failure))
+        self.assertEqual(reader.take_error(), (0, None))
+        self.assertEqual(reader.latest_angles()[1], (1.0, 2.0, 3.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
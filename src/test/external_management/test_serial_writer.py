@@ -0,0 +1,60 @@
+from src.backend.external_management.serial_writer import SerialWriter
+
+from threading import Event
+import unittest
+
+
+class HeldPort:
+    """Port that holds each write until released, so commands pile up behind it.
+    """
+
+    def __init__(self):
+        self.written = []
+        self.release = Event()
+
+    def write(self, command: bytes):
+        self.release.wait(1.0)
+        self.written.append(command)
+
+    def flush(self):
+        pass
+
+
+class TestSerialWriter(unittest.TestCase):
+
+    def test_setpoints_replace_state_changes_kept(self):
+        """While the port is busy, newer setpoints should replace older ones of the same kind, but state changes and
+        everything else should be written in order.
+        """
+        port = HeldPort()
+        writer = SerialWriter(port)
+        writer.start()
+        writer.submit(b'first')
+        writer.submit(b'active 1', 0.0, 'active')
+        writer.submit(b'active 2', 0.0, 'active')
+        writer.submit(b'return')
+        writer.submit(b'ready 1', 0.0, 'ready')
+        writer.submit(b'ready 2', 0.0, 'ready')
+        writer.submit(b'active 3', 0.0, 'active')
+        port.release.set()
+        writer.stop()
+        self.assertEqual(port.written[1:], [b'active 2', b'return', b'ready 2', b'active 3'])
+        self.assertEqual(writer.sent, 5)
+        self.assertEqual(writer.coalesced, 2)
+
+    def test_stop_writes_waiting(self):
+        """Commands submitted before the thread starts should all be written when it stops, with their latency.
+        """
+        port = HeldPort()
+        port.release.set()
+        writer = SerialWriter(port)
+        writer.submit(b'a')
+        writer.submit(b'b', 0.0, 'active')
+        writer.start()
+        writer.stop()
+        self.assertEqual(port.written, [b'a', b'b'])
+        self.assertIsNotNone(writer.take_capture_latency())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import cv2
+from math import dist
+import numpy
+from time import perf_counter
+
+from src.backend.error.standby_transition import StandbyTransition
+from src.backend.external_management.connections import CAM_FOV
+from src.backend.external_management.frame_source import render_target
+from src.backend.sensor_fusion.detection import Detector
+
+# Compares detection time and centre error of searching whole images at each pyramid scale and resolution.
+# Error is also given as angle, since that is what limits triangulation.
+RESOLUTIONS = [(160, 120), (320, 240), (640, 480), (1280, 720)]
+SCALES = [1, 2, 4, 8]
+NUM_FRAMES = 200
+SWORD_SIZE = (0.05, 0.33)  # fraction of image width, height
+
+
+def make_frames(res, rng):
+    frames = []
+    for _ in range(NUM_FRAMES):
+        center = (rng.uniform(0.2, 0.8) * res[0], rng.uniform(0.2, 0.8) * res[1])
+        size = (SWORD_SIZE[0] * res[0], SWORD_SIZE[1] * res[1])
+        image = render_target(res, center, size, rng.uniform(0, 180))
+        frames.append((cv2.add(image, rng.integers(0, 30, image.shape, numpy.uint8)), center))
+    return frames
+
+
+def run(detector, frames):
+    errors = []
+    elapsed = 0.0
+    for image, center in frames:
+        t0 = perf_counter()
+        try:
+            found, _ = detector.find(image)
+        except StandbyTransition:
+            continue
+        finally:
+            elapsed += perf_counter() - t0
+        errors.append(dist(found, center))
+    return elapsed, errors
+
+
+if __name__ == '__main__':
+    rng = numpy.random.default_rng(0)
+    for res in RESOLUTIONS:
+        frames = make_frames(res, rng)
+        for scale in SCALES:
+            if res[0] // scale < 40:
+                continue
+            detector = Detector(pyramid_scale=scale)
+            elapsed, errors = run(detector, frames)
+            print(f'{f"{res[0]}x{res[1]}, scale {scale} ":=<40}')
+            print(f'Time: {1e6 * elapsed / NUM_FRAMES:.1f}us per frame')
+            print(f'Found: {len(errors)}/{NUM_FRAMES} ({detector.coarse_misses} coarse misses)')
+            print(f'Centre error: {numpy.mean(errors):.2f}px mean, {numpy.max(errors):.2f}px max, '
+                  f'{numpy.degrees(CAM_FOV / res[0] * numpy.mean(errors)):.3f}deg mean')
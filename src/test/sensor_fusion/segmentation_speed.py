@@ -0,0 +1,48 @@
+import cv2
+import numpy
+from time import perf_counter
+
+from src.backend.external_management.frame_source import render_target
+from src.backend.sensor_fusion.segmentation import colour_table, lookup_mask, packed_image
+from src.backend.sensor_fusion.tracking import LOWER_RED_1, UPPER_RED_1, LOWER_RED_2, UPPER_RED_2
+
+# Compares HSV conversion + two range checks against a single colour table lookup per pixel.
+RESOLUTIONS = [(160, 120), (320, 240), (640, 480), (1280, 720)]
+NUM_FRAMES = 200
+
+
+def run_hsv(image, hsv, mask, mask_2):
+    t0 = perf_counter()
+    for _ in range(NUM_FRAMES):
+        cv2.cvtColor(image, cv2.COLOR_BGR2HSV, dst=hsv)
+        cv2.inRange(hsv, LOWER_RED_1, UPPER_RED_1, dst=mask)
+        cv2.inRange(hsv, LOWER_RED_2, UPPER_RED_2, dst=mask_2)
+        cv2.bitwise_or(mask, mask_2, dst=mask)
+    return perf_counter() - t0
+
+
+def run_lookup(image, packed, table, mask):
+    t0 = perf_counter()
+    for _ in range(NUM_FRAMES):
+        lookup_mask(image, packed, table, mask)
+    return perf_counter() - t0
+
+
+if __name__ == '__main__':
+    t0 = perf_counter()
+    table = colour_table()
+    print(f'Table built in {1000 * (perf_counter() - t0):.0f}ms ({table.nbytes / 2**20:.0f}MB)')
+    rng = numpy.random.default_rng(0)
+    for res in RESOLUTIONS:
+        image = render_target(res, (res[0] / 2, res[1] / 2), (res[0] / 20, res[1] / 2), 30)
+        image = cv2.add(image, rng.integers(0, 60, image.shape, numpy.uint8))
+        hsv = numpy.empty_like(image)
+        mask = numpy.empty(image.shape[:2], numpy.uint8)
+        mask_2 = numpy.empty_like(mask)
+        lookup = numpy.empty_like(mask)
+        elapsed_hsv = run_hsv(image, hsv, mask, mask_2)
+        elapsed_lookup = run_lookup(image, packed_image(image.shape), table, lookup)
+        print(f'{f"{res[0]}x{res[1]} ":=<40}')
+        print(f'HSV + inRange: {1e6 * elapsed_hsv / NUM_FRAMES:.1f}us per frame')
+        print(f'Lookup table: {1e6 * elapsed_lookup / NUM_FRAMES:.1f}us per frame')
+        print(f'Masks equal: {numpy.array_equal(mask, lookup)}')
@@ -0,0 +1,54 @@
+from math import dist
+import numpy
+from time import perf_counter
+
+from src.backend.external_management.connections import LEFT_CAM_OFFSET
+from src.backend.sensor_fusion.stereo import StereoRig
+
+# Compares triangulation time of the previous per call array solution, the rig's scalar path and its batched path.
+NUM_PAIRS = 20000
+
+
+def array_triangulate(left_direction, right_direction):
+    d1 = numpy.array(left_direction)
+    d2 = numpy.array(right_direction)
+    p1 = numpy.array([LEFT_CAM_OFFSET[0], LEFT_CAM_OFFSET[1], LEFT_CAM_OFFSET[2]])
+    p2 = numpy.array([-LEFT_CAM_OFFSET[0], LEFT_CAM_OFFSET[1], LEFT_CAM_OFFSET[2]])
+    a = d1[0] * d1[0] + d1[1] * d1[1] + d1[2] * d1[2]
+    b = d1[0] * d2[0] + d1[1] * d2[1] + d1[2] * d2[2]
+    c = (-2 * p1[0]) * d1[0]
+    d = d2[0] * d2[0] + d2[1] * d2[1] + d2[2] * d2[2]
+    e = (-2 * p1[0]) * d2[0]
+    den = a * d - b**2
+    t1 = (c * d - b * e) / den
+    t2 = -(a * e - b * c) / den
+    q1 = numpy.array(p1) + t1 * numpy.array(d1)
+    q2 = numpy.array(p2) + t2 * numpy.array(d2)
+    return (q1 + q2) / 2, dist(q1, q2)
+
+
+if __name__ == '__main__':
+    rig = StereoRig()
+    rng = numpy.random.default_rng(0)
+    targets = rng.uniform((-1, 0.3, -0.5), (1, 2, 1), (NUM_PAIRS, 3))
+    left = targets - rig.left_origin + rng.normal(0, 0.02, (NUM_PAIRS, 3))
+    right = targets - rig.right_origin + rng.normal(0, 0.02, (NUM_PAIRS, 3))
+    left_tuples = [tuple(d) for d in left.tolist()]
+    right_tuples = [tuple(d) for d in right.tolist()]
+
+    t0 = perf_counter()
+    for d1, d2 in zip(left_tuples, right_tuples):
+        array_triangulate(d1, d2)
+    array_time = perf_counter() - t0
+    t0 = perf_counter()
+    for d1, d2 in zip(left_tuples, right_tuples):
+        rig.triangulate(d1, d2)
+    scalar_time = perf_counter() - t0
+    t0 = perf_counter()
+    locations, gaps = rig.triangulate_batch(left, right)
+    batch_time = perf_counter() - t0
+
+    print(f'Arrays: {1e6 * array_time / NUM_PAIRS:.2f}us per pair')
+    print(f'Scalar: {1e6 * scalar_time / NUM_PAIRS:.2f}us per pair ({array_time / scalar_time:.1f}x)')
+    print(f'Batch: {1e6 * batch_time / NUM_PAIRS:.3f}us per pair ({array_time / batch_time:.0f}x)')
+    print(f'Rejected at 0.3m: {numpy.count_nonzero(gaps > 0.3)}/{NUM_PAIRS}')
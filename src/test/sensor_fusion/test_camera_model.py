@@ -0,0 +1,42 @@
+from src.backend.external_management.connections import LEFT_CAM_ANGLES
+from src.backend.sensor_fusion.camera_model import CameraModel, StereoCameras
+from src.backend.sensor_fusion.tracking import angles_to_vector, create_ray
+
+import numpy
+import unittest
+
+
+class TestCameraModel(unittest.TestCase):
+
+    def test_matches_create_ray(self):
+        """Rays should match ``create_ray`` + ``angles_to_vector`` with the mounting angles added, for each camera.
+        """
+        res = (160.0, 120.0)
+        cameras = StereoCameras()
+        cameras.update(res, 1)
+        rng = numpy.random.default_rng(0)
+        pixels = rng.uniform((0, 0), res, (50, 2))
+        for model, sign in ((cameras.left, 1), (cameras.right, -1)):
+            for x, y in pixels.tolist():
+                angle_x, angle_y = create_ray(x, y, res)
+                expected = angles_to_vector(angle_x + sign * LEFT_CAM_ANGLES[0], angle_y + LEFT_CAM_ANGLES[1])
+                numpy.testing.assert_allclose(model.ray(x, y), expected, atol=1e-12)
+            numpy.testing.assert_allclose(model.rays(pixels), [model.ray(x, y) for x, y in pixels.tolist()],
+                                          atol=1e-12)
+
+    def test_rebuilt_on_change(self):
+        """Models should only be rebuilt when the resolution or camera generation changes.
+        """
+        cameras = StereoCameras()
+        self.assertTrue(cameras.update((160, 120), 1))
+        left = cameras.left
+        self.assertFalse(cameras.update((160.0, 120.0), 1))
+        self.assertIs(cameras.left, left)
+        self.assertTrue(cameras.update((160, 120), 2))
+        self.assertTrue(cameras.update((320, 240), 2))
+        self.assertEqual(cameras.left.res, (320, 240))
+        self.assertEqual(CameraModel((320, 240), 0, 0).ray(160, 120), (0.0, 1.0, 0.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
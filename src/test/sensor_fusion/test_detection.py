@@ -0,0 +1,101 @@
+from src.backend.error.standby_transition import StandbyTransition
+from src.backend.external_management.frame_source import render_target
+from src.backend.sensor_fusion.detection import Detector
+
+import cv2
+from math import dist
+import numpy
+import unittest
+
+
+RES = (320, 240)
+
+
+class TestDetector(unittest.TestCase):
+
+    def test_roi_matches_full_search(self):
+        """Tracking a moving object should find the same poses as searching whole images, in less area.
+        """
+        tracked = Detector(track_roi=True)
+        full = Detector()
+        for i in range(30):
+            image = render_target(RES, (60 + 6 * i, 50 + 4 * i), angle=3 * i)
+            self.assertEqual(tracked.find(image), full.find(image))
+            self.assertLessEqual(tracked.processed_area, full.processed_area)
+        self.assertEqual(tracked.full_searches, 1)
+        self.assertEqual(tracked.hits, 29)
+        self.assertLess(tracked.processed_area, full.processed_area / 4)
+
+    def test_fallback_after_miss(self):
+        """Object jumping outside of the region of interest should be found by searching the whole image.
+        """
+        detector = Detector(track_roi=True)
+        detector.find(render_target(RES, (40, 40)))
+        detector.find(render_target(RES, (42, 40)))
+        roi = detector.roi
+        center, _ = detector.find(render_target(RES, (280, 200)))
+        self.assertEqual(center, (280, 200))
+        self.assertEqual(detector.misses, 1)
+        self.assertEqual(detector.processed_area, roi[2] * roi[3] + RES[0] * RES[1])
+
+    def test_lost_object(self):
+        """Losing the object should raise and reset the region of interest.
+        """
+        detector = Detector(track_roi=True)
+        detector.find(render_target(RES, (100, 100)))
+        self.assertIsNotNone(detector.roi)
+        with self.assertRaises(StandbyTransition):
+            detector.find(numpy.full((RES[1], RES[0], 3), 90, numpy.uint8))
+        self.assertIsNone(detector.roi)
+        self.assertEqual(detector.full_searches, 2)
+
+    def test_pyramid_matches_full_search(self):
+        """Coarse to fine search should find the same poses as searching at full resolution, in less area.
+        """
+        full = Detector()
+        for scale in (2, 4, 8):
+            pyramid = Detector(pyramid_scale=scale)
+            for i in range(10):
+                image = render_target((640, 480), (100 + 41.3 * i, 90 + 29.7 * i), (8, 80), 17 * i)
+                self.assertEqual(pyramid.find(image), full.find(image))
+                self.assertLess(pyramid.processed_area, full.processed_area / 2)
+            self.assertEqual(pyramid.coarse_misses, 0)
+
+    def test_pyramid_fallback(self):
+        """Object too small to be found downsampled should be found by searching at full resolution.
+        """
+        detector = Detector(pyramid_scale=8)
+        image = render_target((640, 480), (297, 201), (2, 2))
+        self.assertEqual(detector.find(image), Detector().find(image))
+        self.assertEqual(detector.coarse_misses, 1)
+
+    def test_subpixel_centre(self):
+        """Centroid should be closer to the true centre than the whole pixel centre, and orientation should only be
+        worked out when asked for, matching ``find``.
+        """
+        rng = numpy.random.default_rng(0)
+        detector = Detector()
+        subpixel_error = 0
+        pixel_error = 0
+        for _ in range(100):
+            center = (rng.uniform(40, 120), rng.uniform(30, 90))
+            image = render_target((160, 120), center, (4, 30), rng.uniform(0, 180))
+            detection = detector.detect(image)
+            self.assertIsNone(detection._angle)
+            pixel_center, angle = detector.find(image)
+            self.assertEqual(detection.angle, angle)
+            subpixel_error += dist(detection.center, center)
+            pixel_error += dist(pixel_center, center)
+        self.assertLess(subpixel_error, pixel_error * 0.6)
+
+    def test_flat_outline(self):
+        """Outline with no area should be centred on its points.
+        """
+        detection = Detector().detect(cv2.line(render_target((160, 120), (-50, -50)), (20, 30), (60, 30),
+                                               (0, 0, 255), 1))
+        self.assertAlmostEqual(detection.center[0], 40, delta=1)
+        self.assertAlmostEqual(detection.center[1], 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
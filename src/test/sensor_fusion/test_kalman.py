@@ -0,0 +1,72 @@
+from src.backend.sensor_fusion.kalman import KalmanFilter
+
+import numpy
+import unittest
+
+
+FPS = 60
+START = numpy.array([0.3, 0.8, 0.2])
+VELOCITY = numpy.array([-1.5, 0.2, 1.0])
+ACCELERATION = numpy.array([2.0, 0.0, -9.8])
+
+
+def swing(t: float) -> numpy.ndarray:
+    return START + VELOCITY * t + ACCELERATION * t * t / 2
+
+
+class TestKalmanFilter(unittest.TestCase):
+
+    def setUp(self):
+        rng = numpy.random.default_rng(0)
+        # slightly uneven frame times, as from real cameras
+        self.times = numpy.cumsum(rng.uniform(0.8, 1.2, 40) / FPS)
+        self.measured = [swing(t) + rng.normal(0, 0.02, 3) for t in self.times]
+
+    def test_reduces_noise(self):
+        """Filtered positions should be closer to the true path than measurements, once settled, and motion should be
+        estimated close to the truth.
+        """
+        kalman = KalmanFilter()
+        filtered_error = 0
+        measured_error = 0
+        for i, (t, location) in enumerate(zip(self.times, self.measured)):
+            state = kalman.update(t, location)
+            if i >= 10:
+                filtered_error += numpy.linalg.norm(state.position - swing(t))
+                measured_error += numpy.linalg.norm(location - swing(t))
+        self.assertLess(filtered_error, measured_error * 0.8)
+        t = self.times[-1]
+        numpy.testing.assert_allclose(state.velocity, VELOCITY + ACCELERATION * t, atol=0.5)
+        numpy.testing.assert_allclose(state.acceleration, ACCELERATION, atol=5)
+        self.assertLess(state.covariance[0, 0], 0.02 ** 2)
+
+    def test_predict(self):
+        """Prediction should extrapolate the state without changing the filter, with growing uncertainty.
+        """
+        kalman = KalmanFilter()
+        for t, location in zip(self.times, self.measured):
+            kalman.update(t, location)
+        before = kalman.state()
+        ahead = kalman.predict(before.timestamp + 0.1)
+        expected = before.position + before.velocity * 0.1 + before.acceleration * 0.005
+        numpy.testing.assert_allclose(ahead.position, expected)
+        self.assertGreater(ahead.covariance[0, 0], before.covariance[0, 0])
+        numpy.testing.assert_array_equal(kalman.state().position, before.position)
+        self.assertLess(numpy.linalg.norm(ahead.position - swing(ahead.timestamp)), 0.1)
+
+    def test_restarts_after_gap(self):
+        """Measurement long after the last should start a new track at rest where it was measured.
+        """
+        kalman = KalmanFilter(max_gap=0.5)
+        kalman.update(0.0, (0, 0, 0))
+        kalman.update(0.02, (0.1, 0, 0))
+        state = kalman.update(1.0, (1, 2, 3))
+        numpy.testing.assert_array_equal(state.position, (1, 2, 3))
+        numpy.testing.assert_array_equal(state.velocity, (0, 0, 0))
+        kalman.reset()
+        with self.assertRaises(ValueError):
+            kalman.predict(2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+from src.backend.sensor_fusion.location_history import LocationHistory
+from src.backend.state_management.error_checker import verify_track
+
+from collections import deque
+from threading import Thread
+import numpy
+import unittest
+
+
+class TestLocationHistory(unittest.TestCase):
+
+    def test_matches_list(self):
+        """Entries should come back newest first, as the list history kept them, through every wrap around.
+        """
+        history = LocationHistory(capacity=5)
+        expected = deque(maxlen=5)
+        for i in range(23):
+            history.append(0.1 * i, (i, 2 * i, 3 * i))
+            expected.appendleft((0.1 * i, (i, 2 * i, 3 * i)))
+            self.assertEqual(len(history), len(expected))
+            self.assertEqual([(t, tuple(location)) for t, location in history], list(expected))
+            numpy.testing.assert_array_equal(history.timestamps, [t for t, _ in expected])
+            numpy.testing.assert_array_equal(history.locations, [location for _, location in expected])
+        self.assertEqual(history.latest()[0], 2.2)
+
+    def test_views_and_copies(self):
+        """Ordered views should share memory with the buffer; stored locations and snapshots should not.
+        """
+        history = LocationHistory(capacity=3)
+        location = numpy.array([1.0, 2.0, 3.0])
+        for i in range(4):
+            history.append(i, location)
+        location[2] = -1
+        self.assertTrue(numpy.shares_memory(history.locations, history._locations))
+        numpy.testing.assert_array_equal(history.locations[0], [1, 2, 3])
+        timestamps, locations = history.snapshot()
+        history.append(4, location)
+        numpy.testing.assert_array_equal(timestamps, [3, 2, 1])
+        numpy.testing.assert_array_equal(history.timestamps, [4, 3, 2])
+
+    def test_clear(self):
+        """Cleared history should be empty and refill from the start.
+        """
+        history = LocationHistory()
+        history.append(0, (0, 0, 0))
+        history.clear()
+        self.assertEqual(len(history), 0)
+        self.assertIsNone(history.latest())
+        self.assertEqual(history.locations.shape, (0, 3))
+        history.append(1, (1, 1, 1))
+        self.assertEqual(history.timestamps.tolist(), [1])
+
+    def test_concurrent_snapshots(self):
+        """Snapshots taken while another thread appends should always be whole entries in order.
+        """
+        history = LocationHistory(capacity=40)
+        bad = []
+
+        def read():
+            for _ in range(2000):
+                timestamps, locations = history.snapshot()
+                if not (numpy.all(numpy.diff(timestamps) < 0) and numpy.all(locations[:, 0] == timestamps)):
+                    bad.append(timestamps)
+
+        reader = Thread(target=read)
+        reader.start()
+        i = 0
+        while reader.is_alive():
+            i += 1
+            history.append(i, (i, 0, 0))
+        reader.join()
+        self.assertEqual(bad, [])
+
+    def test_verify_track(self):
+        """History should be checked the same as a list of timestamps and locations.
+        """
+        history = LocationHistory()
+        for i in range(15):
+            history.append(0.1 * i, (0.0, 0.0, 0.5 * i))
+        verify_track(history)
+
+
+if __name__ == '__main__':
+    unittest.main()
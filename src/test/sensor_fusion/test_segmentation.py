@@ -0,0 +1,57 @@
+from src.backend.external_management.frame_source import render_target
+from src.backend.sensor_fusion.detection import Detector
+from src.backend.sensor_fusion.segmentation import TARGET_RANGES, colour_table, lookup_mask, packed_image
+from src.backend.sensor_fusion.tracking import LOWER_RED_1, UPPER_RED_1, LOWER_RED_2, UPPER_RED_2
+
+import cv2
+import numpy
+import unittest
+
+
+def hsv_mask(image: numpy.ndarray) -> numpy.ndarray:
+    """Thresholds as ``find_in_image`` does.
+    """
+    hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+    return cv2.inRange(hsv, LOWER_RED_1, UPPER_RED_1) + cv2.inRange(hsv, LOWER_RED_2, UPPER_RED_2)
+
+
+class TestSegmentation(unittest.TestCase):
+
+    def test_every_colour(self):
+        """Table should agree with HSV thresholding for every colour.
+        """
+        colours = numpy.arange(1 << 24, dtype='<u4').view(numpy.uint8).reshape(4096, 4096, 4)[..., :3]
+        colours = numpy.ascontiguousarray(colours)
+        self.assertTrue(numpy.array_equal(colour_table().reshape(4096, 4096), hsv_mask(colours)))
+
+    def test_images(self):
+        """Masks of whole images and parts of images should match HSV thresholding.
+        """
+        rng = numpy.random.default_rng(0)
+        image = render_target((320, 240), (150, 110), (20, 90), 30)
+        image = cv2.add(image, rng.integers(0, 60, image.shape, numpy.uint8))
+        packed = packed_image(image.shape)
+        mask = numpy.zeros(image.shape[:2], numpy.uint8)
+        lookup_mask(image, packed, colour_table(), mask)
+        self.assertTrue(numpy.array_equal(mask, hsv_mask(image)))
+        mask[:] = 0
+        lookup_mask(image[50:150, 100:200], packed[50:150, 100:200], colour_table(), mask[50:150, 100:200])
+        self.assertTrue(numpy.array_equal(mask[50:150, 100:200], hsv_mask(image[50:150, 100:200])))
+        self.assertEqual(mask[:50].sum() + mask[150:].sum(), 0)
+
+    def test_table_rebuilt_on_change(self):
+        """Table should be reused for the same ranges and rebuilt for different ones.
+        """
+        self.assertIs(colour_table(), colour_table(tuple((lower.copy(), upper.copy())
+                                                         for lower, upper in TARGET_RANGES)))
+        narrow = ((numpy.array([0, 200, 200]), numpy.array([5, 255, 255])),)
+        self.assertIsNot(colour_table(narrow), colour_table())
+        detector = Detector(lookup=True)
+        image = render_target((160, 120), (80, 60))
+        self.assertEqual(detector.find(image), Detector().find(image))
+        detector.ranges = narrow
+        self.assertEqual(detector.find(image), Detector(ranges=narrow).find(image))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+from src.backend.external_management.connections import LEFT_CAM_OFFSET
+from src.backend.sensor_fusion.stereo import StereoRig
+
+from math import dist, inf
+import numpy
+import unittest
+
+
+def closest_midpoint(d1: numpy.ndarray, d2: numpy.ndarray, p1: numpy.ndarray, p2: numpy.ndarray):
+    """Solves for the closest points of two rays as a 2x2 system.
+    """
+    w = p2 - p1
+    t1, t2 = numpy.linalg.solve([[d1 @ d1, -(d1 @ d2)], [d1 @ d2, -(d2 @ d2)]], [w @ d1, w @ d2])
+    q1 = p1 + t1 * d1
+    q2 = p2 + t2 * d2
+    return (q1 + q2) / 2, dist(q1, q2)
+
+
+class TestStereoRig(unittest.TestCase):
+
+    def setUp(self):
+        self.rig = StereoRig()
+        rng = numpy.random.default_rng(0)
+        targets = rng.uniform((-1, 0.3, -0.5), (1, 2, 1), (200, 3))
+        self.left = targets - LEFT_CAM_OFFSET + rng.normal(0, 0.02, (200, 3))
+        self.right = targets - self.rig.right_origin + rng.normal(0, 0.02, (200, 3))
+
+    def test_scalar_matches_solve(self):
+        """Scalar path should give the same point and gap as solving the system with arrays.
+        """
+        for d1, d2 in zip(self.left, self.right):
+            location, gap = self.rig.triangulate(tuple(d1), tuple(d2))
+            expected, expected_gap = closest_midpoint(d1, d2, numpy.array(self.rig.left_origin),
+                                                      numpy.array(self.rig.right_origin))
+            numpy.testing.assert_allclose(location, expected, atol=1e-9)
+            self.assertAlmostEqual(gap, expected_gap)
+
+    def test_batch_matches_scalar(self):
+        """Batched path should give the same points and gaps as the scalar path, one pair at a time.
+        """
+        locations, gaps = self.rig.triangulate_batch(self.left, self.right)
+        self.assertEqual(locations.shape, (200, 3))
+        for d1, d2, location, gap in zip(self.left, self.right, locations, gaps):
+            expected, expected_gap = self.rig.triangulate(tuple(d1), tuple(d2))
+            numpy.testing.assert_allclose(location, expected, atol=1e-12)
+            self.assertAlmostEqual(gap, expected_gap)
+
+    def test_parallel_rays(self):
+        """Parallel rays never meet, so should give an infinite gap from both paths.
+        """
+        _, gap = self.rig.triangulate((0, 1, 0), (0, 2, 0))
+        self.assertEqual(gap, inf)
+        locations, gaps = self.rig.triangulate_batch(numpy.array([[0, 1, 0], [0.1, 1, 0]]),
+                                                     numpy.array([[0, 2, 0], [-0.1, 1, 0]]))
+        self.assertEqual(gaps[0], inf)
+        self.assertLess(gaps[1], 1e-12)
+        self.assertTrue(numpy.isfinite(locations).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
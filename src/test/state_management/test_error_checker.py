@@ -1,4 +1,5 @@
-from src.backend.state_management.error_checker import verify_track
+from src.backend.error.standby_transition import StandbyTransition
+from src.backend.state_management.error_checker import POSITION_TOLERANCE, TrackVerifier, verify_track
 
 import unittest
 
@@ -65,5 +66,84 @@ class TestErrorChecker(unittest.TestCase):
         """
         self.assertTrue(verify_track(TEST_DATA_EDGE))
 
+
+class TestTrackVerifier(unittest.TestCase):
+
+    def test_happy(self):
+        """Steady movement well within the limits should pass, and be counted.
+        """
+        verifier = TrackVerifier()
+        for timestamp, location in reversed(TEST_DATA_HAPPY):
+            verifier.check(timestamp, location)
+        self.assertEqual(verifier.checked, 14)
+        self.assertAlmostEqual(verifier.mean_interval, 0.1)
+        self.assertAlmostEqual(verifier.peak_speed, 5.0)
+        self.assertAlmostEqual(verifier.peak_acceleration, 0.0, places=6)
+
+    def test_same_messages(self):
+        """Gaps in time and jumps in space should raise the same messages as ``verify_track``.
+        """
+        for data in (TEST_DATA_TIME, TEST_DATA_DIST):
+            verifier = TrackVerifier(max_speed=5.0)
+            with self.assertRaises(StandbyTransition) as incremental:
+                verifier.check(*data[1])
+                verifier.check(*data[0])
+            with self.assertRaises(StandbyTransition) as batch:
+                verify_track(list(reversed(data)))
+            self.assertEqual(incremental.exception.message, batch.exception.message)
+
+    def test_distance_capped(self):
+        """A long gap should not allow a jump further than ``verify_track`` would.
+        """
+        verifier = TrackVerifier(max_speed=20.0)
+        verifier.check(0.0, (0, 0, 0))
+        with self.assertRaises(StandbyTransition):
+            verifier.check(0.19, (0, 0.9, 0))
+        with self.assertRaises(StandbyTransition) as batch:
+            verify_track([(0.38, (0, 1.8, 0)), (0.19, (0, 0.9, 0))])
+        self.assertIn('too far apart', batch.exception.message)
+
+    def test_speed_scales_with_time(self):
+        """The same distance should pass over a long interval but not a short one.
+        """
+        verifier = TrackVerifier(max_speed=5.0, tolerance=0.0)
+        verifier.check(0.0, (0, 0, 0))
+        verifier.check(0.1, (0, 0.4, 0))
+        with self.assertRaises(StandbyTransition):
+            verifier.check(0.11, (0, 0.8, 0))
+
+    def test_acceleration(self):
+        """Sudden reversal should fail on acceleration, though each step is within the speed limit.
+        """
+        verifier = TrackVerifier(max_speed=20.0, max_acceleration=100.0, tolerance=0.0)
+        verifier.check(0.00, (0, 0, 0))
+        verifier.check(0.02, (0, 0.3, 0))
+        with self.assertRaises(StandbyTransition) as context:
+            verifier.check(0.04, (0, 0, 0))
+        self.assertIn('change speed too fast', context.exception.message)
+        verifier.reset()
+        self.assertEqual(verifier.checked, 0)
+        verifier.check(0.06, (0, 0, 0))
+
+    def test_default_acceleration_fires(self):
+        """A reversal at 60 frames a second should fail with the default limits and noise tolerance.
+        """
+        verifier = TrackVerifier()
+        verifier.check(0.0, (0, 0, 0))
+        verifier.check(1 / 60, (0, 0.15, 0))
+        with self.assertRaises(StandbyTransition) as context:
+            verifier.check(2 / 60, (0, 0.0, 0))
+        self.assertIn('Locations at past time steps 0 to 2 change speed too fast', context.exception.message)
+
+    def test_uneven_intervals(self):
+        """Noise over a short interval followed by a long one should not fail on acceleration.
+        """
+        verifier = TrackVerifier()
+        verifier.check(0.0, (0, 0, 0))
+        verifier.check(0.005, (0, POSITION_TOLERANCE, 0))
+        verifier.check(0.055, (0, 0, 0))
+        self.assertEqual(verifier.checked, 2)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
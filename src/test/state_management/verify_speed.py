@@ -0,0 +1,34 @@
+import numpy
+from time import perf_counter
+
+from src.backend.sensor_fusion.location_history import LocationHistory
+from src.backend.state_management.error_checker import TrackVerifier, verify_track
+
+# Compares per frame time of checking the whole location history against checking only the newest location, as the
+# history grows. Incremental time should stay flat.
+HISTORY_LENGTHS = [15, 30, 60, 120, 240]
+NUM_FRAMES = 3000
+FPS = 60
+
+
+if __name__ == '__main__':
+    rng = numpy.random.default_rng(0)
+    times = numpy.arange(NUM_FRAMES) / FPS
+    locations = numpy.stack((0.3 * numpy.sin(numpy.pi * times), numpy.full(NUM_FRAMES, 1.0),
+                             0.2 * numpy.cos(numpy.pi * times)), axis=1) + rng.normal(0, 0.01, (NUM_FRAMES, 3))
+    for length in HISTORY_LENGTHS:
+        history = LocationHistory(length)
+        t0 = perf_counter()
+        for t, location in zip(times, locations):
+            history.append(t, location)
+            verify_track(history)
+        batch_time = perf_counter() - t0
+        verifier = TrackVerifier()
+        t0 = perf_counter()
+        for t, location in zip(times.tolist(), locations.tolist()):
+            verifier.check(t, location)
+        incremental_time = perf_counter() - t0
+        print(f'{f"History {length} ":=<40}')
+        print(f'verify_track: {1e6 * batch_time / NUM_FRAMES:.1f}us per frame (including append)')
+        print(f'TrackVerifier: {1e6 * incremental_time / NUM_FRAMES:.1f}us per frame')
+    print(f'Peak speed {verifier.peak_speed:.2f}m/s, peak acceleration {verifier.peak_acceleration:.0f}m/s^2')